@@ -1,16 +1,50 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from typing import Optional, Dict, List
-import uvicorn
+import asyncio
+import os
+import secrets
+import time
+import orjson
 from services.weather_service import WeatherService
 from services.ai_service import AIService
 from services.ocr_service import ocr_service
+from services.place_service import place_service
+from services.asset_service import asset_service, IMMUTABLE_CACHE_CONTROL
+from services.admission import llm_admission, AdmissionRejected
+from services.json_repair import llm_json_metrics
+from services.job_manager import job_manager
+from services.readiness import readiness, WarmupSkipped
+from services.menu_similarity import menu_index
+from services.genai_client import has_api_key, llm_usage
+from services.site_service import SiteService
+from services.push_service import PushService, CLOSE_UNKNOWN_SITE
+from middleware.http_cache import HTTPCacheMiddleware
+from middleware.tracing import TracingMiddleware
+from middleware.profiling import ProfilingMiddleware, profiling_configured
+from middleware.capture import CaptureMiddleware, capture_configured, capture_writer
+from services.tracing import trace_exporter, traced
+from schemas import (
+    ApiResponse,
+    CafeteriaMenuRequest,
+    CafeteriaRecommendation,
+    DailyRecommendations,
+    JobStatus,
+    LunchBundle,
+    Site,
+    SiteMenuPublish,
+    SitePublication,
+    WeatherBackground,
+    WeatherData,
+)
 
 app = FastAPI(
     title="AI 점심 메뉴 추천 API",
     description="날씨 기반 AI 점심 메뉴 추천 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson 직렬화 (jsonable_encoder 경유 없이 bytes로 바로)
+    default_response_class=ORJSONResponse
 )
 
 # CORS 설정
@@ -22,18 +56,175 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 서비스 인스턴스
+# 서비스 인스턴스 (생성은 가볍고, Gemini 모델은 첫 사용 시 로딩)
 weather_service = WeatherService()
 ai_service = AIService()
+site_service = SiteService(weather_service, ai_service)
+push_service = PushService(weather_service, ai_service, site_service)
+
+# ETag / 304 / Cache-Control / br·gzip 압축 (조회 API는 날씨 캐시 TTL만큼 재사용)
+app.add_middleware(
+    HTTPCacheMiddleware,
+    max_age={
+        "/api/weather": int(weather_service.cache_ttl),
+        "/api/daily-recommendations": int(weather_service.cache_ttl),
+    },
+)
+
+# 요청 프로파일링 (PROFILE_ADMIN_TOKEN / PROFILE_SAMPLE_RATE 설정 시에만 설치 → 꺼져 있으면 오버헤드 0)
+if profiling_configured():
+    try:
+        import pyinstrument  # noqa: F401
+        app.add_middleware(ProfilingMiddleware)
+    except ImportError:
+        print("⚠️ 프로파일링 설정이 있지만 pyinstrument 가 없습니다 (pip install pyinstrument)")
+
+# 트래픽 캡처 (CAPTURE_FILE 설정 시에만: 샘플링 + 개인정보 제거 → tools/replay.py 로 재생)
+if capture_configured():
+    app.add_middleware(CaptureMiddleware)
+
+# 요청 트레이싱 (가장 바깥: X-Trace-Id, 선택적 Server-Timing, OTLP/JSON 내보내기)
+app.add_middleware(TracingMiddleware)
+
+
+# 워밍업 단계별 최대 대기 (외부 호출이 늦어도 준비 완료를 무한정 미루지 않게)
+WARMUP_STEP_TIMEOUT = float(os.getenv("WARMUP_STEP_TIMEOUT", "10"))
+
+
+async def warm_up_services() -> None:
+    """
+    기동 워밍업 (백그라운드) - 끝날 때까지 /ready 는 503
+    연결 풀 → 인덱스 → 모델 생성 → Gemini ping → 사무실 날씨 미리 받기
+    """
+    readiness.start()
+    for name, required in (
+        ("connection_pools", True), ("indexes", True), ("models", False),
+        ("gemini", False), ("weather", False),
+    ):
+        readiness.register(name, required)
+
+    async def open_pools():
+        _ = weather_service.client
+        if getattr(place_service.client, "client", None) is not None:
+            _ = place_service.client.client
+        # CACHE_BACKEND=redis 면 여기서 연결이 열린다
+        await weather_service.cache.get("__warmup__")
+
+    def load_indexes():
+        menus = menu_index.warm_up()
+        _ = weather_service.location_index
+        return f"{menus} menus, {len(weather_service.locations)} locations"
+
+    def create_models():
+        if not has_api_key():
+            raise WarmupSkipped("GEMINI_API_KEY 없음")
+        ai_service.warm_up()
+        ocr_service.warm_up()
+
+    async def ping_gemini():
+        if not await ai_service.ping():
+            raise WarmupSkipped("GEMINI_API_KEY 없음")
+
+    async def prime_weather():
+        calls_before = weather_service.upstream_calls
+        refreshed = await weather_service.refresh_all()
+        if refreshed == 0 and weather_service.upstream_calls > calls_before:
+            raise RuntimeError("Open-Meteo 응답 없음 (요청 시 더미/개별 조회)")
+        return f"{refreshed} refreshed"
+
+    await readiness.run("connection_pools", open_pools)
+    await readiness.run("indexes", load_indexes)
+    await readiness.run("models", create_models, required=False)
+    await readiness.run("gemini", ping_gemini, required=False, timeout=WARMUP_STEP_TIMEOUT)
+    await readiness.run("weather", prime_weather, required=False, timeout=WARMUP_STEP_TIMEOUT)
+    readiness.finish()
+    print(f"🔥 워밍업 완료 (ready={readiness.ready})")
+
+
+background_tasks: List[asyncio.Task] = []
+
+
+@app.on_event("startup")
+async def on_startup():
+    bulk_refresh = os.getenv("WEATHER_BULK_REFRESH", "1") == "1"
+    # 구독 중인 오늘의 추천 채널의 날씨 구간 변화 감시 (구독자가 없으면 할 일 없음)
+    background_tasks.append(asyncio.create_task(push_service.run_watch_loop()))
+
+    # SERVICE_WARMUP=1 (기본): 기동 직후 백그라운드 워밍업, 끝나면 /ready 200
+    if os.getenv("SERVICE_WARMUP", "1") == "1":
+        async def warm_up_then_refresh():
+            await warm_up_services()
+            # 도시 + 사무실 날씨를 주기적으로 한 번의 요청으로 갱신 → 개별 요청은 캐시에서 응답
+            if bulk_refresh:
+                await weather_service.run_refresh_loop(initial_delay=weather_service.cache_ttl * 0.9)
+
+        background_tasks.append(asyncio.create_task(warm_up_then_refresh()))
+        return
+
+    # 워밍업 없이 바로 준비 완료 (첫 사용 시 로딩)
+    readiness.start()
+    readiness.finish()
+    if bulk_refresh:
+        background_tasks.append(asyncio.create_task(weather_service.run_refresh_loop()))
+
+
+async def drain_in_flight(timeout: float) -> None:
+    """
+    진행 중인 비동기 작업 / LLM 호출이 끝날 때까지 대기 (SIGTERM 종료, serve.py)
+    uvicorn 이 연결 중인 요청을 다 보낸 뒤에도 백그라운드 작업은 남아 있을 수 있다.
+    끝까지 돌면 결과가 공유 캐시에 남아 다른 워커로 재시도한 요청이 다시 호출하지 않는다.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        jobs = job_manager.stats()
+        llm = llm_admission.stats()
+        pending = jobs["queued"] + jobs["running"] + llm["active"] + llm["queued"]
+        if not pending:
+            return
+        if time.monotonic() >= deadline:
+            print(f"⚠️ 종료 대기 시간 초과: 작업 {jobs['queued'] + jobs['running']}개, LLM 호출 {llm['active']}개 중단")
+            return
+        await asyncio.sleep(0.1)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for task in background_tasks:
+        task.cancel()
+    await drain_in_flight(float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "20")))
+    await push_service.aclose()
+    await job_manager.stop()
+    await place_service.aclose()
+    await weather_service.aclose()
+    await trace_exporter.aclose()
+    await capture_writer.aclose()
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """LLM 대기열 초과 → 빠른 429 (재시도 시점 안내)"""
+    return ORJSONResponse(
+        status_code=429,
+        content={"success": False, "detail": str(exc), "reason": exc.reason},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))},
+    )
+
+
+def _client_id(http_request: Request) -> str:
+    """공정 분배용 클라이언트 식별자 (X-Client-Id 헤더 > 접속 IP)"""
+    client_id = http_request.headers.get("X-Client-Id")
+    if client_id:
+        return client_id[:64]
+    return http_request.client.host if http_request.client else "anonymous"
+
+
+def _require_admin(http_request: Request) -> None:
+    """관리자 API 인증 (ADMIN_TOKEN 미설정이면 관리자 API 자체를 막는다)"""
+    admin_token = os.getenv("ADMIN_TOKEN", "")
+    provided = http_request.headers.get("X-Admin-Token", "")
+    if not admin_token or not secrets.compare_digest(provided.encode(), admin_token.encode()):
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
 
-# Request 모델
-class CafeteriaMenuRequest(BaseModel):
-    location: str = "서울"
-    cafeteria_menu: Optional[str] = None  # 구내식당 메뉴 (텍스트, 선택)
-    image_data: Optional[str] = None  # Base64 인코딩된 이미지 (선택)
-    user_location: Optional[Dict] = None  # 위도, 경도
-    prefer_external: bool = True  # 외부식당 선호 (CAM 모드)
-    daily_menus: Optional[List[Dict]] = None  # 오늘의 추천 메뉴 리스트 (중복 체크용)
 
 @app.get("/")
 async def root():
@@ -42,102 +233,284 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "weather": "/api/weather?location={location}",
+            "weather-background": "/api/weather/background?sky_condition={sky}&temperature={t}&width={px}",
             "recommend-from-cafeteria": "/api/recommend-from-cafeteria (POST)",
             "daily-recommendations": "/api/daily-recommendations (GET)",
-            "daily-recommendations-refresh": "/api/daily-recommendations-refresh (POST)"
+            "daily-recommendations-refresh": "/api/daily-recommendations-refresh (POST)",
+            "lunch-bundle": "/api/lunch-bundle (POST, Accept: application/x-ndjson 이면 스트리밍)",
+            "jobs": "/api/jobs/{job_id}?wait={seconds} (recommend-from-cafeteria?mode=async 결과)",
+            "sites": "/api/sites (GET, 요청에 site_id 를 보내면 게시된 오늘 메뉴로 추천)",
+            "site-menu": "/api/admin/sites/{site_id}/menu (POST, X-Admin-Token)",
+            "daily-recommendations-ws": "/ws/daily-recommendations?location={location}&lat=&lng=&site_id= (WebSocket, 바뀔 때만 push)"
         }
     }
 
-@app.get("/api/weather")
+@app.get("/api/weather",
+    response_model=ApiResponse[WeatherData],
+    response_model_exclude_unset=True,
+)
 async def get_weather(location: str = "서울", lat: Optional[float] = None, lng: Optional[float] = None):
     """날씨 정보 조회 (좌표 우선, 없으면 location 사용)"""
     try:
         weather_data = await weather_service.get_weather(location, lat, lng)
         return {
             "success": True,
-            "data": weather_data
+            "data": asset_service.attach(weather_data)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/recommend-from-cafeteria")
-async def recommend_from_cafeteria(request: CafeteriaMenuRequest):
-    """구내식당 메뉴 기반 외부 메뉴 추천 (텍스트 or 이미지 OCR)"""
-    try:
-        # 1. 날씨 정보 가져오기 (사용자 좌표가 있으면 우선 사용)
-        lat = None
-        lng = None
-        if request.user_location:
-            lat = request.user_location.get('latitude')
-            lng = request.user_location.get('longitude')
-            print(f"📍 사용자 좌표 사용: lat={lat}, lng={lng}")
-        
-        weather_data = await weather_service.get_weather(
-            request.location,
-            lat=lat,
-            lng=lng
+
+@app.get("/api/weather/background",
+    response_model=ApiResponse[WeatherBackground],
+    response_model_exclude_unset=True,
+)
+async def get_weather_background(
+    sky_condition: str = "",
+    temperature: Optional[float] = None,
+    location: str = "",
+    width: Optional[int] = None
+):
+    """날씨에 맞는 배경 이미지 (화면 폭에 맞는 변형 URL)"""
+    background = asset_service.select(sky_condition, temperature, seed=location, width=width)
+    if background is None:
+        raise HTTPException(status_code=404, detail="변환된 배경 이미지가 없습니다.")
+    return {
+        "success": True,
+        "data": background
+    }
+
+
+@app.get("/api/assets/weather/{filename}")
+async def get_weather_asset(filename: str):
+    """콘텐츠 해시 파일명 → 내용이 바뀌지 않으므로 1년 immutable 캐시"""
+    path = asset_service.file_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+    return FileResponse(
+        path,
+        media_type=asset_service.media_type(filename),
+        headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL},
+    )
+
+def _user_coords(request: CafeteriaMenuRequest):
+    """요청 본문의 사용자 좌표 (없으면 None, None)"""
+    if not request.user_location:
+        return None, None
+    return request.user_location.get('latitude'), request.user_location.get('longitude')
+
+
+@traced("menu.resolve")
+async def _resolve_menu_text(request: CafeteriaMenuRequest, client_id: str):
+    """메뉴 텍스트 결정 (이미지 OCR or 텍스트) → (menu_text, ocr_confidence)"""
+    menu_text = request.cafeteria_menu
+    ocr_confidence = None
+
+    if request.image_data:
+        print("📸 이미지에서 메뉴 추출 중...")
+        # OCR 서비스로 이미지 처리
+        ocr_result = await ocr_service.extract_menu_from_image(
+            request.image_data,
+            fallback_text=request.cafeteria_menu,  # 보조 텍스트
+            client_id=client_id
         )
-        
-        # 2. 메뉴 텍스트 결정 (이미지 OCR or 텍스트)
-        menu_text = request.cafeteria_menu
-        ocr_confidence = None
-        
-        if request.image_data:
-            print("📸 이미지에서 메뉴 추출 중...")
-            # OCR 서비스로 이미지 처리
-            ocr_result = await ocr_service.extract_menu_from_image(
-                request.image_data,
-                fallback_text=request.cafeteria_menu  # 보조 텍스트
-            )
-            
-            # OCR 결과 검증
-            is_valid, error_msg = ocr_service.validate_menu_extraction(ocr_result)
-            
-            if not is_valid:
-                raise HTTPException(status_code=400, detail=error_msg)
-            
-            menu_text = ocr_result["menu_text"]
-            ocr_confidence = ocr_result["confidence"]
-            print(f"✅ OCR 완료: {menu_text[:50]}... (신뢰도: {ocr_confidence})")
-        
-        elif not menu_text:
-            raise HTTPException(
-                status_code=400, 
-                detail="메뉴 텍스트 또는 이미지를 제공해주세요."
-            )
-        
-        # 3. AI 추천 생성 (CAM 모드 지원 + 오늘의 메뉴 중복 체크)
-        recommendation = await ai_service.recommend_from_cafeteria_menu(
-            weather_data,
-            menu_text,
-            request.user_location,
-            request.prefer_external,  # CAM 모드 전달
-            request.daily_menus  # 오늘의 메뉴 전달
+
+        # OCR 결과 검증
+        is_valid, error_msg = ocr_service.validate_menu_extraction(ocr_result)
+
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=error_msg)
+
+        menu_text = ocr_result["menu_text"]
+        ocr_confidence = ocr_result["confidence"]
+        print(f"✅ OCR 완료: {menu_text[:50]}... (신뢰도: {ocr_confidence})")
+
+    elif not menu_text:
+        raise HTTPException(
+            status_code=400,
+            detail="메뉴 텍스트 또는 이미지를 제공해주세요."
         )
-        
-        # OCR 신뢰도 정보 추가
-        if ocr_confidence:
-            recommendation["ocr_confidence"] = ocr_confidence
-            recommendation["extracted_menu"] = menu_text
-        
+
+    return menu_text, ocr_confidence
+
+
+async def _site_publication(request: CafeteriaMenuRequest, required: bool = True):
+    """
+    site_id 가 있으면 (사이트, 오늘 게시된 메뉴) → 없으면 (None, None)
+    게시 전인데 메뉴/이미지도 안 보냈으면 required 일 때 404
+    """
+    if not request.site_id:
+        return None, None
+    site = site_service.get(request.site_id)
+    if site is None:
+        raise HTTPException(status_code=404, detail=f"등록되지 않은 사이트입니다: {request.site_id}")
+    publication = await site_service.publication(site["site_id"])
+    if publication is None and required and not (request.cafeteria_menu or request.image_data):
+        raise HTTPException(status_code=404, detail="오늘 메뉴가 아직 게시되지 않았습니다.")
+    return site, publication
+
+
+async def _cafeteria_recommendation(
+    request: CafeteriaMenuRequest,
+    weather_data: Dict,
+    menu_text: str,
+    ocr_confidence: Optional[str],
+    client_id: str
+) -> Dict:
+    """구내식당 메뉴 기반 AI 추천 (CAM 모드 지원 + 추천 이력 중복 체크)"""
+    recommendation = await ai_service.recommend_from_cafeteria_menu(
+        weather_data,
+        menu_text,
+        request.user_location,
+        request.prefer_external,  # CAM 모드 전달
+        request.daily_menus,  # 오늘의 메뉴 전달
+        client_id=client_id
+    )
+
+    # OCR 신뢰도 정보 추가
+    if ocr_confidence:
+        recommendation["ocr_confidence"] = ocr_confidence
+        recommendation["extracted_menu"] = menu_text
+
+    # 근처 식당 확인 (모든 검색어를 한 번에 조회 → 클라이언트는 따로 검색하지 않아도 됨)
+    lat, lng = _user_coords(request)
+    if lat is None or lng is None:
+        lat, lng = weather_service.get_location_coords(weather_data.get("area") or request.location)
+    await place_service.attach_places(recommendation, lat, lng)
+
+    return recommendation
+
+
+async def _run_cafeteria(request: CafeteriaMenuRequest, client_id: str) -> Dict:
+    """날씨 → 메뉴 텍스트(OCR) → AI 추천 (동기 API / 비동기 작업 공용)"""
+    # 0. 사이트 메뉴가 게시돼 있으면 미리 만든 추천 (+ 개인별 다양성)
+    site, publication = await _site_publication(request)
+    if publication is not None:
+        return await site_service.recommend(site, client_id)
+
+    # 1. 날씨 정보 가져오기 (사용자 좌표가 있으면 우선 사용)
+    lat, lng = _user_coords(request)
+    if lat is not None:
+        print(f"📍 사용자 좌표 사용: lat={lat}, lng={lng}")
+
+    weather_data = await weather_service.get_weather(
+        request.location,
+        lat=lat,
+        lng=lng
+    )
+
+    # 2. 메뉴 텍스트 결정 (이미지 OCR or 텍스트)
+    menu_text, ocr_confidence = await _resolve_menu_text(request, client_id)
+
+    # 3. AI 추천 생성
+    return await _cafeteria_recommendation(
+        request,
+        weather_data,
+        menu_text,
+        ocr_confidence,
+        client_id
+    )
+
+
+@app.post(
+    "/api/recommend-from-cafeteria",
+    response_model=ApiResponse[CafeteriaRecommendation],
+    response_model_exclude_unset=True,
+)
+async def recommend_from_cafeteria(request: CafeteriaMenuRequest, http_request: Request, mode: str = "sync"):
+    """
+    구내식당 메뉴 기반 외부 메뉴 추천 (텍스트 or 이미지 OCR)
+
+    mode=async (또는 Prefer: respond-async) 이면 작업만 등록하고 202 + job_id 를 바로 돌려준다.
+    결과는 GET /api/jobs/{job_id} (?wait=초 long-poll) 또는 /api/jobs/{job_id}/events (SSE).
+    """
+    client_id = _client_id(http_request)
+
+    if mode == "async" or "respond-async" in http_request.headers.get("prefer", ""):
+        job = job_manager.submit(
+            "cafeteria",
+            lambda: _run_cafeteria(request, client_id),
+            client_id=client_id
+        )
+        return ORJSONResponse(
+            status_code=202,
+            content={"success": True, "data": job_manager.snapshot(job)},
+            headers={"Location": f"/api/jobs/{job.id}"},
+        )
+
+    try:
+        recommendation = await _run_cafeteria(request, client_id)
         return {
             "success": True,
             "data": recommendation
         }
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/daily-recommendations")
-async def get_daily_recommendations(location: str = "서울", lat: Optional[float] = None, lng: Optional[float] = None):
+
+# 한 번의 long-poll 최대 대기 (프록시 타임아웃보다 짧게)
+JOB_MAX_WAIT = float(os.getenv("JOB_MAX_WAIT", "25"))
+
+
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업이 없거나 결과 보관 시간이 지났습니다.")
+    return job
+
+
+@app.get("/api/jobs/{job_id}",
+    response_model=ApiResponse[JobStatus],
+    response_model_exclude_unset=True,
+)
+async def get_job(job_id: str, wait: float = 0):
+    """작업 상태 조회 (wait 초 동안 완료를 기다렸다가 응답)"""
+    job = _get_job_or_404(job_id)
+    await job_manager.wait(job, min(max(wait, 0.0), JOB_MAX_WAIT))
+    return {
+        "success": True,
+        "data": job_manager.snapshot(job)
+    }
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """작업 완료 구독 (SSE: status 이벤트 후 끝나면 done 이벤트 한 번)"""
+    job = _get_job_or_404(job_id)
+
+    async def stream():
+        yield b"event: status\ndata: " + orjson.dumps(job_manager.snapshot(job)) + b"\n\n"
+        while not job.finished:
+            await job_manager.wait(job, 15)
+            if not job.finished:
+                yield b": keep-alive\n\n"  # 프록시 유휴 연결 끊김 방지
+        yield b"event: done\ndata: " + orjson.dumps(job_manager.snapshot(job)) + b"\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@app.get("/api/daily-recommendations",
+    response_model=ApiResponse[DailyRecommendations],
+    response_model_exclude_unset=True,
+)
+async def get_daily_recommendations(http_request: Request, location: str = "서울", lat: Optional[float] = None, lng: Optional[float] = None):
     """오늘의 추천 메뉴 3개 조회 (위치 & 날씨 기반)"""
     try:
         # 1. 날씨 정보 가져오기 (좌표 우선)
         weather_data = await weather_service.get_weather(location, lat, lng)
         
-        # 2. AI 오늘의 추천 메뉴 생성
-        recommendations = await ai_service.get_daily_recommendations(weather_data, location)
+        # 2. AI 오늘의 추천 메뉴 생성 (좌표 사용자는 스냅된 지역 기준 → 같은 지역끼리 결과 공유)
+        recommendations = await ai_service.get_daily_recommendations(
+            weather_data,
+            weather_data.get("area") or location,
+            client_id=_client_id(http_request)
+        )
         
         return {
             "success": True,
@@ -146,47 +519,315 @@ async def get_daily_recommendations(location: str = "서울", lat: Optional[floa
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/daily-recommendations-refresh")
-async def refresh_daily_recommendations(request: CafeteriaMenuRequest):
+
+@app.websocket("/ws/daily-recommendations")
+async def daily_recommendations_socket(
+    websocket: WebSocket,
+    location: str = "서울",
+    lat: Optional[float] = None,
+    lng: Optional[float] = None,
+    site_id: Optional[str] = None,
+    client_id: Optional[str] = None
+):
+    """
+    오늘의 추천 구독 (위치 격자 / 사이트 채널)
+
+    연결하면 지금 결과를 바로 한 번 받고, 날씨 구간이 바뀌거나 사이트 메뉴가 게시되면
+    서버가 한 번 계산해서 채널 구독자 전체에 보낸다 → {"type": "daily", "channel", "data"}
+    브라우저 WebSocket 은 헤더를 못 붙이므로 client_id 는 쿼리로 받는다.
+    """
+    channel = push_service.channel_for(location, lat, lng, site_id)
+    # accept 전에 닫으면 HTTP 403 핸드셰이크 거절 → 브라우저는 1006 만 보고 계속 재연결
+    await websocket.accept()
+    if channel is None:
+        await websocket.close(code=CLOSE_UNKNOWN_SITE)
+        return
+
+    if not client_id:
+        client_id = websocket.client.host if websocket.client else "anonymous"
+    try:
+        await push_service.subscribe(websocket, channel, client_id[:64])
+        while True:
+            # 클라이언트 → 서버는 keepalive ping 만
+            if await websocket.receive_text() == "ping":
+                await websocket.send_text('{"type": "pong"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        push_service.unsubscribe(websocket, channel)
+
+@app.post("/api/daily-recommendations-refresh",
+    response_model=ApiResponse[DailyRecommendations],
+    response_model_exclude_unset=True,
+)
+async def refresh_daily_recommendations(request: CafeteriaMenuRequest, http_request: Request):
     """구내식당 메뉴와 연관 낮은 오늘의 메뉴 재생성"""
     try:
         # 1. 날씨 정보 가져오기
-        lat = None
-        lng = None
-        if request.user_location:
-            lat = request.user_location.get('latitude')
-            lng = request.user_location.get('longitude')
-        
+        lat, lng = _user_coords(request)
+
         weather_data = await weather_service.get_weather(
             request.location,
             lat=lat,
             lng=lng
         )
         
-        # 2. 구내식당 메뉴와 연관 낮은 오늘의 메뉴 생성
+        # 2. 구내식당 메뉴와 연관 낮은 오늘의 메뉴 생성 (메뉴를 안 보냈으면 사이트 게시 메뉴)
+        cafeteria_menu = request.cafeteria_menu
+        if not cafeteria_menu:
+            _, publication = await _site_publication(request, required=False)
+            if publication is not None:
+                cafeteria_menu = publication["menu_text"]
+
         recommendations = await ai_service.get_daily_recommendations_with_exclusion(
             weather_data,
-            request.location,
-            request.cafeteria_menu
+            weather_data.get("area") or request.location,
+            cafeteria_menu,
+            client_id=_client_id(http_request)
         )
         
         return {
             "success": True,
             "data": recommendations
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _section_error(exc: Exception) -> Dict:
+    """번들 섹션 실패 → 단독 API와 같은 상태코드/메시지"""
+    if isinstance(exc, AdmissionRejected):
+        return {"status": 429, "detail": str(exc), "reason": exc.reason}
+    if isinstance(exc, HTTPException):
+        return {"status": exc.status_code, "detail": str(exc.detail)}
+    return {"status": 500, "detail": str(exc)}
+
+
+@app.post(
+    "/api/lunch-bundle",
+    response_model=ApiResponse[LunchBundle],
+    response_model_exclude_unset=True,
+)
+async def lunch_bundle(request: CafeteriaMenuRequest, http_request: Request):
+    """
+    날씨 + 오늘의 추천 + 구내식당 추천을 한 번에 (날씨는 한 번만 조회)
+
+    두 추천은 동시에 생성하고, Accept: application/x-ndjson 이면
+    끝나는 섹션부터 한 줄씩 흘려보낸다.
+    """
+    client_id = _client_id(http_request)
+    lat, lng = _user_coords(request)
+    weather_data = await weather_service.get_weather(request.location, lat=lat, lng=lng)
+    area = weather_data.get("area") or request.location
+    site, publication = await _site_publication(request, required=False)
+    has_menu = bool(request.cafeteria_menu or request.image_data or publication)
+
+    async def resolve_menu():
+        if publication is not None:
+            return publication["menu_text"], publication.get("ocr_confidence")
+        return await _resolve_menu_text(request, client_id)
+
+    # 메뉴 텍스트(OCR 포함)는 두 섹션이 같이 기다린다
+    menu_task = asyncio.ensure_future(resolve_menu()) if has_menu else None
+
+    async def daily_section():
+        if menu_task is not None:
+            try:
+                menu_text, _ = await asyncio.shield(menu_task)
+            except Exception:
+                menu_text = None
+            if menu_text:
+                # 구내식당 메뉴와 연관 낮은 오늘의 메뉴
+                return await ai_service.get_daily_recommendations_with_exclusion(
+                    weather_data, area, menu_text, client_id=client_id
+                )
+        return await ai_service.get_daily_recommendations(
+            weather_data, area, client_id=client_id
+        )
+
+    async def cafeteria_section():
+        if publication is not None:
+            return await site_service.recommend(site, client_id)
+        menu_text, ocr_confidence = await asyncio.shield(menu_task)
+        return await _cafeteria_recommendation(
+            request, weather_data, menu_text, ocr_confidence, client_id
+        )
+
+    async def run(name, section):
+        try:
+            return name, await section(), None
+        except Exception as e:
+            return name, None, _section_error(e)
+
+    tasks = [asyncio.ensure_future(run("daily", daily_section))]
+    if has_menu:
+        tasks.append(asyncio.ensure_future(run("cafeteria", cafeteria_section)))
+
+    def cancel_pending():
+        for task in tasks + ([menu_task] if menu_task is not None else []):
+            if not task.done():
+                task.cancel()
+
+    if "application/x-ndjson" in http_request.headers.get("accept", ""):
+        async def stream():
+            try:
+                yield orjson.dumps({"section": "weather", "data": asset_service.attach(weather_data)}) + b"\n"
+                for next_done in asyncio.as_completed(tasks):
+                    name, data, error = await next_done
+                    line = {"section": name, "data": data} if error is None else {"section": name, "error": error}
+                    yield orjson.dumps(line) + b"\n"
+                yield orjson.dumps({"section": "done"}) + b"\n"
+            finally:
+                # 클라이언트가 끊으면 남은 LLM 호출도 정리
+                cancel_pending()
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    try:
+        results = await asyncio.gather(*tasks)
+    finally:
+        cancel_pending()
+
+    bundle = {"weather": asset_service.attach(weather_data), "errors": {}}
+    for name, data, error in results:
+        if error is None:
+            bundle[name] = data
+        else:
+            bundle["errors"][name] = error
+    return {
+        "success": True,
+        "data": bundle
+    }
+
+@app.get("/api/sites",
+    response_model=ApiResponse[List[Site]],
+    response_model_exclude_unset=True,
+)
+async def list_sites():
+    """등록된 사이트 목록 (오늘 메뉴 게시 여부 포함)"""
+    return {
+        "success": True,
+        "data": await site_service.list()
+    }
+
+
+@app.post("/api/admin/sites/{site_id}/menu",
+    response_model=ApiResponse[SitePublication],
+    response_model_exclude_unset=True,
+)
+async def publish_site_menu(site_id: str, request: SiteMenuPublish, http_request: Request):
+    """
+    사이트 오늘 메뉴 게시 (관리자, X-Admin-Token)
+
+    OCR 과 추천은 여기서 한 번만 하고, 직원 요청(site_id)은 미리 만든 결과를 받는다.
+    """
+    _require_admin(http_request)
+    site = site_service.get(site_id)
+    if site is None:
+        raise HTTPException(status_code=404, detail=f"등록되지 않은 사이트입니다: {site_id}")
+
+    client_id = f"site:{site_id}"
+    try:
+        menu_text, ocr_confidence = await _resolve_menu_text(
+            CafeteriaMenuRequest(cafeteria_menu=request.cafeteria_menu, image_data=request.image_data),
+            client_id
+        )
+        publication = await site_service.publish(site, menu_text, ocr_confidence)
+        # 이 사이트 채널 구독자에게 새 메뉴 기준 오늘의 추천 push
+        push_service.notify(f"site:{site_id}")
+        return {
+            "success": True,
+            "data": publication
+        }
+    except (HTTPException, AdmissionRejected):
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
 @app.get("/health")
 async def health_check():
-    """헬스 체크"""
-    return {"status": "healthy"}
+    """헬스 체크 (프로세스 생존 여부, 트래픽 수신 여부는 /ready)"""
+    return {
+        "status": "healthy",
+        "ready": readiness.ready,
+        "llm_admission": llm_admission.stats(),
+        "llm_json": llm_json_metrics.stats(),
+        "llm_usage": llm_usage.stats(),
+        "jobs": job_manager.stats(),
+        "sites": site_service.stats(),
+        "push": push_service.stats(),
+    }
+
+
+@app.get("/ready")
+async def ready_check():
+    """준비 상태 (워밍업이 끝나고 필수 단계가 모두 성공해야 200, 아니면 503)"""
+    report = readiness.report()
+    return ORJSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus 텍스트 포맷 (작업 큐 깊이 / LLM 입장 제어 / 토큰 사용량 / JSON 파싱 결과)"""
+    jobs = job_manager.stats()
+    admission = llm_admission.stats()
+    lines = [
+        "# HELP lunch_jobs_queued Jobs waiting for a worker",
+        "# TYPE lunch_jobs_queued gauge",
+        f"lunch_jobs_queued {jobs['queued']}",
+        "# HELP lunch_jobs_running Jobs currently running",
+        "# TYPE lunch_jobs_running gauge",
+        f"lunch_jobs_running {jobs['running']}",
+        "# HELP lunch_jobs_stored Jobs kept in memory (including finished, until TTL)",
+        "# TYPE lunch_jobs_stored gauge",
+        f"lunch_jobs_stored {jobs['stored']}",
+        "# HELP lunch_jobs_submitted_total Jobs accepted",
+        "# TYPE lunch_jobs_submitted_total counter",
+        f"lunch_jobs_submitted_total {jobs['submitted_total']}",
+        "# HELP lunch_jobs_finished_total Jobs finished by outcome",
+        "# TYPE lunch_jobs_finished_total counter",
+        *(f'lunch_jobs_finished_total{{status="{k}"}} {v}' for k, v in jobs["finished_total"].items()),
+        "# HELP lunch_jobs_rejected_total Jobs rejected because the queue was full",
+        "# TYPE lunch_jobs_rejected_total counter",
+        f"lunch_jobs_rejected_total {jobs['rejected_total']}",
+        "# HELP lunch_llm_active LLM calls in flight",
+        "# TYPE lunch_llm_active gauge",
+        f"lunch_llm_active {admission['active']}",
+        "# HELP lunch_llm_queued LLM calls waiting for admission",
+        "# TYPE lunch_llm_queued gauge",
+        f"lunch_llm_queued {admission['queued']}",
+    ]
+    usage = llm_usage.series()
+    for name, help_text, value in (
+        ("lunch_llm_calls_total", "LLM calls by kind and output mode", lambda st: st["calls"]),
+        ("lunch_llm_prompt_tokens_total", "LLM prompt tokens", lambda st: st["prompt_tokens"]),
+        ("lunch_llm_output_tokens_total", "LLM output tokens", lambda st: st["output_tokens"]),
+        ("lunch_llm_truncated_total", "LLM responses cut at max_output_tokens", lambda st: st["truncated"]),
+        ("lunch_llm_call_seconds_sum", "Total LLM call latency", lambda st: round(st["latency_ms"] / 1000, 3)),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        lines += [f'{name}{{kind="{kind}",mode="{mode}"}} {value(stats)}' for kind, mode, stats in usage]
+    lines += [
+        "# HELP lunch_llm_json_total LLM JSON parse outcomes",
+        "# TYPE lunch_llm_json_total counter",
+        *(
+            f'lunch_llm_json_total{{kind="{kind}",outcome="{outcome}"}} {counts[outcome]}'
+            for kind, counts in llm_json_metrics.stats().items()
+            for outcome in llm_json_metrics.OUTCOMES
+        ),
+    ]
+    return "\n".join(lines) + "\n"
 
 if __name__ == "__main__":
+    # 개발용 (코드 변경 시 자동 재시작, 단일 워커) → 운영은 python serve.py
+    import uvicorn
+
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8000,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
         reload=True
     )
 
@@ -0,0 +1,303 @@
+"""
+트래픽 캡처 미들웨어 (선택 기능, 부하 테스트 재생용)
+- CAPTURE_FILE 이 설정돼 있을 때만 설치 (main.py) → 꺼져 있으면 오버헤드 0
+- CAPTURE_SAMPLE_RATE 비율만큼, CAPTURE_PATHS 의 요청만 기록 (기본: 추천 / 오늘의 추천 / 날씨)
+- 한 줄에 요청 하나 (orjson, 짧은 키)
+    t  요청 시각 (epoch 초)      m/p/q  메소드 / 경로 / 쿼리
+    c  클라이언트 가명           h      재생에 필요한 헤더 (prefer, accept-encoding)
+    b  JSON 본문                 s/d/n  응답 상태 / 처리 시간(ms) / 응답 바이트
+- 이미지(base64)는 내용 해시로 CAPTURE_FILE.blobs/ 에 한 번만 저장하고 본문에는 {"$blob": 해시}
+
+개인정보 처리:
+- 클라이언트 식별자(X-Client-Id / IP)는 HMAC 가명으로 (CAPTURE_SALT, 없으면 프로세스마다 랜덤)
+- 좌표는 소수점 CAPTURE_COORD_DECIMALS 자리(기본 2 ≈ 1km)로 반올림
+- 그 밖의 헤더 / 쿠키 / 식별성 키(email, phone 등)는 기록하지 않음
+- 이미지는 EXIF(GPS 좌표, 기기 정보 등) 메타데이터를 빼고 다시 인코딩해서 저장 (Pillow 필요)
+  HTML 식단표는 그대로, 메타데이터를 지울 수 없는 것(PDF, 알 수 없는 형식, Pillow 없음)은 저장하지 않음
+  → 재생 시 그 요청은 건너뜀
+
+재생: python tools/replay.py capture.jsonl --speed 2
+"""
+
+import asyncio
+import base64
+import binascii
+import contextvars
+import hashlib
+import hmac
+import io
+import os
+import random
+import secrets
+import time
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl
+
+import orjson
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_CAPTURE_PATHS = "/api/recommend-from-cafeteria,/api/daily-recommendations,/api/weather"
+REPLAY_HEADERS = (b"prefer", b"accept-encoding")
+COORD_KEYS = {"lat", "lng", "latitude", "longitude"}
+DROP_KEYS = {"email", "phone", "name", "user_id", "client_id", "token", "password", "address"}
+BLOB_KEYS = {"image_data"}
+
+
+def capture_configured() -> bool:
+    """캡처 파일이 설정돼 있을 때만 설치"""
+    return bool(os.getenv("CAPTURE_FILE"))
+
+
+def blob_dir_for(capture_file: str) -> str:
+    return capture_file + ".blobs"
+
+
+def scrub_blob(data: bytes) -> Optional[bytes]:
+    """
+    base64 업로드(data URL 가능) → 메타데이터를 뺀 base64, 지울 수 없으면 None (저장하지 않음)
+    이미지는 회전 정보만 픽셀에 반영하고 EXIF / ICC / 텍스트 청크 없이 다시 인코딩한다.
+    """
+    from services.menu_document import detect_document_type
+
+    prefix, _, payload = data.rpartition(b",")
+    try:
+        raw = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+    doc_type = detect_document_type(raw)
+    if doc_type == "html":
+        return data
+    if doc_type is not None:
+        return None  # PDF 는 문서 정보 / 내장 이미지 메타데이터를 지울 수 없음
+
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    try:
+        with Image.open(io.BytesIO(raw)) as image:
+            image_format = "JPEG" if image.format in ("JPEG", "MPO") else "PNG"
+            clean = ImageOps.exif_transpose(image)
+            clean.info = {}
+            if image_format == "JPEG" and clean.mode not in ("RGB", "L"):
+                clean = clean.convert("RGB")
+            out = io.BytesIO()
+            clean.save(out, format=image_format, quality=95)
+    except Exception:
+        return None
+
+    if prefix:
+        prefix = f"data:image/{image_format.lower()};base64".encode()
+    encoded = base64.b64encode(out.getvalue())
+    return prefix + b"," + encoded if prefix else encoded
+
+
+class CaptureWriter:
+    """캡처 레코드를 모아 주기적으로 파일에 붙인다 (요청 경로에서는 append 만)"""
+
+    def __init__(self, file_path: Optional[str] = None):
+        self.file_path = file_path if file_path is not None else os.getenv("CAPTURE_FILE", "")
+        self.blob_dir = blob_dir_for(self.file_path)
+        self.interval = float(os.getenv("CAPTURE_FLUSH_INTERVAL", "1"))
+        self.max_pending = int(os.getenv("CAPTURE_MAX_PENDING", "4096"))
+        self._pending: List[bytes] = []
+        self._blobs: Dict[str, bytes] = {}
+        self._written_blobs = set()
+        self._task: Optional[asyncio.Task] = None
+        self.written_total = 0
+        self.dropped_total = 0
+
+    def submit(self, record: Dict, blobs: Dict[str, bytes]) -> None:
+        if not self.file_path:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped_total += 1  # 디스크가 밀리면 버린다 (요청 처리 우선)
+            return
+        self._pending.append(orjson.dumps(record))
+        for digest, data in blobs.items():
+            if digest not in self._written_blobs:
+                self._blobs[digest] = data
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._pending and not self._blobs:
+            return
+        lines, self._pending = self._pending, []
+        blobs, self._blobs = self._blobs, {}
+        try:
+            await asyncio.to_thread(self._write, lines, blobs)
+            self.written_total += len(lines)
+        except Exception as e:
+            self.dropped_total += len(lines)
+            print(f"⚠️ 트래픽 캡처 저장 실패: {e}")
+
+    def _write(self, lines: List[bytes], blobs: Dict[str, bytes]) -> None:
+        if blobs:
+            os.makedirs(self.blob_dir, exist_ok=True)
+        for digest, data in blobs.items():
+            path = os.path.join(self.blob_dir, digest)
+            if not os.path.exists(path):
+                # 디코딩 / 재인코딩은 여기서 (쓰기 스레드, 요청 경로 밖)
+                clean = scrub_blob(data)
+                if clean is not None:
+                    with open(path, "wb") as f:
+                        f.write(clean)
+            self._written_blobs.add(digest)
+        if lines:
+            with open(self.file_path, "ab") as f:
+                f.write(b"\n".join(lines) + b"\n")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        await self.flush()
+
+
+class CaptureMiddleware:
+    """선택된 요청의 본문/쿼리를 개인정보를 지운 채 기록"""
+
+    def __init__(
+        self,
+        app,
+        writer: Optional[CaptureWriter] = None,
+        sample_rate: Optional[float] = None,
+        paths: Optional[str] = None,
+    ):
+        self.app = app
+        self.writer = writer or capture_writer
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("CAPTURE_SAMPLE_RATE", "0.1"))
+        self.paths = {
+            p.strip() for p in (paths or os.getenv("CAPTURE_PATHS", DEFAULT_CAPTURE_PATHS)).split(",") if p.strip()
+        }
+        self.max_body = int(os.getenv("CAPTURE_MAX_BODY", str(8 * 1024 * 1024)))
+        self.coord_decimals = int(os.getenv("CAPTURE_COORD_DECIMALS", "2"))
+        self._salt = (os.getenv("CAPTURE_SALT") or secrets.token_hex(16)).encode()
+        print(
+            f"🎥 트래픽 캡처 활성화 (sample_rate={self.sample_rate}, "
+            f"{sorted(self.paths)} → {self.writer.file_path})"
+        )
+
+    # =======================================================================
+    # 개인정보 제거
+    # =======================================================================
+    def _pseudonym(self, client_id: str) -> str:
+        return hmac.new(self._salt, client_id.encode("utf-8"), hashlib.sha256).hexdigest()[:12]
+
+    def _scrub(self, value, blobs: Dict[str, bytes], key: str = ""):
+        if isinstance(value, dict):
+            return {
+                k: self._scrub(v, blobs, k)
+                for k, v in value.items() if k.lower() not in DROP_KEYS
+            }
+        if isinstance(value, list):
+            return [self._scrub(v, blobs, key) for v in value]
+        if key in COORD_KEYS and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return round(float(value), self.coord_decimals)
+        if key in BLOB_KEYS and isinstance(value, str) and value:
+            data = value.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:32]
+            blobs[digest] = data
+            return {"$blob": digest}
+        return value
+
+    def _scrub_query(self, query_string: bytes) -> Dict[str, str]:
+        query = {}
+        for key, value in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+            if key.lower() in DROP_KEYS:
+                continue
+            if key in COORD_KEYS:
+                try:
+                    value = str(round(float(value), self.coord_decimals))
+                except ValueError:
+                    continue
+            query[key] = value
+        return query
+
+    # =======================================================================
+    # ASGI
+    # =======================================================================
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["path"] not in self.paths
+            or not (self.sample_rate >= 1 or random.random() < self.sample_rate)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        chunks: List[bytes] = []
+        body_size = 0
+        response = {"status": 0, "bytes": 0}
+
+        async def capture_receive():
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                body_size += len(body)
+                if body_size <= self.max_body:
+                    chunks.append(body)
+            return message
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, capture_receive, capture_send)
+        finally:
+            self._record(scope, chunks, body_size, response, started)
+
+    def _record(self, scope, chunks: List[bytes], body_size: int, response: Dict, started: float) -> None:
+        headers = {}
+        client_id = ""
+        for key, value in scope.get("headers", []):
+            if key == b"x-client-id":
+                client_id = value.decode("latin-1")[:64]
+            elif key in REPLAY_HEADERS:
+                headers[key.decode()] = value.decode("latin-1")
+        if not client_id and scope.get("client"):
+            client_id = scope["client"][0]
+
+        record = {
+            "t": round(time.time() - (time.perf_counter() - started), 3),
+            "m": scope["method"],
+            "p": scope["path"],
+            "c": self._pseudonym(client_id or "anonymous"),
+            "s": response["status"],
+            "d": round((time.perf_counter() - started) * 1000, 1),
+            "n": response["bytes"],
+        }
+        query = self._scrub_query(scope.get("query_string", b""))
+        if query:
+            record["q"] = query
+        if headers:
+            record["h"] = headers
+
+        blobs: Dict[str, bytes] = {}
+        if body_size:
+            if body_size > self.max_body:
+                record["bt"] = body_size  # 너무 커서 본문 생략 (재생 시 건너뜀)
+            else:
+                try:
+                    record["b"] = self._scrub(orjson.loads(b"".join(chunks)), blobs)
+                except orjson.JSONDecodeError:
+                    record["bt"] = body_size
+        self.writer.submit(record, blobs)
+
+
+# 싱글톤 인스턴스 (종료 시 main.py 가 남은 레코드를 flush)
+capture_writer = CaptureWriter()
@@ -0,0 +1,199 @@
+"""
+HTTP 캐시 미들웨어
+- GET 응답에 강한 ETag (요청 경로/쿼리 + 본문 해시)
+- If-None-Match 일치 시 304 (본문 없음)
+- 경로별 Cache-Control max-age (날씨 TTL과 맞춤)
+- Accept-Encoding 협상으로 br / gzip 압축 (brotli 패키지가 없으면 gzip만)
+
+스트리밍 응답(SSE, NDJSON), 이미지, 이미 압축된 응답은 건드리지 않고 그대로 흘려보낸다.
+"""
+
+import gzip
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+STREAMING_TYPES = (b"text/event-stream", b"application/x-ndjson")
+# 이미 압축된 포맷 + 자체 캐시 헤더 (버퍼링/재압축 불필요)
+PASSTHROUGH_TYPES = STREAMING_TYPES + (b"image/",)
+
+
+def _parse_accept_encoding(header: str) -> Dict[str, float]:
+    """'gzip, br;q=0.9, *;q=0' → {"gzip": 1.0, "br": 0.9, "*": 0.0}"""
+    result = {}
+    for part in header.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        result[name.strip().lower()] = q
+    return result
+
+
+def choose_encoding(header: str) -> Optional[str]:
+    """서버가 지원하는 인코딩 중 클라이언트 선호도가 가장 높은 것"""
+    accepted = _parse_accept_encoding(header or "")
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_q = None, 0.0
+    for name in candidates:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 비교 (W/ 접두어와 -gzip/-br 접미어는 무시하는 약한 비교)"""
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        for suffix in ("-gzip", "-br"):
+            if tag.endswith(suffix):
+                tag = tag[: -len(suffix)]
+        return tag
+
+    target = opaque(etag)
+    return any(opaque(tag) == target for tag in if_none_match.split(","))
+
+
+class HTTPCacheMiddleware:
+    """ETag / 304 / Cache-Control / 압축을 한 번에 처리하는 ASGI 미들웨어"""
+
+    def __init__(
+        self,
+        app,
+        max_age: Optional[Dict[str, int]] = None,
+        minimum_size: int = 500,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+    ):
+        self.app = app
+        self.max_age = max_age or {}
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {k.decode().lower(): v.decode() for k, v in scope.get("headers", [])}
+        method = scope["method"]
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        conditional = method in ("GET", "HEAD")
+
+        if not conditional and encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        body_parts: List[bytes] = []
+        passthrough = False
+
+        async def buffered_send(message):
+            nonlocal start_message, passthrough
+
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = dict((k.lower(), v) for k, v in message.get("headers", []))
+                content_type = headers.get(b"content-type", b"")
+                if (
+                    any(content_type.startswith(t) for t in PASSTHROUGH_TYPES)
+                    or b"content-encoding" in headers
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._finish(scope, request_headers, encoding, start_message, b"".join(body_parts), send)
+
+        await self.app(scope, receive, buffered_send)
+
+    def _cache_control(self, path: str) -> str:
+        for prefix, seconds in self.max_age.items():
+            if path.startswith(prefix):
+                return f"private, max-age={seconds}"
+        return "no-cache"
+
+    async def _finish(
+        self,
+        scope,
+        request_headers: Dict[str, str],
+        encoding: Optional[str],
+        start_message,
+        body: bytes,
+        send,
+    ) -> None:
+        status = start_message["status"]
+        headers: List[Tuple[bytes, bytes]] = [
+            (k, v) for k, v in start_message.get("headers", [])
+            if k.lower() not in (b"content-length", b"etag", b"cache-control")
+        ]
+        existing = dict((k.lower(), v) for k, v in start_message.get("headers", []))
+
+        # 1) 조건부 GET: ETag / 304
+        if scope["method"] in ("GET", "HEAD") and status == 200:
+            cache_key = scope["path"] + "?" + scope.get("query_string", b"").decode()
+            digest = hashlib.sha256(cache_key.encode() + b"\0" + body).hexdigest()[:32]
+            etag = f'"{digest}"'
+            cache_control = existing.get(b"cache-control", self._cache_control(scope["path"]).encode())
+
+            if _etag_matches(request_headers.get("if-none-match", ""), etag):
+                not_modified = [
+                    (k, v) for k, v in headers
+                    if k.lower() not in (b"content-type",)
+                ]
+                not_modified += [
+                    (b"etag", etag.encode()),
+                    (b"cache-control", cache_control),
+                    (b"vary", b"Accept-Encoding"),
+                ]
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            if encoding and len(body) >= self.minimum_size:
+                etag = f'"{digest}-{encoding}"'
+            headers.append((b"etag", etag.encode()))
+            headers.append((b"cache-control", cache_control))
+        elif b"cache-control" in existing:
+            headers.append((b"cache-control", existing[b"cache-control"]))
+
+        # 2) 압축
+        headers.append((b"vary", b"Accept-Encoding"))
+        if encoding and len(body) >= self.minimum_size:
+            if encoding == "br":
+                body = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(body, compresslevel=self.gzip_level)
+            headers.append((b"content-encoding", encoding.encode()))
+
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body if scope["method"] != "HEAD" else b""})
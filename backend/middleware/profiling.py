@@ -0,0 +1,123 @@
+"""
+요청 단위 프로파일링 미들웨어 (선택 기능)
+- 관리자 헤더 (X-Profile: <PROFILE_ADMIN_TOKEN>) 또는 샘플링 비율 (PROFILE_SAMPLE_RATE) 로 켜진 요청만
+  pyinstrument 통계 프로파일러로 감싼다 (async_mode → await 대기 시간까지 포함)
+- 결과는 PROFILE_DIR 에 트레이스 ID 를 붙여 저장
+    PROFILE_FORMAT=speedscope (기본, https://www.speedscope.app 에서 열기) | html (플레임그래프)
+- 동시에 하나만 프로파일링 (겹치는 요청은 그냥 통과)
+
+설정이 없으면 main.py 가 미들웨어를 아예 설치하지 않는다 → 꺼져 있을 때 오버헤드 0.
+"""
+
+import asyncio
+import os
+import random
+import re
+import secrets
+import time
+from typing import Optional
+
+from services.tracing import current_trace
+
+PROFILE_HEADER = b"x-profile"
+
+
+def profiling_configured() -> bool:
+    """관리자 토큰이나 샘플링 비율이 설정돼 있을 때만 설치"""
+    return bool(os.getenv("PROFILE_ADMIN_TOKEN")) or float(os.getenv("PROFILE_SAMPLE_RATE", "0")) > 0
+
+
+class ProfilingMiddleware:
+    """선택된 요청만 pyinstrument 로 프로파일링해서 파일로 남긴다"""
+
+    def __init__(
+        self,
+        app,
+        admin_token: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        output_dir: Optional[str] = None,
+        output_format: Optional[str] = None,
+        interval: Optional[float] = None,
+    ):
+        from pyinstrument import Profiler  # 선택 의존성, 설치될 때만 로드
+
+        self.app = app
+        self._profiler_class = Profiler
+        self.admin_token = admin_token or os.getenv("PROFILE_ADMIN_TOKEN", "")
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+        self.output_dir = output_dir or os.getenv("PROFILE_DIR", os.path.join(".cache", "profiles"))
+        self.output_format = (output_format or os.getenv("PROFILE_FORMAT", "speedscope")).lower()
+        self.interval = interval or float(os.getenv("PROFILE_INTERVAL", "0.001"))
+        self._busy = False
+        self.profiled_total = 0
+        self.skipped_busy = 0
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(
+            f"🔬 프로파일링 활성화 (sample_rate={self.sample_rate}, "
+            f"admin_header={'on' if self.admin_token else 'off'}, {self.output_format} → {self.output_dir})"
+        )
+
+    def _requested_by_admin(self, scope) -> bool:
+        if not self.admin_token:
+            return False
+        for key, value in scope.get("headers", []):
+            if key == PROFILE_HEADER:
+                return secrets.compare_digest(value.decode("latin-1"), self.admin_token)
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        by_admin = self._requested_by_admin(scope)
+        if not by_admin and not (self.sample_rate and random.random() < self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        if self._busy:
+            # pyinstrument 는 스레드당 프로파일러 하나 → 겹치면 이번 요청은 건너뜀
+            self.skipped_busy += 1
+            await self.app(scope, receive, send)
+            return
+
+        trace = current_trace()
+        trace_id = trace.trace_id if trace is not None else secrets.token_hex(16)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        extension = "html" if self.output_format == "html" else "speedscope.json"
+        filename = f"{time.strftime('%Y%m%d-%H%M%S')}-{trace_id}-{scope['method']}-{slug}.{extension}"
+
+        async def profiled_send(message):
+            if message["type"] == "http.response.start" and by_admin:
+                headers = list(message.get("headers", [])) + [(b"x-profile-id", filename.encode())]
+                message = dict(message, headers=headers)
+            await send(message)
+
+        self._busy = True
+        profiler = self._profiler_class(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, profiled_send)
+        finally:
+            profiler.stop()
+            self._busy = False
+            self.profiled_total += 1
+            # 렌더링/저장은 스레드에서 (응답은 이미 나갔지만 이벤트 루프를 막지 않게)
+            await asyncio.to_thread(self._write, profiler, filename)
+
+    def _write(self, profiler, filename: str) -> None:
+        try:
+            if self.output_format == "html":
+                from pyinstrument.renderers import HTMLRenderer
+
+                output = profiler.output(HTMLRenderer())
+            else:
+                from pyinstrument.renderers import SpeedscopeRenderer
+
+                output = profiler.output(SpeedscopeRenderer())
+            path = os.path.join(self.output_dir, filename)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(output)
+            print(f"🔬 프로파일 저장: {path}")
+        except Exception as e:
+            print(f"⚠️ 프로파일 저장 실패: {e}")
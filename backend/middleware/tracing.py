@@ -0,0 +1,77 @@
+"""
+트레이싱 미들웨어
+- 요청마다 트레이스 시작 (W3C traceparent 가 오면 그 trace id 를 이어받음)
+- 루트 span "METHOD /path" + 응답 헤더 X-Trace-Id
+- TRACE_SERVER_TIMING=1 이면 Server-Timing 헤더로 단계별 시간 요약
+- 응답이 끝나면 트레이스를 내보내기 큐에 넣는다 (services/tracing.py)
+
+가장 바깥에 두어야 캐시/압축 미들웨어 시간까지 total 에 들어간다.
+"""
+
+import os
+
+from services.tracing import (
+    SPAN_KIND_SERVER,
+    STATUS_ERROR,
+    new_trace,
+    parse_traceparent,
+    server_timing_header,
+    start_span,
+    trace_exporter,
+)
+
+
+class TracingMiddleware:
+    """요청 단위 트레이스 + X-Trace-Id / Server-Timing 헤더"""
+
+    def __init__(self, app, server_timing: bool = None):
+        self.app = app
+        if server_timing is None:
+            server_timing = os.getenv("TRACE_SERVER_TIMING", "0") == "1"
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = ""
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        trace_id, parent_span_id = parse_traceparent(traceparent)
+
+        with new_trace(trace_id, parent_span_id) as trace:
+            root = start_span(
+                f"{scope['method']} {scope['path']}",
+                kind=SPAN_KIND_SERVER,
+                **{"http.method": scope["method"], "http.target": scope["path"]},
+            )
+
+            async def traced_send(message):
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    root.set_attribute("http.status_code", status)
+                    if status >= 500:
+                        root.status = STATUS_ERROR
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-trace-id", trace.trace_id.encode()))
+                    if self.server_timing:
+                        headers.append((b"server-timing", server_timing_header(trace, root).encode()))
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, traced_send)
+            except Exception as e:
+                root.record_error(e)
+                raise
+            finally:
+                # 경로 템플릿이 잡혔으면 이름을 "GET /api/jobs/{job_id}" 형태로 (집계용)
+                route = scope.get("route")
+                if route is not None and getattr(route, "path", None):
+                    root.name = f"{scope['method']} {route.path}"
+                    root.set_attribute("http.route", route.path)
+                root.end()
+                trace_exporter.submit(trace)
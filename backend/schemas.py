@@ -0,0 +1,265 @@
+"""
+API 스키마
+요청/응답 Pydantic 모델과 LLM 출력 검증기를 한곳에 모아 둔다.
+
+- 응답 모델은 FastAPI response_model 로 쓰여 pydantic-core(Rust)로 한 번에 직렬화된다
+- LLM 출력은 TypeAdapter 로 "JSON 파싱 + 스키마 검증"을 한 패스에 처리한다 (services/json_repair.py)
+- 응답 모델은 extra="allow" → 서비스가 붙이는 부가 필드(note, area 등)는 그대로 통과
+- 추천 항목은 LLM 구조화 출력의 짧은 키(t, m, why ...)도 받아서 원래 필드명으로 돌려준다
+  (validation_alias 만 쓰므로 API 응답/문서의 필드명은 그대로)
+"""
+
+from typing import Dict, Generic, List, Optional, TypeVar, Union
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter
+
+T = TypeVar("T")
+
+
+class _Payload(BaseModel):
+    """응답 페이로드 공통 설정 (모르는 필드도 보존)"""
+    model_config = ConfigDict(extra="allow")
+
+
+# =======================================================================
+# 요청
+# =======================================================================
+class CafeteriaMenuRequest(BaseModel):
+    location: str = "서울"
+    cafeteria_menu: Optional[str] = None  # 구내식당 메뉴 (텍스트, 선택)
+    image_data: Optional[str] = None  # Base64 인코딩된 이미지 (선택)
+    user_location: Optional[Dict] = None  # 위도, 경도
+    prefer_external: bool = True  # 외부식당 선호 (CAM 모드)
+    daily_menus: Optional[List[Dict]] = None  # 오늘의 추천 메뉴 리스트 (중복 체크용)
+    site_id: Optional[str] = None  # 사이트 ID (관리자가 게시한 오늘 메뉴 + 미리 만든 추천 사용)
+
+
+class SiteMenuPublish(BaseModel):
+    """관리자 메뉴 게시 (텍스트 or 이미지 중 하나)"""
+    cafeteria_menu: Optional[str] = None
+    image_data: Optional[str] = None
+
+
+# =======================================================================
+# 날씨
+# =======================================================================
+class BackgroundSource(_Payload):
+    url: str
+    width: int
+    format: str
+    bytes: Optional[int] = None
+
+
+class WeatherBackground(_Payload):
+    """날씨 배경 이미지 (콘텐츠 해시 URL, 폭/포맷별 변형)"""
+    key: str
+    category: str
+    url: str
+    width: int
+    format: str
+    sources: List[BackgroundSource] = []
+
+
+class WeatherData(_Payload):
+    location: str
+    temperature: float
+    sky_condition: str
+    precipitation: Union[str, float]
+    humidity: Optional[int] = None
+    area: Optional[str] = None  # 스냅된 등록 위치 (캐시 공유 단위)
+    background: Optional[WeatherBackground] = None
+
+
+class WeatherInfo(_Payload):
+    location: Optional[str] = None
+    temperature: Optional[float] = None
+    condition: Optional[str] = None
+    precipitation: Optional[Union[str, float]] = None
+
+
+# =======================================================================
+# 구내식당 기반 추천
+# =======================================================================
+class Place(_Payload):
+    """근처 식당 (카카오 로컬 검색 결과 필드 그대로)"""
+    id: str
+    place_name: str
+    x: str
+    y: str
+    distance: str = ""
+    category_name: str = ""
+    phone: str = ""
+    address_name: str = ""
+    road_address_name: str = ""
+    place_url: str = ""
+
+
+class CafeteriaRecommendationItem(_Payload):
+    type: str = Field("", validation_alias=AliasChoices("type", "t"))
+    restaurant_name: Optional[str] = Field(None, validation_alias=AliasChoices("restaurant_name", "rn"))
+    place_id: Optional[str] = Field(None, validation_alias=AliasChoices("place_id", "pid"))
+    minutes_away: Optional[int] = Field(None, validation_alias=AliasChoices("minutes_away", "min"))
+    menu_name: Optional[str] = Field(None, validation_alias=AliasChoices("menu_name", "m"))
+    reason: str = Field("", validation_alias=AliasChoices("reason", "why"))
+    price_range: Optional[str] = Field(None, validation_alias=AliasChoices("price_range", "p"))
+    normalized_search_query: Optional[str] = Field(None, validation_alias=AliasChoices("normalized_search_query", "q"))
+    alt_queries: List[str] = Field(default_factory=list, validation_alias=AliasChoices("alt_queries", "aq"))
+    category_group_code: Optional[str] = None
+    places: Optional[List[Place]] = None  # 서버에서 확인한 근처 식당
+
+
+class CafeteriaRecommendation(_Payload):
+    recommendations: List[CafeteriaRecommendationItem] = Field(default_factory=list)
+    brief_rationale: str = ""
+    need_more_info: bool = False
+    missing: List[str] = Field(default_factory=list)
+    cafeteria_menu: Optional[str] = None
+    weather_summary: Optional[str] = None
+    weather_info: Optional[WeatherInfo] = None
+    ocr_confidence: Optional[str] = None
+    extracted_menu: Optional[str] = None
+    site_id: Optional[str] = None  # 사이트 게시 메뉴로 만든 추천일 때
+    published_at: Optional[float] = None
+
+
+# =======================================================================
+# 오늘의 추천
+# =======================================================================
+class DailyRecommendationItem(_Payload):
+    menu_name: str = Field(validation_alias=AliasChoices("menu_name", "m"))
+    category: Optional[str] = Field(None, validation_alias=AliasChoices("category", "c"))
+    price_range: Optional[str] = Field(None, validation_alias=AliasChoices("price_range", "p"))
+    reason: str = Field("", validation_alias=AliasChoices("reason", "why"))
+
+
+class DailyRecommendations(_Payload):
+    recommendations: List[DailyRecommendationItem] = Field(default_factory=list)
+    summary: str = ""
+    weather: Optional[WeatherInfo] = None
+
+
+# =======================================================================
+# 점심 번들 (날씨 + 오늘의 추천 + 구내식당 추천)
+# =======================================================================
+class SectionError(BaseModel):
+    status: int
+    detail: str
+    reason: Optional[str] = None
+
+
+class LunchBundle(BaseModel):
+    weather: WeatherData
+    daily: Optional[DailyRecommendations] = None
+    cafeteria: Optional[CafeteriaRecommendation] = None
+    errors: Dict[str, SectionError] = Field(default_factory=dict)
+
+
+# =======================================================================
+# 사이트 (메뉴 게시 / 팬아웃)
+# =======================================================================
+class Site(BaseModel):
+    site_id: str
+    name: str
+    lat: float
+    lng: float
+    published_at: Optional[float] = None  # 오늘 메뉴 게시 시각 (없으면 미게시)
+
+
+class SitePublication(BaseModel):
+    site_id: str
+    date: str
+    menu_text: str
+    ocr_confidence: Optional[str] = None
+    published_at: float
+    version: str
+    weather_bucket: Optional[str] = None  # 게시하면서 미리 만든 추천의 날씨 구간
+
+
+# =======================================================================
+# 비동기 작업
+# =======================================================================
+class JobStatus(BaseModel):
+    """비동기 작업 상태 (끝나면 result 또는 error)"""
+    job_id: str
+    kind: str
+    status: str  # queued | running | succeeded | failed
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    queue_position: Optional[int] = None
+    result: Optional[CafeteriaRecommendation] = None
+    error: Optional[SectionError] = None
+
+
+# =======================================================================
+# 공통 응답 봉투
+# =======================================================================
+class ApiResponse(BaseModel, Generic[T]):
+    success: bool = True
+    data: T
+
+
+# =======================================================================
+# LLM 출력 검증기 (모듈 로드 시 한 번 컴파일)
+# =======================================================================
+cafeteria_output_adapter = TypeAdapter(CafeteriaRecommendation)
+cafeteria_item_adapter = TypeAdapter(CafeteriaRecommendationItem)
+daily_output_adapter = TypeAdapter(DailyRecommendations)
+daily_item_adapter = TypeAdapter(DailyRecommendationItem)
+
+
+# =======================================================================
+# LLM 구조화 출력 스키마 (Gemini response_schema, OpenAPI 부분집합)
+# - 항목 키는 짧게 → 출력 토큰 절약, 위 모델의 validation_alias 로 원래 이름 복원
+# - 모델이 채울 필요 없는 값(category_group_code 등)은 서버에서 채운다
+# =======================================================================
+RECOMMENDATION_TYPES = ["상위 호환 메뉴", "대체 메뉴", "예외 메뉴"]
+
+CAFETERIA_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recommendations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "t": {"type": "string", "format": "enum", "enum": RECOMMENDATION_TYPES},
+                    "rn": {"type": "string"},
+                    "pid": {"type": "string"},
+                    "min": {"type": "integer"},
+                    "m": {"type": "string"},
+                    "why": {"type": "string"},
+                    "p": {"type": "string"},
+                    "q": {"type": "string"},
+                    "aq": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["t", "rn", "m", "why", "p", "q"],
+            },
+        },
+        "brief_rationale": {"type": "string"},
+        "need_more_info": {"type": "boolean"},
+        "missing": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["recommendations", "need_more_info"],
+}
+
+DAILY_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recommendations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "m": {"type": "string"},
+                    "c": {"type": "string"},
+                    "p": {"type": "string"},
+                    "why": {"type": "string"},
+                },
+                "required": ["m", "c", "p", "why"],
+            },
+        },
+        "summary": {"type": "string"},
+    },
+    "required": ["recommendations", "summary"],
+}
@@ -0,0 +1,98 @@
+"""
+운영용 서버 실행 (python main.py 는 reload=True 단일 워커 → 개발용)
+
+- 워커 수: CPU 코어 수 (컨테이너 CPU affinity 기준, WEB_CONCURRENCY 로 지정 가능)
+- 이벤트 루프 uvloop, HTTP 파서 httptools (설치돼 있지 않으면 asyncio / h11 로 대체)
+- keep-alive 는 로드밸런서 유휴 타임아웃(보통 60s)보다 길게 → LB 가 끊기 전에 서버가 먼저 닫아 생기는 502 방지
+- SIGTERM: 새 연결을 막고 진행 중인 요청(LLM 호출, long-poll 포함)을 GRACEFUL_TIMEOUT 까지 기다린 뒤,
+  종료 훅(main.on_shutdown)이 남은 비동기 작업 / LLM 호출을 SHUTDOWN_DRAIN_TIMEOUT 까지 마저 끝낸다
+
+워커끼리 메모리를 공유하지 않으므로 여러 워커면 CACHE_BACKEND 로 캐시를 공유하는 게 좋다
+(추천 이력 SQLite 는 WAL 모드라 그대로 공유됨).
+
+환경 변수 (괄호는 기본값)
+    APP_MODULE (main:app)      HOST (0.0.0.0)          PORT (8000)
+    WEB_CONCURRENCY (코어 수)   UVICORN_LOOP (uvloop)   UVICORN_HTTP (httptools)
+    KEEPALIVE_TIMEOUT (75)     BACKLOG (2048)          GRACEFUL_TIMEOUT (30)
+    LIMIT_CONCURRENCY (없음)    LIMIT_MAX_REQUESTS (없음, 워커 재시작 주기)
+    FORWARDED_ALLOW_IPS (127.0.0.1)  LOG_LEVEL (info)  ACCESS_LOG (0)
+
+사용:
+    cd backend
+    python serve.py
+    WEB_CONCURRENCY=4 PORT=8080 python serve.py
+    python tools/bench_server.py   # python main.py 실행 방식과 비교
+"""
+
+import importlib.util
+import os
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def default_workers() -> int:
+    """이 프로세스가 쓸 수 있는 CPU 코어 수"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # macOS / Windows
+        return os.cpu_count() or 1
+
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name, "")
+    return int(value) if value else None
+
+
+def server_options() -> Dict:
+    """환경 변수 → uvicorn.run 인자"""
+    loop = os.getenv("UVICORN_LOOP", "uvloop")
+    if loop == "uvloop" and not _installed("uvloop"):
+        print("⚠️ uvloop 이 없어 asyncio 이벤트 루프를 사용합니다 (pip install uvicorn[standard])")
+        loop = "asyncio"
+    http = os.getenv("UVICORN_HTTP", "httptools")
+    if http == "httptools" and not _installed("httptools"):
+        print("⚠️ httptools 가 없어 h11 파서를 사용합니다 (pip install uvicorn[standard])")
+        http = "h11"
+
+    return {
+        "app": os.getenv("APP_MODULE", "main:app"),
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", "8000")),
+        "workers": int(os.getenv("WEB_CONCURRENCY", "0")) or default_workers(),
+        "loop": loop,
+        "http": http,
+        "timeout_keep_alive": int(os.getenv("KEEPALIVE_TIMEOUT", "75")),
+        "backlog": int(os.getenv("BACKLOG", "2048")),
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        "limit_concurrency": _optional_int("LIMIT_CONCURRENCY"),
+        "limit_max_requests": _optional_int("LIMIT_MAX_REQUESTS"),
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "log_level": os.getenv("LOG_LEVEL", "info"),
+        "access_log": os.getenv("ACCESS_LOG", "0") == "1",
+        "lifespan": "on",
+    }
+
+
+def main() -> None:
+    import uvicorn
+
+    options = server_options()
+    print(
+        f"🚀 {options['app']} 실행: http://{options['host']}:{options['port']} "
+        f"(workers={options['workers']}, loop={options['loop']}, http={options['http']}, "
+        f"keepalive={options['timeout_keep_alive']}s, backlog={options['backlog']}, "
+        f"graceful={options['timeout_graceful_shutdown']}s)"
+    )
+    uvicorn.run(**options)
+
+
+if __name__ == "__main__":
+    main()
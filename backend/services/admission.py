@@ -0,0 +1,242 @@
+"""
+Admission Control
+Gemini 호출 앞단에서 동시 실행 수 · 호출 속도 · 클라이언트별 점유량을 제한하는 서비스
+
+- 전역 세마포어: 동시에 나가는 모델 호출 수 제한
+- 토큰 버킷: 초당 호출 수 제한 (프로바이더 rate limit 보호)
+- 클라이언트별 공정 분배: 한 사용자가 슬롯을 독점하지 못하게 제한
+- 우선순위 대기열: 구내식당 추천(대화형)이 오늘의 추천 새로고침(백그라운드)보다 먼저
+- 대기 시간 초과 / 대기열 포화 시 AdmissionRejected → 429 또는 폴백 응답
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 숫자가 작을수록 먼저 처리
+PRIORITY_INTERACTIVE = 0   # 구내식당 추천 / OCR (사용자가 화면 앞에서 기다리는 요청)
+PRIORITY_BACKGROUND = 10   # 오늘의 추천 (밀려도 폴백으로 대체 가능한 요청)
+
+
+class AdmissionRejected(Exception):
+    """대기열 포화 · 대기 시간 초과 · 속도 제한으로 요청을 받지 않을 때"""
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(f"LLM 요청이 몰려 처리하지 못했습니다 ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def try_take(self) -> float:
+        """토큰을 하나 꺼낸다. 성공하면 0, 실패하면 다음 토큰까지 남은 초를 반환"""
+        if self.rate <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "client_id", "future")
+
+    def __init__(self, priority: int, seq: int, client_id: str, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.client_id = client_id
+        self.future = future
+
+    @property
+    def order(self) -> tuple:
+        return (self.priority, self.seq)
+
+
+class AdmissionController:
+    """LLM 호출 입장 제어 (프로세스 단위)"""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+        burst: Optional[int] = None,
+        per_client_limit: Optional[int] = None,
+        per_client_queue: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        interactive_wait: Optional[float] = None,
+        background_wait: Optional[float] = None,
+    ):
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+        self.per_client_limit = per_client_limit or int(
+            os.getenv("LLM_PER_CLIENT_LIMIT", str(max(1, self.max_concurrency // 2)))
+        )
+        self.per_client_queue = per_client_queue or int(os.getenv("LLM_PER_CLIENT_QUEUE", "4"))
+        self.max_queue = max_queue or int(os.getenv("LLM_MAX_QUEUE", "32"))
+        self.interactive_wait = interactive_wait or float(os.getenv("LLM_MAX_QUEUE_WAIT", "8"))
+        self.background_wait = background_wait or float(os.getenv("LLM_BACKGROUND_QUEUE_WAIT", "2"))
+
+        rate = rate_per_sec if rate_per_sec is not None else float(os.getenv("LLM_RATE_PER_SEC", "2"))
+        self.bucket = TokenBucket(rate, burst or int(os.getenv("LLM_RATE_BURST", "5")))
+
+        self._seq = itertools.count()
+        self._active = 0
+        self._active_by_client: Dict[str, int] = defaultdict(int)
+        self._waiters: List[_Waiter] = []
+
+        self.admitted_total = 0
+        self.rejected_total: Dict[str, int] = defaultdict(int)
+
+    # =======================================================================
+    # 공개 API
+    # =======================================================================
+    @asynccontextmanager
+    async def slot(
+        self,
+        client_id: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        max_wait: Optional[float] = None,
+    ):
+        """
+        모델 호출 1회를 감싸는 컨텍스트
+
+        사용:
+            async with llm_admission.slot(client_id, PRIORITY_INTERACTIVE):
+                response = await model.generate_content_async(...)
+        """
+        client_id = client_id or "anonymous"
+        if max_wait is None:
+            max_wait = self.interactive_wait if priority <= PRIORITY_INTERACTIVE else self.background_wait
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+
+        await self._acquire(client_id, priority, deadline)
+        try:
+            await self._take_token(deadline)
+            yield
+        finally:
+            self._release(client_id)
+
+    def stats(self) -> Dict:
+        """현재 상태 (모니터링용)"""
+        queued_by_priority: Dict[int, int] = defaultdict(int)
+        for w in self._waiters:
+            queued_by_priority[w.priority] += 1
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queued": len(self._waiters),
+            "queued_by_priority": dict(queued_by_priority),
+            "admitted_total": self.admitted_total,
+            "rejected_total": dict(self.rejected_total),
+        }
+
+    # =======================================================================
+    # 내부 구현
+    # =======================================================================
+    def _reject(self, reason: str, retry_after: float = 1.0) -> AdmissionRejected:
+        self.rejected_total[reason] += 1
+        print(f"⛔ LLM 요청 거절: {reason} (active={self._active}, queued={len(self._waiters)})")
+        return AdmissionRejected(reason, retry_after)
+
+    async def _acquire(self, client_id: str, priority: int, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+
+        # 한 클라이언트가 대기열을 도배하지 못하게
+        waiting_for_client = sum(1 for w in self._waiters if w.client_id == client_id)
+        if waiting_for_client >= self.per_client_queue:
+            raise self._reject("client_queue_full")
+
+        # 대기열이 꽉 찼으면 더 낮은 우선순위 요청을 밀어내거나 거절
+        if len(self._waiters) >= self.max_queue:
+            victim = max(self._waiters, key=lambda w: w.order)
+            if victim.priority <= priority:
+                raise self._reject("queue_full")
+            self._waiters.remove(victim)
+            victim.future.set_exception(self._reject("preempted"))
+
+        waiter = _Waiter(priority, next(self._seq), client_id, loop.create_future())
+        self._waiters.append(waiter)
+        self._dispatch()
+
+        try:
+            remaining = deadline - loop.time()
+            if not waiter.future.done():
+                await asyncio.wait({waiter.future}, timeout=max(0.0, remaining))
+        except asyncio.CancelledError:
+            # 클라이언트가 끊긴 경우: 이미 입장했다면 자리를 돌려준다
+            self._abandon(waiter)
+            raise
+
+        if not waiter.future.done():
+            self._abandon(waiter)
+            raise self._reject("queue_timeout")
+
+        # 밀려난 경우 여기서 AdmissionRejected가 올라간다
+        waiter.future.result()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+            waiter.future.cancel()
+        elif waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+            self._release(waiter.client_id)
+
+    def _dispatch(self) -> None:
+        """빈 슬롯을 우선순위 순으로, 공정 분배 한도 안에서 배정"""
+        while self._active < self.max_concurrency and self._waiters:
+            chosen = None
+            for w in sorted(self._waiters, key=lambda w: w.order):
+                if self._active_by_client[w.client_id] < self.per_client_limit:
+                    chosen = w
+                    break
+            if chosen is None:
+                # 대기 중인 클라이언트가 모두 자기 몫을 쓰고 있음
+                return
+
+            self._waiters.remove(chosen)
+            self._active += 1
+            self._active_by_client[chosen.client_id] += 1
+            self.admitted_total += 1
+            chosen.future.set_result(True)
+
+    def _release(self, client_id: str) -> None:
+        self._active -= 1
+        self._active_by_client[client_id] -= 1
+        if self._active_by_client[client_id] <= 0:
+            del self._active_by_client[client_id]
+        self._dispatch()
+
+    async def _take_token(self, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            wait = self.bucket.try_take()
+            if wait == 0:
+                return
+            if loop.time() + wait > deadline:
+                raise self._reject("rate_limited", retry_after=wait)
+            await asyncio.sleep(wait)
+
+
+# 싱글톤 인스턴스
+llm_admission = AdmissionController()
@@ -1,142 +1,259 @@
-import google.generativeai as genai
 from typing import Dict, List, Optional
+import hashlib
 import os
-from dotenv import load_dotenv
-import json
 import random
-
-load_dotenv()
+import time
+from datetime import date
+from schemas import (
+    CAFETERIA_RESPONSE_SCHEMA,
+    DAILY_RESPONSE_SCHEMA,
+    cafeteria_output_adapter,
+    cafeteria_item_adapter,
+    daily_output_adapter,
+    daily_item_adapter,
+)
+from services.json_repair import parse_llm_json, LLMJSONError
+from services.prompts import get_prompt_variant
+from services.cache import get_cache
+from services.history_store import history_store
+from services.menu_similarity import menu_index
+from services.genai_client import get_genai, has_api_key, llm_usage
+from services.tracing import span, traced
+from services.admission import (
+    llm_admission,
+    AdmissionRejected,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+)
 
 
 class AIService:
     def __init__(self):
-        # Gemini API 설정
-        api_key = os.getenv("GEMINI_API_KEY")
+        # Gemini API 설정 (모델은 첫 호출 때 만든다 → import/워커 기동이 가볍다)
+        self.use_ai = has_api_key()
+        self._model = None
+        self._daily_model = None
+
+        if self.use_ai:
+            print("✅ Gemini API 키 확인 (고급 프롬프트 시스템, 모델은 지연 로딩)")
+        else:
+            print("⚠️  Gemini API 키가 없습니다. 규칙 기반 추천 로직을 사용합니다.")
+
+        # ✅ 추천 이력 기억 → 같은 입력 여러 번 넣어도 며칠씩 똑같이 안 나오게
+        #    (클라이언트별 영구 이력, 최근 N일 조회는 인덱스로)
+        self.history = history_store
+        self.history_avoid_days = int(os.getenv("HISTORY_AVOID_DAYS", "3"))
+
+        # ✅ "비슷한 메뉴도 제외"는 프롬프트 대신 로컬 유사도 인덱스로 (결정적 + 토큰 절약)
+        self.menu_index = menu_index
+
+        self.cache = get_cache("recommendations")
+        self.daily_cache_ttl = float(os.getenv("DAILY_RECOMMENDATIONS_TTL", "1800"))
+
+        # ✅ 구조화 출력: response_schema + 짧은 키 + 출력 토큰 상한 (0 이면 예전 방식, 전후 비교용)
+        self.structured_output = os.getenv("LLM_STRUCTURED_OUTPUT", "1") == "1"
+        self.max_output_tokens = {
+            "cafeteria": int(os.getenv("LLM_MAX_OUTPUT_TOKENS_CAFETERIA", "768")),
+            "daily": int(os.getenv("LLM_MAX_OUTPUT_TOKENS_DAILY", "512")),
+        }
 
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.use_ai = True
-            print("✅ Gemini API 연결됨 (고급 프롬프트 시스템)")
+        # ✅ 프롬프트 변형 (services/prompts.py, 바꾸기 전에 tools/prompt_bench.py 로 비교)
+        self.prompts = get_prompt_variant(os.getenv("PROMPT_VARIANT", "baseline"))
 
+    @property
+    def model(self):
+        """시스템 인스트럭션이 포함된 추천 모델 (첫 사용 시 생성)"""
+        if self._model is None and self.use_ai:
+            genai = get_genai()
             # 시스템 인스트럭션 정의
             self.system_instruction = self._get_system_instruction()
 
             # 모델 초기화 (시스템 인스트럭션 포함)
-            self.model = genai.GenerativeModel(
+            self._model = genai.GenerativeModel(
                 'gemini-2.0-flash',
                 system_instruction=self.system_instruction
             )
-        else:
-            self.model = None
-            self.use_ai = False
-            print("⚠️  Gemini API 키가 없습니다. 규칙 기반 추천 로직을 사용합니다.")
+            print("✅ Gemini 추천 모델 초기화 완료")
+        return self._model
+
+    @property
+    def daily_model(self):
+        """오늘의 추천용 모델 (호출마다 새로 만들지 않고 재사용)"""
+        if self._daily_model is None and self.use_ai:
+            self._daily_model = get_genai().GenerativeModel('gemini-2.0-flash')
+        return self._daily_model
+
+    def warm_up(self) -> None:
+        """기동 직후 모델을 미리 만들어 첫 요청의 지연을 없앤다"""
+        if self.use_ai:
+            _ = self.model
+            _ = self.daily_model
+
+    async def ping(self) -> bool:
+        """
+        아주 짧은 생성 호출 1회 (기동 워밍업: gRPC 채널/TLS 연결을 미리 열어 둔다)
+        키가 없으면 False (규칙 기반 추천만 사용)
+        """
+        if not self.use_ai:
+            return False
+        response = await self.daily_model.generate_content_async(
+            "ping",
+            generation_config={"max_output_tokens": 1, "temperature": 0},
+        )
+        _ = response.candidates
+        return True
 
-        # ✅ 이전 추천 기억 → 같은 입력 여러 번 넣어도 맨날 똑같이 안 나오게
-        self.last_recommendations: List[Dict] = []
+    # =======================================================================
+    # 생성 설정 / 호출 도우미
+    # =======================================================================
+    @property
+    def output_mode(self) -> str:
+        return "schema" if self.structured_output else "legacy"
+
+    def _output_format(self, kind: str) -> str:
+        """프롬프트에 넣을 출력 형식 안내"""
+        return self.prompts.output_format(kind, self.structured_output)
+
+    def _generation_config(self, kind: str) -> Optional[Dict]:
+        """호출 종류별 생성 설정 (구조화 출력이면 스키마 + 토큰 상한)"""
+        config: Dict = {}
+        if kind == "cafeteria":
+            config = {"response_mime_type": "application/json", "temperature": 0.8}
+        if self.structured_output:
+            config.update({
+                "response_mime_type": "application/json",
+                "response_schema": CAFETERIA_RESPONSE_SCHEMA if kind == "cafeteria" else DAILY_RESPONSE_SCHEMA,
+                "max_output_tokens": self.max_output_tokens[kind],
+            })
+        return config or None
+
+    async def _generate(self, model, kind: str, prompt: str):
+        """모델 호출 1회 (llm.call span + 토큰/지연 기록)"""
+        with span("llm.call", mode=self.output_mode, prompt_variant=self.prompts.name):
+            started = time.perf_counter()
+            response = await model.generate_content_async(
+                prompt,
+                generation_config=self._generation_config(kind)
+            )
+            llm_usage.record(kind, self.output_mode, response, (time.perf_counter() - started) * 1000)
+        return response
+
+    # =======================================================================
+    # 0) 캐시 도우미
+    # =======================================================================
+    def weather_bucket(self, weather: Dict) -> str:
+        """추천 결과를 공유해도 되는 날씨 구간 (상태 + 3°C 단위)"""
+        temp = weather.get("temperature")
+        if temp is None:  # 0°C 는 실제 값 (없을 때만 기본값)
+            temp = 20
+        condition = weather.get("sky_condition", "맑음")
+        return f"{condition}:{int(temp // 3)}"
 
     # =======================================================================
     # 1) 시스템 인스트럭션
     #    - 찌개/국/탕 → 상위호환도 찌개/국/탕
     #    - 볶음/구이/덮밥 → 상위호환도 같은 계열
-    #    - avoidList 들어오면 최대한 피하기
+    #    - 최근 추천과 비슷한 메뉴는 후보 단계에서 로컬로 제외 (menu_similarity)
     #    - 한국 국물일 때 중국 마라계열은 상위호환에 두지 말기
     # =======================================================================
     def _get_system_instruction(self) -> str:
-        return """
-너는 **영양·맛·날씨·거리**를 함께 고려해 점심 메뉴를 추천하는 전문가이며, **JSON만 출력**한다.
-
-**목표:** 사용자의 입력(구내식당 금일 메뉴, 위치, 선호 이동 거리, 날씨)을 바탕으로 **카카오맵에 실제 등록된 인근 음식점**만 사용하여 **최대 3개**의 대안을 추천한다. 가능하면 `상위 호환 메뉴`, `대체 메뉴`, `예외 메뉴`로 각각 1개씩 제시한다.
-
-**매우 중요한 분류 규칙 (이걸 제일 먼저 따른다):**
-1. 원 메뉴가 **찌개/국/탕/전골/국밥/설렁탕/곰탕** 계열(김치찌개, 된장찌개, 순두부, 부대찌개, 감자탕, 설렁탕, 곰탕, 국밥, 육개장 등)이면,
-   - **상위 호환 메뉴도 반드시 찌개/국/탕/전골/국밥 안에서만 뽑는다.**
-   - 예: 김치찌개 → 김치전골, 차돌김치찌개, 부대찌개, 전골 전문점, 한식 정식(김치찌개 포함)
-   - ❌ 김치찌개 → 제육볶음, 돈까스, 닭갈비 → 이건 상위호환이 아니라 **대체 메뉴**로 보내야 한다.
-   - ❌ 김치찌개 → 마라탕/마라샹궈/훠궈 → 이것도 상위호환이 아니라 **대체 메뉴**로 내려야 한다.
-2. 원 메뉴가 **볶음/구이/덮밥** 계열(제육볶음, 닭갈비, 불고기, 돈까스, 카츠, 덮밥 등)이면,
-   - 상위호환은 같은 단백질/같은 조리축에서 한 단계 위(재료↑, 가격↑, 전문점↑)로 올린다.
-   - ❌ 제육볶음 → 김치찌개처럼 국물로 내려가지 않는다.
-3. “예외 메뉴”는 원래 메뉴랑 멀어도 되지만, “대체 메뉴”랑 같은 걸 두 번 내보내지 않는다.
-4. 입력에 `avoidList`가 들어오면 그 안의 `(restaurant_name, menu_name)`은 가능하면 다시 추천하지 않는다. 진짜 후보가 없을 때만 중복을 허용한다.
-
-**추가 금지 규칙 (국물 계열):**
-- 원 메뉴가 한국식 국물(김치찌개, 된장찌개, 순두부, 부대찌개, 감자탕, 설렁탕, 곰탕, 국밥 등)이면
-  상위 호환에 중국식 얼얼한 탕류(마라탕, 마라샹궈, 훠궈 등)를 넣지 않는다.
-  그런 메뉴는 있더라도 **대체 메뉴**나 **예외 메뉴**로만 넣는다.
-
-**출력:** **유효한 JSON만** 허용한다. 코드블록·여분 텍스트·이모지 금지.
-
-각 추천의 설명은 **해당 음식/음식점을 추천하는 이유만**, **1–2문장**, **반말 금지**, **친근하지만 부드러운 톤**으로 작성한다.
-추천 이유에는 **맛·재료·영양·날씨** 중 **최소 2개**의 근거를 반드시 포함한다.
-
-입력 정보가 부족하거나 모호하면 **추측하지 말고** `need_more_info=true`와 `missing` 배열을 반환한다.
-
-카카오맵 등록 음식점 여부는 **입력으로 제공된 후보(nearbyCandidates)**만 신뢰한다.
-
-## 입력 검증 규칙
-- 메뉴명은 **완성형 한글 2자 이상** 또는 **영문/숫자 2자 이상**이어야 한다.
-- **한글 자모(ㄱ/ㄴ/ㅇ/ㅐ 등)**만으로 이루어진 입력은 무효다.
-- 음식으로 보기 어려운 입력(“그림”, “사진”, “이미지”, “파일”, “메뉴”, “추천” 등)은 그대로 에러 JSON을 돌려준다.
-
-## 입력 검증 규칙(중요)
-- 메뉴명은 **완성형 한글 2자 이상** 또는 **영문/숫자 2자 이상**이어야 한다.
-- **한글 자모(ㄱ/ㄴ/ㅇ/ㅐ 등)**만으로 이루어진 입력은 무효다.
-- 입력 토큰이 음식명이 아니라고 추정되면(예: "그림", "사진", "이미지", "파일", "텍스트", "문장", "단어", "테스트", "추천", "메뉴", "배고파" 등) 추천을 시도하지 말고 아래 형식만 반환한다.
-{
-  "recommendations": [],
-  "brief_rationale": "메뉴명이 음식으로 인식되지 않거나 길이가 너무 짧습니다.",
-  "need_more_info": true,
-  "missing": ["valid_food_name(예: 김치찌개/파스타/초밥 등)"]
-}
-
-## 메뉴 추천 전략
-
-### 1. 상위 호환 메뉴
-- 반드시 **같은 조리축** 안에서만 올린다.
-- 찌개/국/탕 → 찌개/국/탕
-- 볶음/구이/덮밥 → 볶음/구이/덮밥
-- 면 → 면
-- 예: 김치찌개 → 김치전골, 부대찌개, 차돌김치찌개
-- 예: 제육볶음 → 흑돼지 제육, 불고기 정식, 삼겹살구이
-- ❌ 김치찌개 → 제육볶음 (이건 밑에 대체로 내려라)
-- ❌ 김치찌개 → 마라탕 (이것도 대체로 내려라)
-
-### 2. 대체 메뉴
-- 같은 한식 밥상 스타일이지만 조리법/메인재료가 다른 메뉴
-- 김치찌개/된장찌개가 들어오면 여기에는 제육볶음/돈까스/순두부/국밥 같은 게 들어올 수 있다.
-- avoidList 안에 있는 건 가능한 빼라.
-
-### 3. 예외 메뉴
-- 원래 메뉴와 카테고리가 달라도 된다.
-- 날씨/거리 기반으로 “지금 먹기 제일 나은” 걸 고른다.
-- 더울 때: 냉면/샐러드/포케
-- 추울 때: 칼국수/우동/전골/라멘
-- 비/눈: 파전/따뜻한 국물
-
-## 필수 제약
-* nearbyCandidates 안에서만 추천
-* distancePref 넘는 건 제외
-* 같은 식당/같은 메뉴 중복 금지
-* 최대 3개
-* avoidList는 최대한 피함
-"""
+        return self.prompts.system_instruction()
 
     # =======================================================================
     # 2) 구내식당 메뉴 기반 추천
     # =======================================================================
+    @traced("ai.cafeteria")
     async def recommend_from_cafeteria_menu(
         self,
         weather: Dict,
         cafeteria_menu: str,
         location: Optional[Dict] = None,
         prefer_external: bool = True,
-        daily_menus: Optional[list] = None
+        daily_menus: Optional[list] = None,
+        client_id: Optional[str] = None
     ) -> Dict:
         """
         고급 프롬프트 시스템으로 구내식당 메뉴 기반 추천
         + 이전 추천 내역을 보내서 중복을 줄이는 버전
         + (여기서 한 번 더) 찌개인데 상위호환이 볶음/마라탕으로 나온 걸 강제로 대체로 돌리는 후처리
         """
+        # 최근 N일 동안 이 클라이언트에게 보여준 것 (오늘의 추천 포함)
+        previous = await self.history.recent(client_id, self.history_avoid_days)
+
+        result = await self._generate_cafeteria_recommendation(
+            weather,
+            cafeteria_menu,
+            location,
+            prefer_external,
+            daily_menus,
+            previous,
+            client_id
+        )
+
+        # ✅ 기록 → 다음 호출에서 피하도록 (폴백도 기록해두면 다음 호출에서 피할 수 있음)
+        await self.history.record(client_id, result.get("recommendations", []), source="cafeteria")
+
+        return result
+
+    async def shared_cafeteria_recommendation(
+        self,
+        weather: Dict,
+        cafeteria_menu: str,
+        location: Dict,
+        client_id: str
+    ) -> Dict:
+        """
+        사이트 공용 추천 (사이트 × 날씨 구간당 한 번, services/site_service.py)
+        client_id 는 사이트 ID → 사이트 단위로 며칠간 같은 추천이 반복되지 않게
+        규칙 기반 후보를 reserve 로 붙여 둔다 (개인 이력에 걸려 빠진 자리를 채울 예비)
+        """
+        result = await self.recommend_from_cafeteria_menu(
+            weather,
+            cafeteria_menu,
+            location,
+            client_id=client_id
+        )
+        chosen = {(r.get("restaurant_name"), r.get("menu_name")) for r in result.get("recommendations", [])}
+        result["reserve"] = [
+            r for r in self._get_fallback_cafeteria_recommendation(weather, cafeteria_menu)["recommendations"]
+            if (r.get("restaurant_name"), r.get("menu_name")) not in chosen
+        ]
+        return result
+
+    async def personalize_shared_recommendation(self, shared: Dict, client_id: Optional[str]) -> Dict:
+        """
+        공용 추천 → 이 사용자용 (LLM 호출 없음)
+        최근 이력과 겹치거나 비슷한 항목은 빼고 reserve 로 채운 뒤, 사용자별로 순서를 섞는다.
+        공용 결과는 캐시 객체라 수정하지 않고 복사본을 만든다.
+        """
+        primary = shared.get("recommendations") or []
+        reserve = shared.get("reserve") or []
+
+        previous = await self.history.recent(client_id, self.history_avoid_days)
+        avoid_menus = [r["menu_name"] for r in previous if r.get("menu_name")]
+        picked = await self._dedupe_recommendations(primary + reserve, client_id, avoid_menus)
+
+        primary_ids = {id(r) for r in primary}
+        chosen = [r for r in picked if id(r) in primary_ids]
+        random.Random(f"{client_id}:{date.today().isoformat()}").shuffle(chosen)
+        chosen += [r for r in picked if id(r) not in primary_ids]
+        chosen = [dict(r) for r in chosen[:max(len(primary), 3)]]
+
+        await self.history.record(client_id, chosen, source="cafeteria")
+        result = {k: v for k, v in shared.items() if k != "reserve"}
+        result["recommendations"] = chosen
+        return result
+
+    async def _generate_cafeteria_recommendation(
+        self,
+        weather: Dict,
+        cafeteria_menu: str,
+        location: Optional[Dict],
+        prefer_external: bool,
+        daily_menus: Optional[list],
+        previous: List[Dict],
+        client_id: Optional[str]
+    ) -> Dict:
         if not self.use_ai:
             return self._get_fallback_cafeteria_recommendation(
                 weather,
@@ -144,115 +261,82 @@ class AIService:
             )
 
         try:
-            # ✅ 이전 호출에서 뭐 나왔는지 모델에 알려주기
-            avoid_list = [
-                {
-                    "restaurant_name": r.get("restaurant_name"),
-                    "menu_name": r.get("menu_name")
-                }
-                for r in self.last_recommendations
-                if r.get("restaurant_name") or r.get("menu_name")
-            ]
+            with span("ai.prompt") as prompt_span:
+                # ✅ 이전 호출에서 뭐 나왔는지 모델에 알려주기
+                avoid_list = [
+                    {
+                        "restaurant_name": r.get("restaurant_name"),
+                        "menu_name": r.get("menu_name")
+                    }
+                    for r in previous
+                    if r.get("restaurant_name") or r.get("menu_name")
+                ]
             
-            # ✅ 오늘의 추천 메뉴도 avoid_list에 추가
-            if daily_menus:
-                for menu in daily_menus:
-                    avoid_list.append({
-                        "restaurant_name": menu.get("restaurant_name"),
-                        "menu_name": menu.get("menu_name")
-                    })
-
-            user_input = {
-                "menuToday": (
-                    cafeteria_menu.split(',')
-                    if ',' in cafeteria_menu
-                    else [cafeteria_menu]
-                ),
-                "location": (
-                    location
-                    if location
-                    else {"lat": 37.5665, "lng": 126.9780}
-                ),
-                "distancePref": (
-                    "5-15" if prefer_external else "0-5"
-                ),
-                "weather": {
-                    "tempC": weather.get('temperature', 20),
-                    "condition": self._normalize_weather_condition(
-                        weather.get('sky_condition', '맑음'),
-                        weather.get('temperature', 20)
+                # ✅ 오늘의 추천은 이력에 이미 들어있음
+                #    (구버전 클라이언트가 daily_menus를 보내면 빠진 것만 추가)
+                if daily_menus:
+                    known = {(a["restaurant_name"], a["menu_name"]) for a in avoid_list}
+                    for menu in daily_menus:
+                        key = (menu.get("restaurant_name"), menu.get("menu_name"))
+                        if key not in known:
+                            known.add(key)
+                            avoid_list.append({
+                                "restaurant_name": key[0],
+                                "menu_name": key[1]
+                            })
+
+                avoid_menus = [a["menu_name"] for a in avoid_list if a.get("menu_name")]
+
+                user_input = {
+                    "menuToday": (
+                        cafeteria_menu.split(',')
+                        if ',' in cafeteria_menu
+                        else [cafeteria_menu]
+                    ),
+                    "location": (
+                        location
+                        if location
+                        else {"lat": 37.5665, "lng": 126.9780}
+                    ),
+                    "distancePref": (
+                        "5-15" if prefer_external else "0-5"
+                    ),
+                    "weather": {
+                        "tempC": weather.get('temperature', 20),
+                        "condition": self._normalize_weather_condition(
+                            weather.get('sky_condition', '맑음'),
+                            weather.get('temperature', 20)
+                        )
+                    },
+                    # ✅ 최근 추천과 비슷한 메뉴는 후보에서 미리 제거 (avoidList를 프롬프트로 보내지 않음)
+                    "nearbyCandidates": self._filter_candidates(
+                        self._generate_nearby_candidates(
+                            cafeteria_menu,
+                            weather,
+                            location
+                        ),
+                        avoid_menus
                     )
-                },
-                "nearbyCandidates": self._generate_nearby_candidates(
-                    cafeteria_menu,
-                    weather,
-                    location
-                ),
-                # ✅ 이게 핵심
-                "avoidList": avoid_list
-            }
+                }
 
-            user_message = f"""
-아래 입력 데이터를 분석하여 최적의 점심 메뉴를 추천하고,
-결과를 JSON 형식으로 반환하세요.
-
-입력 데이터:
-{json.dumps(user_input, ensure_ascii=False, indent=2)}
-
-추가 규칙:
-- 입력의 avoidList에 있는 (restaurant_name, menu_name) 조합은
-  이번 추천에서 **반드시 제외**하세요.
-- **중요**: avoidList에 있는 메뉴와 **의미적으로 유사하거나 같은 카테고리**의 메뉴도 제외하세요.
-  예: avoidList에 "김치찌개"가 있으면 "된장찌개", "순두부찌개" 등도 제외
-  예: avoidList에 "돈까스"가 있으면 "치즈돈까스", "생선까스" 등도 제외
-  예: avoidList에 "파스타"가 있으면 "크림파스타", "토마토파스타" 등도 제외
-- 상위호환 1개, 대체 1개, 예외 1개를 우선 생성하되
-  조건에 맞는 게 없으면 있는 것만 내보내세요.
-- 다양한 카테고리의 메뉴를 추천하세요 (한식, 중식, 일식, 양식 등을 골고루).
-
-출력 형식 (반드시 이 스키마를 따르세요):
-{{
-  "recommendations": [
-    {{
-      "type": "상위 호환 메뉴 | 대체 메뉴 | 예외 메뉴",
-      "restaurant_name": "string (식당 이름)",
-      "place_id": "string",
-      "minutes_away": 0,
-      "menu_name": "string (메뉴 이름)",
-      "reason": "string (1-2문장, 맛/재료/영양/날씨 중 최소 2개 근거 포함)",
-      "price_range": "string (필수! 예: 8,000-12,000원, 10,000-15,000원)",
-      "normalized_search_query": "string (대표 키워드 1개)",
-      "alt_queries": ["string", "..."],
-      "category_group_code": "FD6"
-    }}
-  ],
-  "brief_rationale": "string (1-2문장)",
-  "need_more_info": false,
-  "missing": []
-}}
-
-정보가 부족하면:
-{{
-  "recommendations": [],
-  "brief_rationale": "입력 정보가 부족하거나 검색 정규화가 불가능하여 추천을 완료할 수 없습니다.",
-  "need_more_info": true,
-  "missing": ["nearbyCandidates"]
-}}
-"""
-
-            generation_config = genai.types.GenerationConfig(
-                response_mime_type="application/json",
-                temperature=0.8,
-            )
+                user_message = self.prompts.cafeteria(user_input, self.structured_output)
 
-            response = self.model.generate_content(
-                user_message,
-                generation_config=generation_config
-            )
+                prompt_span.set_attribute("chars", len(user_message))
+
+            # ✅ 대화형 요청 → 우선순위 높게 (몰리면 AdmissionRejected → 429)
+            with span("ai.generate", priority="interactive"):
+                async with llm_admission.slot(client_id, PRIORITY_INTERACTIVE):
+                    response = await self._generate(self.model, "cafeteria", user_message)
             content = response.text
 
             try:
-                recommendation = json.loads(content)
+                # JSON 파싱 + 스키마 검증 (잘린 응답은 복구, 유효한 항목만 구제)
+                recommendation = parse_llm_json(
+                    content,
+                    cafeteria_output_adapter,
+                    cafeteria_item_adapter,
+                    kind="cafeteria"
+                )
 
                 if recommendation.get('need_more_info', False):
                     print("⚠️ 정보 부족:", recommendation.get('missing', []))
@@ -267,17 +351,19 @@ class AIService:
                     ")"
                 )
 
-            except json.JSONDecodeError as e:
-                print("JSON 파싱 오류:", str(e))
+            except LLMJSONError as e:
+                print("JSON 파싱/검증 오류:", str(e))
                 print("응답 내용:", content[:500], "...")
                 return self._get_fallback_cafeteria_recommendation(
                     weather,
                     cafeteria_menu
                 )
 
-            # ✅ 1차: 모델이 준 거 중복 제거
-            deduped = self._dedupe_recommendations(
-                recommendation.get("recommendations", [])
+            # ✅ 1차: 모델이 준 거 중복 제거 (+ 최근 추천과 비슷한 메뉴 제거)
+            deduped = await self._dedupe_recommendations(
+                recommendation.get("recommendations", []),
+                client_id,
+                avoid_menus
             )
 
             # ✅ 2차: "국물인데 상위호환이 제육/돈까스/마라탕으로 나왔다" → 강제 대체로 돌리기
@@ -286,10 +372,9 @@ class AIService:
                 deduped
             )
 
-            # ✅ 저장 → 다음 호출에서 피하도록
-            self.last_recommendations = fixed
-
-            # 하위호환 필드들 추가
+            # 하위호환 필드들 추가 (모델에게 받지 않는 고정값은 서버에서)
+            for item in fixed:
+                item.setdefault("category_group_code", "FD6")
             recommendation["recommendations"] = fixed
             recommendation["weather_info"] = {
                 "location": weather.get("location"),
@@ -305,6 +390,8 @@ class AIService:
 
             return recommendation
 
+        except AdmissionRejected:
+            raise
         except Exception as e:
             print("AI 추천 오류:", str(e))
             import traceback
@@ -317,30 +404,40 @@ class AIService:
     # =======================================================================
     # 3) 중복 제거
     # =======================================================================
-    def _dedupe_recommendations(
+    async def _dedupe_recommendations(
         self,
-        recs: List[Dict]
+        recs: List[Dict],
+        client_id: Optional[str] = None,
+        avoid_menus: Optional[List[str]] = None
     ) -> List[Dict]:
         """
         모델이 무시하고 똑같은 식당/메뉴를 다시 줬을 때
         파이썬단에서 한 번 더 걸러주는 함수
+        (직전 호출뿐 아니라 최근 N일 이력 전체와 비교,
+         avoid_menus 와 의미적으로 비슷한 메뉴도 유사도 인덱스로 제외)
         """
         if not recs:
             return recs
 
-        # 직전 호출에서 나왔던 (식당, 메뉴)
-        prev_keys = {
+        similar = self.menu_index.similar_mask(
+            [r.get("menu_name") or "" for r in recs],
+            avoid_menus or []
+        )
+
+        # 최근 N일 안에 이 클라이언트에게 나갔던 (식당, 메뉴)
+        prev_keys = await self.history.recommended_within(
+            client_id,
             (
-                r.get("restaurant_name", ""),
-                r.get("menu_name", "")
-            )
-            for r in self.last_recommendations
-        }
+                (r.get("restaurant_name", ""), r.get("menu_name", ""))
+                for r in recs
+            ),
+            self.history_avoid_days
+        )
 
         seen_now = set()
         filtered = []
 
-        for r in recs:
+        for r, is_similar in zip(recs, similar):
             key = (
                 r.get("restaurant_name", ""),
                 r.get("menu_name", "")
@@ -350,7 +447,11 @@ class AIService:
             if key in seen_now:
                 continue
 
-            # 직전 응답과 중복이면 스킵
+            # 최근 추천과 같은 계열 메뉴면 스킵 (김치찌개 → 된장찌개)
+            if is_similar:
+                continue
+
+            # 최근 이력과 중복이면 스킵
             if key in prev_keys:
                 continue
 
@@ -360,6 +461,30 @@ class AIService:
         # 혹시 다 빠져버리면 원본이라도 돌려주기
         return filtered or recs
 
+    def _filter_candidates(
+        self,
+        candidates: List[Dict],
+        avoid_menus: List[str]
+    ) -> List[Dict]:
+        """
+        후보 식당의 menuExamples 중 avoid_menus 와 비슷한 메뉴를 뺀다
+        (전체 메뉴를 한 번의 행렬곱으로 판정, 메뉴가 다 빠진 식당은 후보에서 제외)
+        """
+        if not avoid_menus:
+            return candidates
+
+        names = [m for c in candidates for m in c.get("menuExamples", [])]
+        similar = dict(zip(names, self.menu_index.similar_mask(names, avoid_menus)))
+
+        filtered = []
+        for c in candidates:
+            examples = [m for m in c.get("menuExamples", []) if not similar.get(m)]
+            if examples:
+                filtered.append({**c, "menuExamples": examples})
+
+        # 다 빠지면 원본 후보라도 (추천 자체가 막히지 않게)
+        return filtered or candidates
+
     # =======================================================================
     # 4) 찌개인데 상위호환이 볶음 / 마라탕으로 나온 케이스 고치기
     # =======================================================================
@@ -739,6 +864,12 @@ class AIService:
     # =======================================================================
     # 7) 폴백: AI가 실패했을 때
     # =======================================================================
+    @staticmethod
+    def is_fallback_recommendation(result: Dict) -> bool:
+        """규칙 기반 폴백 결과인지 (폴백 항목은 place_id 가 fallback_ 으로 시작)"""
+        recs = result.get("recommendations") or []
+        return bool(recs) and all(str(r.get("place_id") or "").startswith("fallback_") for r in recs)
+
     def _get_fallback_cafeteria_recommendation(
         self,
         weather: Dict,
@@ -803,9 +934,6 @@ class AIService:
             }
         ]
 
-        # ✅ 폴백도 저장해두면 다음 호출에서 이걸 피할 수 있음
-        self.last_recommendations = recommendations
-
         return {
             "recommendations": recommendations,
             "brief_rationale": (
@@ -829,86 +957,66 @@ class AIService:
     # =======================================================================
     # 8) 오늘의 추천 3개
     # =======================================================================
+    @traced("ai.daily")
     async def get_daily_recommendations(
         self,
         weather: Dict,
-        location: str
+        location: str,
+        client_id: Optional[str] = None
     ) -> Dict:
         """오늘의 추천 메뉴 3개 생성 (위치 & 날씨 기반, 실제 검색 가능한 메뉴만)"""
+        result = await self._generate_daily_recommendations(weather, location, client_id)
+        # ✅ 이 클라이언트에게 보여준 것으로 기록 → 구내식당 추천의 제외 목록에 자동 반영
+        await self.history.record(client_id, result.get("recommendations", []), source="daily")
+        return result
+
+    async def shared_daily_recommendations(
+        self,
+        weather: Dict,
+        location: str,
+        cafeteria_menu: Optional[str] = None,
+        client_id: Optional[str] = None
+    ) -> Dict:
+        """
+        구독자 전체에게 푸시할 오늘의 추천 (services/push_service.py)
+        위치 × 날씨 구간(× 구내식당 메뉴) 캐시를 그대로 쓰고, 이력 기록은 호출 측에서 구독자별로 한 번에
+        """
+        if cafeteria_menu:
+            return await self._generate_daily_recommendations_with_exclusion(weather, location, cafeteria_menu, client_id)
+        return await self._generate_daily_recommendations(weather, location, client_id)
+
+    async def _generate_daily_recommendations(
+        self,
+        weather: Dict,
+        location: str,
+        client_id: Optional[str]
+    ) -> Dict:
         if not self.use_ai:
             return self._get_fallback_daily_recommendations(weather, location)
 
+        # ✅ 같은 위치 + 같은 날씨 구간이면 LLM 결과 재사용
+        cache_key = f"daily:{location}:{self.weather_bucket(weather)}"
+        cached = await self.cache.get(cache_key)
+        if cached:
+            return cached
+
         try:
-            daily_model = genai.GenerativeModel('gemini-2.0-flash')
-
-            prompt = f"""
-오늘의 점심 메뉴 3가지를 추천해주세요.
-
-**위치:** {location}
-**날씨 정보:**
-- 온도: {weather.get('temperature')}°C
-- 날씨: {weather.get('sky_condition')}
-- 강수량: {weather.get('precipitation', 0)}mm
-- 습도: {weather.get('humidity')}%
-
-**매우 중요한 요구사항:**
-1. 현재 날씨와 온도에 최적화된 메뉴 3개를 추천하세요.
-2. 각 메뉴는 서로 다른 카테고리(한식, 중식, 양식, 일식 등)에서 선택하세요.
-3. **메뉴명은 카카오맵에서 실제 검색 가능한 단순한 키워드로 작성하세요.**
-   - ✅ 좋은 예: "해물 칼국수", "김치찌개", "돈까스", "파스타", "짬뽕"
-   - ❌ 나쁜 예: "따뜻한 해물 칼국수", "매콤한 김치찌개", "바삭한 돈까스"
-   - 형용사를 빼고 음식명의 핵심 키워드만 사용하세요.
-4. 일반적으로 많은 음식점에서 제공하는 대중적인 메뉴를 선택하세요.
-5. 각 추천마다 1-2문장으로 이유를 설명하세요 (날씨, 영양, 맛 고려).
-6. 대략적인 가격대도 함께 제시하세요.
-
-**출력 형식 (JSON만):**
-{{
-  "recommendations": [
-    {{
-      "menu_name": "메뉴명 (검색 가능한 단순 키워드)",
-      "category": "카테고리",
-      "price_range": "가격대",
-      "reason": "추천 이유 (1-2문장)"
-    }},
-    {{
-      "menu_name": "메뉴명 (검색 가능한 단순 키워드)",
-      "category": "카테고리", 
-      "price_range": "가격대",
-      "reason": "추천 이유 (1-2문장)"
-    }},
-    {{
-      "menu_name": "메뉴명 (검색 가능한 단순 키워드)",
-      "category": "카테고리",
-      "price_range": "가격대",
-      "reason": "추천 이유 (1-2문장)"
-    }}
-  ],
-  "summary": "오늘의 날씨 한줄 요약"
-}}
-
-**주의:** 
-- 유효한 JSON만 출력하세요. 코드블록, 추가 텍스트, 이모지 금지.
-- 메뉴명은 반드시 형용사 없이 음식 이름만 사용하세요.
-"""
-
-            response = daily_model.generate_content(prompt)
-            response_text = response.text.strip()
-
-            if '```json' in response_text:
-                response_text = (
-                    response_text.split('```json')[1]
-                    .split('```')[0]
-                    .strip()
-                )
-            elif '```' in response_text:
-                response_text = (
-                    response_text.split('```')[1]
-                    .split('```')[0]
-                    .strip()
-                )
+            daily_model = self.daily_model
 
-            result = json.loads(response_text)
+            prompt = self.prompts.daily(location, weather, self.structured_output)
+
+            # ✅ 백그라운드 요청 → 대화형 요청에 양보, 밀리면 폴백
+            with span("ai.generate", priority="background"):
+                async with llm_admission.slot(client_id, PRIORITY_BACKGROUND):
+                    response = await self._generate(daily_model, "daily", prompt)
+
+            # 짧은 키는 스키마 모델이 원래 이름으로 복원, 잘림에도 완결된 추천은 살린다 (실패 시 아래 폴백)
+            result = parse_llm_json(
+                response.text,
+                daily_output_adapter,
+                daily_item_adapter,
+                kind="daily"
+            )
 
             result['weather'] = {
                 'location': location,
@@ -923,98 +1031,73 @@ class AIService:
                 "개"
             )
 
+            await self.cache.set(cache_key, result, self.daily_cache_ttl)
             return result
 
         except Exception as e:
             print("❌ 오늘의 추천 메뉴 생성 오류:", e)
             return self._get_fallback_daily_recommendations(weather, location)
 
+    @traced("ai.daily")
     async def get_daily_recommendations_with_exclusion(
         self,
         weather: Dict,
         location: str,
-        cafeteria_menu: str
+        cafeteria_menu: str,
+        client_id: Optional[str] = None
     ) -> Dict:
         """구내식당 메뉴와 연관성이 낮은 오늘의 추천 메뉴 생성"""
+        result = await self._generate_daily_recommendations_with_exclusion(
+            weather,
+            location,
+            cafeteria_menu,
+            client_id
+        )
+        await self.history.record(client_id, result.get("recommendations", []), source="daily")
+        return result
+
+    async def _generate_daily_recommendations_with_exclusion(
+        self,
+        weather: Dict,
+        location: str,
+        cafeteria_menu: str,
+        client_id: Optional[str]
+    ) -> Dict:
         if not self.use_ai:
             return self._get_fallback_daily_recommendations(weather, location)
 
+        menu_hash = hashlib.sha1((cafeteria_menu or "").strip().encode("utf-8")).hexdigest()[:16]
+        cache_key = f"daily_ex:{location}:{self.weather_bucket(weather)}:{menu_hash}"
+        cached = await self.cache.get(cache_key)
+        if cached:
+            return cached
+
         try:
-            daily_model = genai.GenerativeModel('gemini-2.0-flash')
-
-            prompt = f"""
-오늘의 점심 메뉴 3가지를 추천해주세요.
-
-**위치:** {location}
-**날씨 정보:**
-- 온도: {weather.get('temperature')}°C
-- 날씨: {weather.get('sky_condition')}
-- 강수량: {weather.get('precipitation', 0)}mm
-- 습도: {weather.get('humidity')}%
-
-**구내식당 메뉴:** {cafeteria_menu}
-
-**매우 중요한 요구사항:**
-1. 현재 날씨와 온도에 최적화된 메뉴 3개를 추천하세요.
-2. **구내식당 메뉴와 의미적으로 연관성이 낮은 메뉴를 선택하세요.**
-   - 구내식당이 "김치찌개, 제육볶음"이면 → "파스타", "초밥", "쌀국수" 같이 다른 카테고리 추천
-   - 구내식당이 "돈까스, 카레"이면 → "짬뽕", "비빔밥", "샐러드" 같이 다른 스타일 추천
-3. 각 메뉴는 서로 다른 카테고리(한식, 중식, 양식, 일식 등)에서 선택하세요.
-4. **메뉴명은 카카오맵에서 실제 검색 가능한 단순한 키워드로 작성하세요.**
-   - ✅ 좋은 예: "해물 칼국수", "김치찌개", "돈까스", "파스타", "짬뽕"
-   - ❌ 나쁜 예: "따뜻한 해물 칼국수", "매콤한 김치찌개", "바삭한 돈까스"
-5. 일반적으로 많은 음식점에서 제공하는 대중적인 메뉴를 선택하세요.
-6. 각 추천마다 1-2문장으로 이유를 설명하세요 (날씨, 영양, 맛 고려).
-7. 대략적인 가격대도 함께 제시하세요.
-
-**출력 형식 (JSON만):**
-{{
-  "recommendations": [
-    {{
-      "menu_name": "메뉴명 (검색 가능한 단순 키워드)",
-      "category": "카테고리",
-      "price_range": "가격대",
-      "reason": "추천 이유 (1-2문장)"
-    }},
-    {{
-      "menu_name": "메뉴명 (검색 가능한 단순 키워드)",
-      "category": "카테고리", 
-      "price_range": "가격대",
-      "reason": "추천 이유 (1-2문장)"
-    }},
-    {{
-      "menu_name": "메뉴명 (검색 가능한 단순 키워드)",
-      "category": "카테고리",
-      "price_range": "가격대",
-      "reason": "추천 이유 (1-2문장)"
-    }}
-  ],
-  "summary": "오늘의 날씨 한줄 요약"
-}}
-
-**주의:** 
-- 유효한 JSON만 출력하세요. 코드블록, 추가 텍스트, 이모지 금지.
-- 메뉴명은 반드시 형용사 없이 음식 이름만 사용하세요.
-- 구내식당 메뉴와 유사한 카테고리는 피하세요.
-"""
-
-            response = daily_model.generate_content(prompt)
-            response_text = response.text.strip()
-
-            if '```json' in response_text:
-                response_text = (
-                    response_text.split('```json')[1]
-                    .split('```')[0]
-                    .strip()
-                )
-            elif '```' in response_text:
-                response_text = (
-                    response_text.split('```')[1]
-                    .split('```')[0]
-                    .strip()
-                )
+            daily_model = self.daily_model
+
+            prompt = self.prompts.daily_exclusion(location, weather, cafeteria_menu, self.structured_output)
+
+            # ✅ 백그라운드 요청 → 대화형 요청에 양보, 밀리면 폴백
+            with span("ai.generate", priority="background"):
+                async with llm_admission.slot(client_id, PRIORITY_BACKGROUND):
+                    response = await self._generate(daily_model, "daily", prompt)
 
-            result = json.loads(response_text)
+            # 짧은 키는 스키마 모델이 원래 이름으로 복원, 잘림에도 완결된 추천은 살린다 (실패 시 아래 폴백)
+            result = parse_llm_json(
+                response.text,
+                daily_output_adapter,
+                daily_item_adapter,
+                kind="daily"
+            )
+
+            # ✅ 구내식당 메뉴와 같은 계열로 나온 건 로컬에서 한 번 더 제외
+            cafeteria_items = [m.strip() for m in (cafeteria_menu or "").split(",") if m.strip()]
+            recs = result.get('recommendations', [])
+            similar = self.menu_index.similar_mask(
+                [r.get('menu_name') or "" for r in recs],
+                cafeteria_items
+            )
+            result['recommendations'] = [r for r, s in zip(recs, similar) if not s] or recs
 
             result['weather'] = {
                 'location': location,
@@ -1029,6 +1112,7 @@ class AIService:
                 "개"
             )
 
+            await self.cache.set(cache_key, result, self.daily_cache_ttl)
             return result
 
         except Exception as e:
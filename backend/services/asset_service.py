@@ -0,0 +1,179 @@
+"""
+Weather Asset Service
+날씨 배경 이미지 선택 + 정적 파일 위치 (tools/build_weather_assets.py 가 만든 매니페스트 사용)
+
+- 파일명에 내용 해시가 들어 있어 URL 이 바뀌지 않는 한 내용도 같다 → immutable 캐시
+- 날씨(하늘 상태, 기온) → 계열(sunny/cloudy/rainy/snowy) → 그날의 이미지 한 장
+  (같은 지역은 하루 동안 같은 이미지 → 날씨 응답 ETag 도 유지)
+- 응답에는 기본 폭 WebP URL 과 모든 변형(폭 x 포맷)을 같이 실어
+  클라이언트가 화면 폭/AVIF 지원에 맞춰 고른다
+
+매니페스트가 없으면 (변환 전) 배경 정보 없이 응답 → 프론트는 기존 원본 이미지를 쓴다.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CATEGORIES = ("sunny", "cloudy", "rainy", "snowy")
+MANIFEST_NAME = "manifest.json"
+DEFAULT_ASSET_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "weather"
+)
+ASSET_URL_PREFIX = "/api/assets/weather"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# 클라이언트가 고를 때의 포맷 우선순위 (작은 것부터)
+FORMAT_PREFERENCE = ("avif", "webp")
+
+
+def weather_category(sky_condition: Optional[str], temperature: Optional[float] = None) -> str:
+    """하늘 상태 → 배경 계열 (프론트 chooseThemeFromWeather 와 같은 키워드)"""
+    condition = (sky_condition or "").lower()
+    if "눈" in condition:
+        return "snowy"
+    if "비" in condition:
+        # 영하의 비/눈 섞임은 눈 배경
+        if isinstance(temperature, (int, float)) and temperature <= 0:
+            return "snowy"
+        return "rainy"
+    if "구름" in condition or "흐림" in condition:
+        return "cloudy"
+    if "맑" in condition:
+        return "sunny"
+    if isinstance(temperature, (int, float)) and temperature <= 0:
+        return "snowy"
+    return "sunny"
+
+
+class WeatherAssetService:
+    """변환된 배경 이미지 매니페스트 조회"""
+
+    def __init__(self, asset_dir: Optional[str] = None):
+        self.asset_dir = asset_dir or os.getenv("WEATHER_ASSET_DIR", DEFAULT_ASSET_DIR)
+        self.default_width = int(os.getenv("WEATHER_BACKGROUND_WIDTH", "1280"))
+        self._manifest: Optional[Dict] = None
+        self._manifest_mtime: Optional[float] = None
+        self._files: Dict[str, str] = {}
+
+    def _load(self) -> Dict:
+        """매니페스트 (변환 도구를 다시 돌리면 재시작 없이 반영)"""
+        path = os.path.join(self.asset_dir, MANIFEST_NAME)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self._manifest, self._manifest_mtime, self._files = {}, None, {}
+            return self._manifest
+
+        if mtime != self._manifest_mtime:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 배경 이미지 매니페스트 읽기 실패: {e}")
+                manifest = {}
+            self._manifest = manifest
+            self._manifest_mtime = mtime
+            self._files = {
+                variant["file"]: variant["format"]
+                for image in manifest.get("images", {}).values()
+                for variant in image.get("variants", [])
+            }
+        return self._manifest
+
+    @property
+    def available(self) -> bool:
+        return bool(self._load().get("images"))
+
+    def file_path(self, filename: str) -> Optional[str]:
+        """매니페스트에 있는 파일만 경로를 돌려준다 (임의 경로 접근 차단)"""
+        self._load()
+        if filename not in self._files:
+            return None
+        path = os.path.join(self.asset_dir, filename)
+        return path if os.path.isfile(path) else None
+
+    def media_type(self, filename: str) -> str:
+        return f"image/{self._files.get(filename, 'webp')}"
+
+    def _pick_image(self, category: str, seed: str) -> Optional[tuple]:
+        images = self._load().get("images", {})
+        keys = sorted(key for key, image in images.items() if image.get("category") == category)
+        if not keys:
+            keys = sorted(images)
+        if not keys:
+            return None
+        # 지역 + 날짜로 고정 → 하루 동안은 같은 배경
+        index = int(hashlib.md5(f"{seed}:{date.today()}".encode()).hexdigest(), 16) % len(keys)
+        return keys[index], images[keys[index]]
+
+    def select(
+        self,
+        sky_condition: Optional[str],
+        temperature: Optional[float] = None,
+        seed: str = "",
+        width: Optional[int] = None,
+    ) -> Optional[Dict]:
+        """
+        날씨에 맞는 배경 (없으면 None)
+
+        url 은 요청 폭 이상인 가장 작은 WebP (없으면 가장 큰 것),
+        sources 는 같은 이미지의 모든 폭/포맷.
+        """
+        category = weather_category(sky_condition, temperature)
+        picked = self._pick_image(category, seed or category)
+        if picked is None:
+            return None
+        key, image = picked
+
+        variants = image.get("variants", [])
+        if not variants:
+            return None
+        width = width or self.default_width
+        widths = sorted({v["width"] for v in variants})
+        target = min((w for w in widths if w >= width), default=widths[-1])
+
+        def rank(variant):
+            fmt = variant["format"]
+            # 기본 url 은 WebP (어느 브라우저든 표시 가능), AVIF 는 sources 로만
+            return (fmt != "webp", FORMAT_PREFERENCE.index(fmt) if fmt in FORMAT_PREFERENCE else 99)
+
+        default = min((v for v in variants if v["width"] == target), key=rank)
+        return {
+            "key": key,
+            "category": image.get("category", category),
+            "url": f"{ASSET_URL_PREFIX}/{default['file']}",
+            "width": default["width"],
+            "format": default["format"],
+            "sources": [
+                {
+                    "url": f"{ASSET_URL_PREFIX}/{v['file']}",
+                    "width": v["width"],
+                    "format": v["format"],
+                    "bytes": v.get("bytes"),
+                }
+                for v in sorted(variants, key=lambda v: (v["width"], v["format"]))
+            ],
+        }
+
+    def attach(self, weather_data: Dict, width: Optional[int] = None) -> Dict:
+        """날씨 응답에 배경을 붙인 사본 (캐시에 있는 원본 dict 는 건드리지 않음)"""
+        background = self.select(
+            weather_data.get("sky_condition"),
+            weather_data.get("temperature"),
+            seed=weather_data.get("area") or weather_data.get("location") or "",
+            width=width,
+        )
+        if background is None:
+            return weather_data
+        return dict(weather_data, background=background)
+
+
+# 싱글톤 인스턴스
+asset_service = WeatherAssetService()
@@ -0,0 +1,320 @@
+"""
+Cache Backend
+날씨 · OCR · 추천 결과를 저장하는 교체 가능한 캐시 계층
+
+uvicorn 워커가 여러 개면 프로세스 메모리 캐시는 워커마다 따로 차가워진다.
+CACHE_BACKEND 환경 변수로 백엔드를 고른다.
+
+- memory : 프로세스 내 LRU (기본값, 단일 워커 개발용)
+- sqlite : WAL 모드 SQLite 파일 (같은 머신의 여러 워커가 공유)
+- redis  : Redis 프로토콜(RESP) 서버 (여러 머신이 공유, 로컬 서버로 대체 가능)
+
+값은 JSON 직렬화 가능한 객체만 저장한다.
+캐시 장애는 요청을 깨뜨리지 않고 miss로 취급한다.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import urlparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class CacheBackend:
+    """캐시 백엔드 인터페이스"""
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+# =======================================================================
+# 1) 프로세스 내 LRU
+# =======================================================================
+class MemoryLRUCache(CacheBackend):
+    """OrderedDict 기반 LRU + TTL"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at < time.time():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+# =======================================================================
+# 2) SQLite (WAL) - 같은 머신의 워커끼리 공유
+# =======================================================================
+class SQLiteCache(CacheBackend):
+    """
+    WAL 모드 SQLite 파일 하나를 여러 프로세스가 함께 읽고 쓴다
+    sqlite3 호출은 블로킹이라 스레드에서 실행 (연결 하나를 스레드끼리 나눠 쓰므로 잠금으로 직렬화)
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache (expires_at)")
+        self._conn_lock = threading.Lock()
+        self._writes = 0
+
+    def _execute(self, sql: str, params: tuple = (), fetch: bool = False):
+        with self._conn_lock:
+            cursor = self._conn.execute(sql, params)
+            return cursor.fetchone() if fetch else None
+
+    async def get(self, key: str) -> Optional[Any]:
+        row = await asyncio.to_thread(
+            self._execute, "SELECT value, expires_at FROM cache WHERE key = ?", (key,), True
+        )
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return json.loads(value)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), expires_at),
+        )
+        # 가끔씩 만료된 행 정리
+        self._writes += 1
+        if self._writes % 500 == 0:
+            await asyncio.to_thread(self._execute, "DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM cache WHERE key = ?", (key,))
+
+    async def close(self) -> None:
+        with self._conn_lock:
+            self._conn.close()
+
+
+# =======================================================================
+# 3) Redis 프로토콜 (RESP) - 최소 클라이언트
+# =======================================================================
+class RedisCache(CacheBackend):
+    """GET / SET PX / DEL / PING만 쓰는 가벼운 RESP 클라이언트 (redis-py 의존성 없음)"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int((parsed.path or "/0").lstrip("/") or 0)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        # 연결 실패 후 잠시 재시도하지 않음 (매 요청마다 연결 타임아웃을 물지 않게)
+        self._down_until = 0.0
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=2.0
+        )
+        if self.password:
+            await self._roundtrip("AUTH", self.password)
+        if self.db:
+            await self._roundtrip("SELECT", str(self.db))
+
+    async def _roundtrip(self, *args: str) -> Any:
+        payload = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode("utf-8")
+            payload.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(payload))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("redis 연결이 끊어졌습니다")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"알 수 없는 RESP 응답: {line!r}")
+
+    async def command(self, *args: str) -> Any:
+        async with self._lock:
+            if time.monotonic() < self._down_until:
+                raise ConnectionError("redis 연결 재시도 대기 중")
+            try:
+                if self._writer is None:
+                    await self._connect()
+                return await self._roundtrip(*args)
+            except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                # 5초 뒤 다시 연결
+                await self._drop()
+                self._down_until = time.monotonic() + 5.0
+                raise
+            except BaseException:
+                # 취소(CancelledError) 등으로 응답을 다 읽지 못했을 수 있음
+                # → 연결을 버려야 다음 명령이 남은 응답을 자기 것으로 읽지 않는다
+                await self._drop()
+                raise
+
+    async def _drop(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self.command("GET", key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        data = json.dumps(value, ensure_ascii=False)
+        if ttl:
+            await self.command("SET", key, data, "PX", str(int(ttl * 1000)))
+        else:
+            await self.command("SET", key, data)
+
+    async def delete(self, key: str) -> None:
+        await self.command("DEL", key)
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._drop()
+
+
+# =======================================================================
+# 4) 네임스페이스 래퍼 + 팩토리
+# =======================================================================
+class NamespacedCache:
+    """서비스별 키 접두어를 붙이고, 백엔드 오류는 miss로 삼킨다"""
+
+    def __init__(self, namespace: str, backend: CacheBackend):
+        self.namespace = namespace
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"babmuttna:{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            value = await self.backend.get(self._key(key))
+        except Exception as e:
+            print(f"⚠️ 캐시 조회 실패 ({self.backend.name}): {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            await self.backend.set(self._key(key), value, ttl)
+        except Exception as e:
+            print(f"⚠️ 캐시 저장 실패 ({self.backend.name}): {e}")
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.backend.delete(self._key(key))
+        except Exception as e:
+            print(f"⚠️ 캐시 삭제 실패 ({self.backend.name}): {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def create_cache_backend(kind: Optional[str] = None) -> CacheBackend:
+    """환경 변수 설정으로 백엔드 생성"""
+    kind = (kind or os.getenv("CACHE_BACKEND", "memory")).lower()
+    if kind == "sqlite":
+        return SQLiteCache(os.getenv("CACHE_SQLITE_PATH", ".cache/babmuttna_cache.sqlite3"))
+    if kind == "redis":
+        return RedisCache(os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/0"))
+    return MemoryLRUCache(int(os.getenv("CACHE_MAX_ENTRIES", "2048")))
+
+
+def get_cache(namespace: str) -> NamespacedCache:
+    """프로세스 공용 백엔드 위에 네임스페이스 캐시를 만든다"""
+    global _backend
+    if _backend is None:
+        _backend = create_cache_backend()
+        print(f"✅ 캐시 백엔드: {_backend.name}")
+    return NamespacedCache(namespace, _backend)
@@ -0,0 +1,96 @@
+"""
+Hourly Forecast Series
+Open-Meteo hourly 예보를 array 기반 시계열로 들고 있다가 "T 시각의 날씨"를 로컬에서 보간해 답한다.
+
+- 시간 축은 시작 시각 + 1시간 간격이라 따로 저장하지 않는다 (index = (T - start) / 3600)
+- 연속값(기온/습도/강수/운량)은 선형 보간, 날씨 코드는 가까운 시각 값 사용
+- to_dict / from_dict 로 공유 캐시(SQLite/Redis)에 그대로 넣고 뺄 수 있다
+"""
+
+import time
+from array import array
+from typing import Dict, List, Optional
+
+HOURLY_FIELDS = ("temperature_2m", "relative_humidity_2m", "precipitation", "cloud_cover")
+HOURLY_PARAM = ",".join(HOURLY_FIELDS + ("weather_code",))
+STEP_SECONDS = 3600
+
+
+class HourlySeries:
+    """한 격자의 시간별 예보 (float32 배열 + uint8 날씨 코드)"""
+
+    __slots__ = ("start_ts", "values", "codes", "fetched_at", "model_run")
+
+    def __init__(
+        self,
+        start_ts: int,
+        values: Dict[str, array],
+        codes: array,
+        fetched_at: Optional[float] = None,
+        model_run: Optional[float] = None,
+    ):
+        self.start_ts = start_ts
+        self.values = values
+        self.codes = codes
+        self.fetched_at = fetched_at or time.time()
+        self.model_run = model_run
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def end_ts(self) -> int:
+        return self.start_ts + (len(self) - 1) * STEP_SECONDS
+
+    @classmethod
+    def from_open_meteo(cls, hourly: Dict, model_run: Optional[float] = None) -> "HourlySeries":
+        """timeformat=unixtime 으로 받은 hourly 블록을 배열로 압축"""
+        times: List[int] = hourly.get("time", [])
+        if not times:
+            raise ValueError("hourly 예보가 비어 있습니다")
+
+        values = {
+            name: array("f", (v if v is not None else 0.0 for v in hourly.get(name, [])))
+            for name in HOURLY_FIELDS
+        }
+        codes = array("B", (int(c or 0) for c in hourly.get("weather_code", [])))
+        return cls(int(times[0]), values, codes, model_run=model_run)
+
+    def covers(self, ts: float) -> bool:
+        return self.start_ts <= ts <= self.end_ts
+
+    def at(self, ts: float) -> Optional[Dict]:
+        """T 시각의 보간값 (범위 밖이면 None)"""
+        if not len(self) or not self.covers(ts):
+            return None
+
+        position = (ts - self.start_ts) / STEP_SECONDS
+        lower = int(position)
+        upper = min(lower + 1, len(self) - 1)
+        frac = position - lower
+
+        point = {
+            name: series[lower] + (series[upper] - series[lower]) * frac
+            for name, series in self.values.items()
+        }
+        point["weather_code"] = self.codes[upper if frac >= 0.5 else lower]
+        return point
+
+    def to_dict(self) -> Dict:
+        return {
+            "start_ts": self.start_ts,
+            "values": {name: series.tolist() for name, series in self.values.items()},
+            "codes": self.codes.tolist(),
+            "fetched_at": self.fetched_at,
+            "model_run": self.model_run,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "HourlySeries":
+        return cls(
+            data["start_ts"],
+            {name: array("f", series) for name, series in data["values"].items()},
+            array("B", data["codes"]),
+            fetched_at=data.get("fetched_at"),
+            model_run=data.get("model_run"),
+        )
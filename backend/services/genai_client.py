@@ -0,0 +1,100 @@
+"""
+Gemini 클라이언트 지연 로딩
+google.generativeai는 import 비용이 커서, 실제로 모델이 필요해지는 시점에 한 번만 불러온다.
+
+호출별 토큰 사용량(usage_metadata)과 지연도 여기서 모은다 (llm_usage → /health, /metrics).
+"""
+
+import os
+import threading
+from typing import Dict, Tuple
+from dotenv import load_dotenv
+from services.tracing import current_span
+
+load_dotenv()
+
+_genai = None
+_lock = threading.Lock()
+
+
+def has_api_key() -> bool:
+    """GEMINI_API_KEY 설정 여부 (import 없이 확인)"""
+    return bool(os.getenv("GEMINI_API_KEY"))
+
+
+def get_genai():
+    """google.generativeai 모듈을 불러오고 API 키를 한 번만 설정"""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("❌ GEMINI_API_KEY가 설정되지 않았습니다. .env 파일을 확인하세요.")
+
+                import google.generativeai as genai
+
+                genai.configure(api_key=api_key)
+                _genai = genai
+                print("✅ google.generativeai 로드 완료")
+    return _genai
+
+
+class LLMUsageMetrics:
+    """
+    호출 종류(kind) × 출력 방식(mode: schema | legacy | text)별 토큰 / 지연 / 잘림 카운터
+    LLM_STRUCTURED_OUTPUT 을 껐다 켜서 같은 지표로 전후 비교한다.
+    """
+
+    def __init__(self):
+        self._stats: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def record(self, kind: str, mode: str, response, elapsed_ms: float) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = int(getattr(usage, "prompt_token_count", 0) or 0)
+        output_tokens = int(getattr(usage, "candidates_token_count", 0) or 0)
+        finish_reason = ""
+        candidates = getattr(response, "candidates", None) or []
+        if candidates:
+            reason = getattr(candidates[0], "finish_reason", "")
+            finish_reason = getattr(reason, "name", str(reason))
+
+        stats = self._stats.setdefault((kind, mode), {
+            "calls": 0, "prompt_tokens": 0, "output_tokens": 0,
+            "peak_output_tokens": 0, "truncated": 0, "latency_ms": 0.0,
+        })
+        stats["calls"] += 1
+        stats["prompt_tokens"] += prompt_tokens
+        stats["output_tokens"] += output_tokens
+        stats["peak_output_tokens"] = max(stats["peak_output_tokens"], output_tokens)
+        stats["latency_ms"] += elapsed_ms
+        if finish_reason == "MAX_TOKENS":
+            stats["truncated"] += 1
+
+        current = current_span()
+        current.set_attribute("tokens.prompt", prompt_tokens)
+        current.set_attribute("tokens.output", output_tokens)
+        if finish_reason:
+            current.set_attribute("finish_reason", finish_reason)
+
+    def series(self):
+        """(kind, mode, 누적값) 목록 (Prometheus 용)"""
+        return [(kind, mode, stats) for (kind, mode), stats in sorted(self._stats.items())]
+
+    def stats(self) -> Dict:
+        result: Dict[str, Dict] = {}
+        for kind, mode, stats in self.series():
+            calls = stats["calls"] or 1
+            result.setdefault(kind, {})[mode] = {
+                "calls": stats["calls"],
+                "avg_prompt_tokens": round(stats["prompt_tokens"] / calls, 1),
+                "avg_output_tokens": round(stats["output_tokens"] / calls, 1),
+                "peak_output_tokens": stats["peak_output_tokens"],
+                "avg_latency_ms": round(stats["latency_ms"] / calls, 1),
+                "truncated": stats["truncated"],
+            }
+        return result
+
+
+# 싱글톤 인스턴스
+llm_usage = LLMUsageMetrics()
@@ -0,0 +1,53 @@
+"""
+Geo Utilities
+사용자 GPS 좌표를 가장 가까운 등록 위치(도시/사무실)로 스냅해서
+날씨 · 오늘의 추천 · 후보 조회 캐시를 같은 지역 사용자끼리 공유하게 한다.
+
+좌표 배열(라디안)을 미리 만들어 두고 haversine 거리를 NumPy로 한 번에 계산한다.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class LocationIndex:
+    """등록 위치 최근접 탐색 인덱스"""
+
+    def __init__(self, locations: Dict[str, tuple]):
+        import numpy as np  # 첫 스냅 때만 로드 (import 시간 예산)
+
+        self._np = np
+        self.names: List[str] = list(locations)
+        coords = np.array([locations[name] for name in self.names], dtype=np.float64).reshape(-1, 2)
+        self.coords = coords
+        self.lat_rad = np.radians(coords[:, 0])
+        self.lng_rad = np.radians(coords[:, 1])
+        self.cos_lat = np.cos(self.lat_rad)
+
+    def distances_km(self, latitude: float, longitude: float):
+        """한 좌표에서 모든 등록 위치까지의 거리 (km 배열)"""
+        np = self._np
+        lat = np.radians(latitude)
+        lng = np.radians(longitude)
+        a = (
+            np.sin((self.lat_rad - lat) / 2) ** 2
+            + np.cos(lat) * self.cos_lat * np.sin((self.lng_rad - lng) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        tolerance_km: float
+    ) -> Optional[Tuple[str, float]]:
+        """허용 거리 안의 가장 가까운 위치 (이름, 거리km), 없으면 None"""
+        if not self.names:
+            return None
+        distances = self.distances_km(latitude, longitude)
+        index = int(distances.argmin())
+        distance = float(distances[index])
+        if distance > tolerance_km:
+            return None
+        return self.names[index], distance
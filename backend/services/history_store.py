@@ -0,0 +1,184 @@
+"""
+Recommendation History Store
+클라이언트별 추천 이력을 SQLite에 영구 저장하고, 최근 N일 중복을 인덱스로 조회한다.
+
+- (client_id, rec_date) 인덱스 : "최근 N일 동안 이 사용자에게 보여준 것" 범위 조회
+- (client_id, restaurant_name, menu_name, rec_date) 인덱스 : "이 조합을 N일 안에 추천했나" 단건 조회
+두 질의 모두 B-tree 탐색이라 이력이 쌓여도 O(log n)으로 유지된다.
+뒤의 인덱스는 UNIQUE → 같은 날 같은 조합을 다시 보여주면 (폴링, 캐시 적중) 행을 늘리지 않고 시각만 갱신.
+
+- 연결은 첫 사용 시 연다 (import 만으로 파일을 만들지 않게)
+- sqlite3 호출은 블로킹이라 스레드에서 실행 (연결 하나를 잠금으로 직렬화)
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class HistoryStore:
+    """추천 이력 저장소 (WAL 모드라 여러 워커가 같은 파일을 공유)"""
+
+    def __init__(self, path: Optional[str] = None, retention_days: Optional[int] = None):
+        self.path = path or os.getenv("HISTORY_DB_PATH", ".cache/recommendation_history.sqlite3")
+        self.retention_days = retention_days or int(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """첫 사용 시 연결 + 스키마 (잠금 안에서 호출)"""
+        if self._conn is not None:
+            return self._conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS recommendation_history ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " client_id TEXT NOT NULL,"
+            " rec_date TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " restaurant_name TEXT NOT NULL DEFAULT '',"
+            " menu_name TEXT NOT NULL DEFAULT '',"
+            " source TEXT NOT NULL DEFAULT 'cafeteria')"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_history_client_date"
+            " ON recommendation_history (client_id, rec_date)"
+        )
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_history_client_item'"
+        ).fetchone():
+            # 예전 파일: 중복 행을 하나로 합치고 (가장 최근 시각) 비고유 인덱스를 UNIQUE 로 교체
+            conn.execute(
+                "DELETE FROM recommendation_history WHERE id NOT IN ("
+                " SELECT MAX(id) FROM recommendation_history"
+                " GROUP BY client_id, restaurant_name, menu_name, rec_date)"
+            )
+            conn.execute("DROP INDEX IF EXISTS idx_history_client_item")
+            conn.execute(
+                "CREATE UNIQUE INDEX uq_history_client_item"
+                " ON recommendation_history (client_id, restaurant_name, menu_name, rec_date)"
+            )
+        self._conn = conn
+        print(f"✅ 추천 이력 저장소 연결 ({self.path})")
+        return conn
+
+    async def _run(self, fn, *args):
+        """블로킹 sqlite3 작업을 스레드에서 (연결 하나를 잠금으로 직렬화)"""
+        def call():
+            with self._lock:
+                return fn(self._connect(), *args)
+
+        return await asyncio.to_thread(call)
+
+    @staticmethod
+    def _since(days: int) -> str:
+        return (date.today() - timedelta(days=max(0, days - 1))).isoformat()
+
+    async def record(self, client_id: Optional[str], recs: Iterable[Dict], source: str = "cafeteria") -> None:
+        """추천 결과를 오늘 날짜로 기록"""
+        await self.record_many([client_id], recs, source)
+
+    async def record_many(
+        self,
+        client_ids: Iterable[Optional[str]],
+        recs: Iterable[Dict],
+        source: str = "cafeteria"
+    ) -> None:
+        """같은 추천을 여러 클라이언트에게 보여준 경우 (푸시 브로드캐스트) → 한 번의 executemany"""
+        today = date.today().isoformat()
+        now = time.time()
+        items = [
+            (r.get("restaurant_name") or "", r.get("menu_name") or "")
+            for r in recs
+            if r.get("restaurant_name") or r.get("menu_name")
+        ]
+        rows = [
+            (client_id or "anonymous", today, now, restaurant_name, menu_name, source)
+            for client_id in dict.fromkeys(client_ids)
+            for restaurant_name, menu_name in items
+        ]
+        if not rows:
+            return
+
+        # 가끔씩 보관 기간이 지난 이력 정리
+        self._writes += 1
+        purge_before = self._since(self.retention_days) if self._writes % 200 == 0 else None
+        await self._run(self._insert, rows, purge_before)
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, rows: List[Tuple], purge_before: Optional[str]) -> None:
+        # 같은 날 같은 조합은 한 행 → 마지막으로 보여준 시각 / 출처만 갱신
+        conn.executemany(
+            "INSERT INTO recommendation_history"
+            " (client_id, rec_date, created_at, restaurant_name, menu_name, source)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (client_id, restaurant_name, menu_name, rec_date)"
+            " DO UPDATE SET created_at = excluded.created_at, source = excluded.source",
+            rows,
+        )
+        if purge_before:
+            conn.execute("DELETE FROM recommendation_history WHERE rec_date < ?", (purge_before,))
+
+    async def recent(self, client_id: Optional[str], days: int, limit: int = 30) -> List[Dict]:
+        """최근 N일 동안 이 클라이언트에게 추천한 (식당, 메뉴) - 최신순, 중복 제거"""
+        rows = await self._run(self._select_recent, client_id or "anonymous", self._since(days), limit)
+        return [
+            {"restaurant_name": restaurant or None, "menu_name": menu or None}
+            for restaurant, menu, _ in rows
+        ]
+
+    @staticmethod
+    def _select_recent(conn: sqlite3.Connection, client_id: str, since: str, limit: int) -> List[Tuple]:
+        return conn.execute(
+            "SELECT restaurant_name, menu_name, MAX(created_at) AS last_at"
+            " FROM recommendation_history"
+            " WHERE client_id = ? AND rec_date >= ?"
+            " GROUP BY restaurant_name, menu_name"
+            " ORDER BY last_at DESC"
+            " LIMIT ?",
+            (client_id, since, limit),
+        ).fetchall()
+
+    async def recommended_within(
+        self,
+        client_id: Optional[str],
+        keys: Iterable[Tuple[str, str]],
+        days: int,
+    ) -> Set[Tuple[str, str]]:
+        """주어진 (식당, 메뉴) 중 최근 N일 안에 이미 추천한 것 (조합당 인덱스 탐색 1번)"""
+        return await self._run(self._select_within, client_id or "anonymous", set(keys), self._since(days))
+
+    @staticmethod
+    def _select_within(
+        conn: sqlite3.Connection,
+        client_id: str,
+        keys: Set[Tuple[str, str]],
+        since: str
+    ) -> Set[Tuple[str, str]]:
+        found = set()
+        for restaurant, menu in keys:
+            row = conn.execute(
+                "SELECT 1 FROM recommendation_history"
+                " WHERE client_id = ? AND restaurant_name = ? AND menu_name = ? AND rec_date >= ?"
+                " LIMIT 1",
+                (client_id, restaurant or "", menu or "", since),
+            ).fetchone()
+            if row:
+                found.add((restaurant, menu))
+        return found
+
+
+# 싱글톤 인스턴스
+history_store = HistoryStore()
@@ -0,0 +1,265 @@
+"""
+Job Manager
+오래 걸리는 요청(이미지 OCR → AI 추천, 5~10초)을 비동기 작업으로 돌리는 프로세스 내 작업 큐
+
+- 제출하면 바로 job_id 반환 → 연결을 붙잡지 않음 (모바일 프록시 타임아웃 회피)
+- 고정 개수 워커가 큐에서 꺼내 실행 (동시 실행 수 제한, 큐 길이 제한)
+- 클라이언트별 미완료 작업 수 제한 (한 사용자가 큐를 도배하지 못하게)
+- 끝난 결과는 TTL 동안만 보관, 상태 조회 / 완료 대기(long-poll, SSE)용 이벤트 제공
+
+큐가 꽉 차면 AdmissionRejected("job_queue_full") → 기존 429 핸들러로 응답한다.
+"""
+
+import asyncio
+import contextvars
+import itertools
+import os
+import secrets
+import time
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from services.admission import AdmissionRejected
+from services.tracing import current_span, current_trace, new_trace, span, trace_exporter
+
+load_dotenv()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class Job:
+    """작업 하나의 상태 (결과/오류는 끝난 뒤에만 채워짐)"""
+
+    __slots__ = (
+        "id", "kind", "client_id", "status", "seq", "created_at", "started_at",
+        "finished_at", "result", "error", "done", "trace_id", "parent_span_id", "_runner",
+    )
+
+    def __init__(self, kind: str, client_id: str, runner: Callable[[], Awaitable[Dict]], seq: int):
+        self.id = secrets.token_urlsafe(12)
+        self.kind = kind
+        self.client_id = client_id
+        self.status = JOB_QUEUED
+        self.seq = seq
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict] = None
+        self.error: Optional[Dict] = None
+        self.done = asyncio.Event()
+        trace = current_trace()
+        self.trace_id = trace.trace_id if trace is not None else None  # 제출한 요청의 트레이스
+        self.parent_span_id = getattr(current_span(), "span_id", None)
+        self._runner = runner
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+def _error_of(exc: Exception) -> Dict:
+    """실패 원인 → 동기 API와 같은 상태코드/메시지 (HTTPException 은 덕 타이핑으로)"""
+    if isinstance(exc, AdmissionRejected):
+        return {"status": 429, "detail": str(exc), "reason": exc.reason}
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return {"status": status, "detail": str(getattr(exc, "detail", exc))}
+    return {"status": 500, "detail": str(exc)}
+
+
+class JobManager:
+    """비동기 작업 큐 + 워커 풀 (프로세스 단위)"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        per_client_limit: Optional[int] = None,
+        result_ttl: Optional[float] = None,
+    ):
+        self.worker_count = workers or int(os.getenv("JOB_WORKERS", "4"))
+        self.max_queue = max_queue or int(os.getenv("JOB_MAX_QUEUE", "64"))
+        self.per_client_limit = per_client_limit or int(os.getenv("JOB_PER_CLIENT_LIMIT", "4"))
+        self.result_ttl = result_ttl or float(os.getenv("JOB_RESULT_TTL", "600"))
+
+        self._seq = itertools.count()
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._running = 0
+        self._pending_by_client: Dict[str, int] = defaultdict(int)
+
+        self.submitted_total = 0
+        self.finished_total: Dict[str, int] = defaultdict(int)
+        self.expired_total = 0
+        self.rejected_total = 0
+
+    # =======================================================================
+    # 공개 API
+    # =======================================================================
+    def submit(
+        self,
+        kind: str,
+        runner: Callable[[], Awaitable[Dict]],
+        client_id: Optional[str] = None
+    ) -> Job:
+        """작업 등록 (바로 반환, 실행은 워커가)"""
+        client_id = client_id or "anonymous"
+        self._purge_expired()
+        self._ensure_workers()
+
+        if self._pending_by_client[client_id] >= self.per_client_limit:
+            self.rejected_total += 1
+            raise AdmissionRejected("client_jobs_full", retry_after=2.0)
+        if self._queue.qsize() >= self.max_queue:
+            self.rejected_total += 1
+            raise AdmissionRejected("job_queue_full", retry_after=2.0)
+
+        job = Job(kind, client_id, runner, next(self._seq))
+        self._jobs[job.id] = job
+        self._pending_by_client[client_id] += 1
+        self._queue.put_nowait(job)
+        self.submitted_total += 1
+        print(f"📥 작업 등록: {kind} {job.id} (대기 {self._queue.qsize()}, 실행 {self._running})")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._purge_expired()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """끝날 때까지 최대 timeout 초 대기 (long-poll)"""
+        if not job.finished and timeout > 0:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """대기 중이면 앞에 있는 작업 수 (0 = 다음 차례)"""
+        if job.status != JOB_QUEUED:
+            return None
+        return sum(1 for other in self._jobs.values() if other.status == JOB_QUEUED and other.seq < job.seq)
+
+    def snapshot(self, job: Job) -> Dict:
+        """상태 조회 응답용 dict"""
+        data = {
+            "job_id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "created_at": job.created_at,
+        }
+        if job.started_at is not None:
+            data["started_at"] = job.started_at
+        if job.finished_at is not None:
+            data["finished_at"] = job.finished_at
+            data["expires_at"] = job.finished_at + self.result_ttl
+        position = self.queue_position(job)
+        if position is not None:
+            data["queue_position"] = position
+        if job.result is not None:
+            data["result"] = job.result
+        if job.error is not None:
+            data["error"] = job.error
+        return data
+
+    def stats(self) -> Dict:
+        """현재 상태 (모니터링 / 메트릭용)"""
+        return {
+            "workers": self.worker_count,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "max_queue": self.max_queue,
+            "stored": len(self._jobs),
+            "submitted_total": self.submitted_total,
+            "finished_total": dict(self.finished_total),
+            "expired_total": self.expired_total,
+            "rejected_total": self.rejected_total,
+        }
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._loop = None
+
+    # =======================================================================
+    # 내부 구현
+    # =======================================================================
+    def _ensure_workers(self) -> None:
+        """첫 제출 때 현재 이벤트 루프에서 워커 시작"""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and not all(task.done() for task in self._workers):
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        # 워커는 빈 컨텍스트에서 시작 (첫 제출 요청의 트레이스를 물려받지 않게)
+        self._workers = [
+            asyncio.create_task(self._worker(i), context=contextvars.Context())
+            for i in range(self.worker_count)
+        ]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            self._running += 1
+            try:
+                job.result = await self._run_traced(job)
+                job.status = JOB_SUCCEEDED
+            except asyncio.CancelledError:
+                job.error = {"status": 503, "detail": "서버 종료로 작업이 취소되었습니다."}
+                job.status = JOB_FAILED
+                raise
+            except Exception as e:
+                job.error = _error_of(e)
+                job.status = JOB_FAILED
+            finally:
+                self._running -= 1
+                job.finished_at = time.time()
+                job._runner = None  # 요청 본문(이미지) 참조 해제
+                self._pending_by_client[job.client_id] -= 1
+                if self._pending_by_client[job.client_id] <= 0:
+                    del self._pending_by_client[job.client_id]
+                self.finished_total[job.status] += 1
+                job.done.set()
+                self._queue.task_done()
+                print(
+                    f"{'✅' if job.status == JOB_SUCCEEDED else '❌'} 작업 종료: {job.kind} {job.id} "
+                    f"({job.finished_at - job.created_at:.2f}s)"
+                )
+
+    async def _run_traced(self, job: Job) -> Dict:
+        """작업마다 새 트레이스 (같은 trace id 를 이어서 제출 요청과 한 흐름으로 보이게)"""
+        with new_trace(job.trace_id, job.parent_span_id) as trace:
+            with span(f"job {job.kind}", **{"job.id": job.id}) as job_span:
+                job_span.set_attribute("queue_wait_ms", round((job.started_at - job.created_at) * 1000, 1))
+                try:
+                    return await job._runner()
+                finally:
+                    job_span.end()
+                    trace_exporter.submit(trace)
+
+    def _purge_expired(self) -> None:
+        """TTL 지난 결과 삭제"""
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and now - job.finished_at > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.expired_total += len(expired)
+
+
+# 싱글톤 인스턴스
+job_manager = JobManager()
@@ -0,0 +1,204 @@
+"""
+LLM JSON Extractor / Repair
+모델 응답에서 JSON을 꺼내고, 잘린 응답도 최대한 살려서 스키마 검증까지 한다.
+
+1) 그대로 검증 (정상 JSON은 여기서 끝)
+2) 한 번의 스캔으로 가장 바깥 JSON 객체를 찾는다 (코드블록 / 앞뒤 잡담 무시)
+3) 잘린 응답이면 완결된 항목 경계까지 자르거나 열린 문자열/괄호를 닫아 복구
+4) 그래도 검증이 안 되면 recommendations 중 완결·유효한 항목만 골라낸다
+
+결과별 횟수는 llm_json_metrics 로 모아서 /health 에서 확인한다.
+"""
+
+import json
+import re
+from typing import Dict, List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from services.tracing import current_span, traced
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# 값 없이 끝난 키 ("key": / ,"key")
+_DANGLING_KEY = re.compile(r'([,{])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+
+class LLMJSONError(ValueError):
+    """응답에서 쓸 만한 JSON을 찾지 못함 (→ 폴백)"""
+
+
+class LLMJSONMetrics:
+    """파싱 결과 카운터 (clean / repaired / salvaged / failed)"""
+
+    OUTCOMES = ("clean", "repaired", "salvaged", "failed")
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def record(self, kind: str, outcome: str) -> None:
+        counts = self._counts.setdefault(kind, dict.fromkeys(self.OUTCOMES, 0))
+        counts[outcome] += 1
+        current_span().set_attribute("outcome", outcome)
+
+    def stats(self) -> Dict:
+        result = {}
+        for kind, counts in self._counts.items():
+            total = sum(counts.values())
+            result[kind] = dict(
+                counts,
+                total=total,
+                fallback_rate=round(counts["failed"] / total, 3) if total else 0.0,
+            )
+        return result
+
+
+def extract_json_object(text: str) -> Tuple[Optional[str], List[str]]:
+    """
+    가장 바깥 JSON 객체를 한 번의 스캔으로 찾는다.
+
+    (완결 객체, []) 또는 잘린 경우 (None, [복구 후보...]),
+    객체 시작조차 없으면 (None, []).
+    복구 후보는 ① 마지막 완결 경계까지 자르고 닫은 것 (반쪽 항목 버림)
+    ② 열린 문자열/괄호를 그대로 닫은 것 순서.
+    """
+    start = text.find("{")
+    if start < 0:
+        return None, []
+
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    safe_end = None  # 완결된 배열 원소 / 최상위 값 바로 뒤
+    safe_stack: List[str] = []
+    end = len(text)
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        elif ch in "}]":
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                end = i  # 짝이 안 맞는 괄호 → 여기서 잘린 것으로 본다
+                break
+            stack.pop()
+            if not stack:
+                return text[start:i + 1], []
+            if len(stack) == 1 or stack[-1] == "[":
+                safe_end = i + 1
+                safe_stack = list(stack)
+        elif ch == "," and (len(stack) == 1 or stack[-1] == "["):
+            # 원시값 원소("a", 1, true) 뒤의 쉼표도 경계
+            safe_end = i
+            safe_stack = list(stack)
+
+    candidates = []
+    if safe_end is not None:
+        candidates.append(_close(text[start:safe_end], safe_stack))
+
+    fragment = text[start:end]
+    if in_string:
+        if escaped:
+            fragment = fragment[:-1]
+        fragment += '"'
+    if stack and stack[-1] == "{":
+        fragment = _DANGLING_KEY.sub(r"\1", fragment)
+    candidates.append(_close(fragment, stack))
+    return None, candidates
+
+
+def _close(fragment: str, stack: List[str]) -> str:
+    fragment = fragment.rstrip().rstrip(",")
+    return fragment + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+@traced("llm.json")
+def parse_llm_json(
+    text: str,
+    adapter: TypeAdapter,
+    item_adapter: Optional[TypeAdapter] = None,
+    kind: str = "llm",
+    list_field: str = "recommendations",
+) -> Dict:
+    """
+    LLM 응답 → 검증된 dict
+
+    item_adapter 를 주면 list_field 항목을 하나씩 검증해서 유효한 것만 살린다.
+    쓸 만한 게 하나도 없으면 LLMJSONError.
+    """
+    text = text or ""
+
+    # 1) 정상 JSON (response_mime_type=json 응답 대부분)
+    try:
+        result = adapter.validate_json(text).model_dump(exclude_unset=True)
+        llm_json_metrics.record(kind, "clean")
+        return result
+    except ValidationError:
+        pass
+
+    # 2) 바깥 객체 추출 + 잘림 복구 (후보 중 추천이 남는 첫 번째)
+    complete, candidates = extract_json_object(text)
+    data = None
+    repaired = complete is None
+    for candidate in ([complete] if complete is not None else candidates):
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(parsed, dict):
+            continue
+        data = parsed
+        if not repaired or parsed.get(list_field):
+            break
+
+    if data is None:
+        llm_json_metrics.record(kind, "failed")
+        raise LLMJSONError("응답에서 JSON 객체를 복구하지 못했습니다")
+
+    try:
+        result = adapter.validate_python(data).model_dump(exclude_unset=True)
+        if repaired and item_adapter is not None and not result.get(list_field):
+            raise LLMJSONError("복구했지만 추천 항목이 없습니다")
+        llm_json_metrics.record(kind, "repaired" if repaired else "clean")
+        return result
+    except LLMJSONError:
+        llm_json_metrics.record(kind, "failed")
+        raise
+    except ValidationError as e:
+        if item_adapter is None or not isinstance(data.get(list_field), list):
+            llm_json_metrics.record(kind, "failed")
+            raise LLMJSONError(f"스키마 검증 실패: {e.error_count()}건") from e
+
+    # 3) 항목 단위 구제 (유효한 추천만 남김)
+    valid_items = []
+    for item in data[list_field]:
+        try:
+            item_adapter.validate_python(item)
+            valid_items.append(item)
+        except ValidationError:
+            continue
+    data[list_field] = valid_items
+
+    try:
+        if not valid_items:
+            raise LLMJSONError("유효한 추천 항목이 없습니다")
+        result = adapter.validate_python(data).model_dump(exclude_unset=True)
+    except (ValidationError, LLMJSONError) as e:
+        llm_json_metrics.record(kind, "failed")
+        raise LLMJSONError(f"항목 구제 실패: {e}") from e
+
+    llm_json_metrics.record(kind, "salvaged")
+    return result
+
+
+# 싱글톤 인스턴스
+llm_json_metrics = LLMJSONMetrics()
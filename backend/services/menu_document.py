@@ -0,0 +1,330 @@
+"""
+Menu Document Extractor
+PDF(텍스트 레이어) / HTML 표 식단표에서 오늘 중식 메뉴를 로컬로 뽑는다 (Vision 호출 없음).
+
+- HTML : html.parser 로 <table> 을 격자로 펼친다 (rowspan / colspan 반영)
+- PDF  : pypdf 레이아웃 추출 → 요일 헤더 위치를 기준으로 글자 덩어리를 열에 배정
+- 격자 : 요일 헤더 → 오늘 열, 식사 라벨(조식/중식/석식) → 중식 행만 골라 텍스트로 합친다
+
+요일이 행으로 놓인 표(요일 x 식사)는 전치해서 같은 규칙으로 처리한다.
+pypdf 는 선택 의존성 (없으면 PDF만 DocumentExtractionError).
+"""
+
+import io
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from services.weather_service import KST
+
+WEEKDAYS = ("월", "화", "수", "목", "금", "토", "일")
+_WEEKDAYS_EN = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+# "월", "월요일", "10/20(월)", "20일 (월)", "Mon", "Tues.", "Thursday" - 메뉴명 속 글자(월남쌈)는 걸리지 않게 경계 필요
+# 영어는 요일 약어 / 전체 이름만 (Fried rice, Wedge salad, Sundae, Satay, Monkfish 는 요일이 아님)
+_WEEKDAY_PATTERN = re.compile(
+    r"(?:^|[\s(\[/.])([월화수목금토일])(?:요일)?(?=$|[\s)\]])"
+    r"|([월화수목금토일])요일"
+    r"|\b(mon|tues?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?\b\.?",
+    re.IGNORECASE,
+)
+_MEAL_PATTERNS = (
+    ("breakfast", re.compile(r"조식|아침|breakfast", re.IGNORECASE)),
+    ("lunch", re.compile(r"중식|점심|lunch", re.IGNORECASE)),
+    ("dinner", re.compile(r"석식|저녁|dinner", re.IGNORECASE)),
+)
+# 칼로리/가격/숫자만 있는 칸
+_NOISE_CELL = re.compile(r"^[\s\d,.:~\-/()]*(kcal|칼로리|원|g)?[\s\d,.]*$", re.IGNORECASE)
+
+
+class DocumentExtractionError(ValueError):
+    """문서에서 텍스트를 뽑을 수 없음 (스캔 PDF, pypdf 미설치 등)"""
+
+
+def detect_document_type(data: bytes) -> Optional[str]:
+    """매직 넘버 / 태그로 문서 종류 판별 ("pdf" | "html" | None=이미지)"""
+    if data.startswith(b"%PDF-"):
+        return "pdf"
+    head = data[:2048].lstrip().lower()
+    if head.startswith((b"<!doctype html", b"<html", b"<table", b"<meta", b"<head", b"<body")):
+        return "html"
+    if b"<table" in head:
+        return "html"
+    return None
+
+
+def weekday_of(text: str) -> Optional[int]:
+    """칸 텍스트의 요일 인덱스 (월=0), 요일 칸이 아니면 None"""
+    if len(text) > 20:
+        return None
+    match = _WEEKDAY_PATTERN.search(text)
+    if not match:
+        return None
+    korean = match.group(1) or match.group(2)
+    if korean:
+        return WEEKDAYS.index(korean)
+    return _WEEKDAYS_EN.index(match.group(3).lower()[:3])
+
+
+def meal_of(text: str) -> Optional[str]:
+    """칸 텍스트의 식사 구분 ("breakfast" | "lunch" | "dinner"), 라벨이 아니면 None"""
+    text = (text or "").strip().lstrip("[(<")
+    if not text or len(text) > 20:
+        return None
+    for meal, pattern in _MEAL_PATTERNS:
+        if pattern.match(text):
+            return meal
+    return None
+
+
+# =======================================================================
+# HTML 표 → 격자
+# =======================================================================
+class _TableParser(HTMLParser):
+    """<table> 마다 [행][열] 문자열 격자 (rowspan/colspan 은 같은 텍스트로 채움)"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables: List[List[List[str]]] = []
+        self._stack: List[Dict] = []  # 중첩 표 대비
+        self._cell: Optional[List[str]] = None
+        self._span = (1, 1)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._stack.append({"rows": [], "row": None, "pending": {}})
+        elif not self._stack:
+            return
+        elif tag == "tr":
+            self._start_row()
+        elif tag in ("td", "th"):
+            if self._stack[-1]["row"] is None:
+                self._start_row()
+            attrs = dict(attrs)
+            self._cell = []
+            self._span = (_span(attrs.get("rowspan")), _span(attrs.get("colspan")))
+        elif tag == "br" and self._cell is not None:
+            self._cell.append("\n")
+
+    def handle_endtag(self, tag):
+        if not self._stack:
+            return
+        if tag in ("td", "th"):
+            self._end_cell()
+        elif tag == "tr":
+            self._end_cell()
+            self._end_row()
+        elif tag == "table":
+            self._end_cell()
+            self._end_row()
+            self.tables.append(self._stack.pop()["rows"])
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def _start_row(self):
+        self._end_row()
+        table = self._stack[-1]
+        table["row"] = []
+        self._fill_pending(table)
+
+    def _fill_pending(self, table):
+        """위 행에서 내려온 rowspan 칸을 현재 위치에 채운다"""
+        row = table["row"]
+        while len(row) in table["pending"]:
+            col = len(row)
+            remaining, text = table["pending"][col]
+            row.append(text)
+            if remaining <= 1:
+                del table["pending"][col]
+            else:
+                table["pending"][col] = (remaining - 1, text)
+
+    def _end_cell(self):
+        if self._cell is None or not self._stack:
+            return
+        table = self._stack[-1]
+        text = "\n".join(line.strip() for line in "".join(self._cell).split("\n") if line.strip())
+        rowspan, colspan = self._span
+        for _ in range(colspan):
+            col = len(table["row"])
+            table["row"].append(text)
+            if rowspan > 1:
+                table["pending"][col] = (rowspan - 1, text)
+            self._fill_pending(table)
+        self._cell = None
+
+    def _end_row(self):
+        if not self._stack:
+            return
+        table = self._stack[-1]
+        if table["row"] is not None:
+            if any(table["row"]):
+                table["rows"].append(table["row"])
+            table["row"] = None
+
+
+def _span(value) -> int:
+    try:
+        return max(1, min(int(value), 50))
+    except (TypeError, ValueError):
+        return 1
+
+
+def html_tables(html: str) -> List[List[List[str]]]:
+    parser = _TableParser()
+    parser.feed(html)
+    parser.close()
+    return parser.tables
+
+
+# =======================================================================
+# PDF 텍스트 레이어 → 격자
+# =======================================================================
+def pdf_lines(data: bytes) -> List[str]:
+    """PDF 텍스트 레이어 (열 위치를 살린 레이아웃 모드)"""
+    try:
+        from pypdf import PdfReader  # 선택 의존성, PDF 입력 때만 로드
+    except ImportError as e:
+        raise DocumentExtractionError("PDF 처리를 위해 pypdf 패키지가 필요합니다.") from e
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        lines = []
+        for page in reader.pages:
+            try:
+                text = page.extract_text(extraction_mode="layout")
+            except TypeError:  # 레이아웃 모드가 없는 구버전
+                text = page.extract_text()
+            lines.extend((text or "").splitlines())
+    except Exception as e:
+        raise DocumentExtractionError(f"PDF를 읽을 수 없습니다: {e}") from e
+
+    return [line for line in lines if line.strip()]
+
+
+def layout_grid(lines: List[str]) -> List[List[str]]:
+    """
+    레이아웃 텍스트 줄 → 격자
+
+    요일이 2개 이상 있는 첫 줄을 헤더로 보고, 각 글자 덩어리를
+    가장 가까운 요일 열에 배정한다 (첫 요일보다 왼쪽은 라벨 열 0).
+    """
+    tokenized = [
+        [(m.start(), m.group()) for m in re.finditer(r"\S+(?: \S+)*", line)]
+        for line in lines
+    ]
+
+    anchors = None
+    for tokens in tokenized:
+        days = [(start + len(text) / 2) for start, text in tokens if weekday_of(text) is not None]
+        if len(days) >= 2:
+            anchors = days
+            break
+
+    if anchors is None:
+        return [[text for _, text in tokens] for tokens in tokenized]
+
+    margin = (anchors[1] - anchors[0]) / 2
+    grid = []
+    for tokens in tokenized:
+        row = [""] * (len(anchors) + 1)
+        for start, text in tokens:
+            center = start + len(text) / 2
+            if center < anchors[0] - margin:
+                col = 0
+            else:
+                col = 1 + min(range(len(anchors)), key=lambda i: abs(anchors[i] - center))
+            row[col] = f"{row[col]} {text}".strip()
+        grid.append(row)
+    return grid
+
+
+# =======================================================================
+# 격자 → 오늘 중식 메뉴
+# =======================================================================
+def _day_columns(row: List[str]) -> Dict[int, int]:
+    return {col: day for col, day in ((c, weekday_of(t)) for c, t in enumerate(row)) if day is not None}
+
+
+def _transpose_if_days_in_rows(grid: List[List[str]]) -> List[List[str]]:
+    """요일이 첫 열에 세로로 있으면 전치 (요일 x 식사 → 식사 x 요일)"""
+    first_col_days = sum(1 for row in grid if row and weekday_of(row[0]) is not None)
+    header_days = max((len(_day_columns(row)) for row in grid[:3]), default=0)
+    if first_col_days >= 2 and first_col_days > header_days:
+        width = max(len(row) for row in grid)
+        padded = [row + [""] * (width - len(row)) for row in grid]
+        return [list(col) for col in zip(*padded)]
+    return grid
+
+
+def lunch_menu_from_grid(grid: List[List[str]], weekday: int) -> str:
+    """격자에서 오늘(weekday) 중식 칸만 모아 "메뉴, 메뉴" 텍스트로"""
+    grid = _transpose_if_days_in_rows([row for row in grid if any(cell.strip() for cell in row)])
+    if not grid:
+        return ""
+
+    # 요일 헤더 (없으면 모든 열 사용)
+    header_index, day_cols = None, {}
+    for index, row in enumerate(grid):
+        cols = _day_columns(row)
+        if len(cols) >= 2:
+            header_index, day_cols = index, cols
+            break
+
+    if day_cols:
+        today_cols = [col for col, day in day_cols.items() if day == weekday]
+        if not today_cols:
+            return ""  # 표에 오늘이 없음 (주말 등)
+        rows = grid[header_index + 1:]
+    else:
+        today_cols = None
+        rows = grid
+
+    # 식사 라벨 → 중식 행만 (라벨 없는 행은 바로 위 라벨을 이어받음)
+    has_meal_labels = any(meal_of(cell) for row in rows for cell in row[:2])
+    current_meal = None
+    items: List[str] = []
+    for row in rows:
+        label_cols = [col for col, cell in enumerate(row[:2]) if meal_of(cell)]
+        if label_cols:
+            current_meal = meal_of(row[label_cols[0]])
+        if has_meal_labels and current_meal != "lunch":
+            continue
+
+        cols = today_cols if today_cols is not None else range(len(row))
+        for col in cols:
+            if col >= len(row) or col in label_cols:
+                continue
+            for line in re.split(r"[\n/]", row[col]):
+                line = line.strip()
+                if line and not _NOISE_CELL.match(line) and meal_of(line) is None:
+                    items.append(line)
+
+    return ", ".join(items)
+
+
+def extract_menu_text(data: bytes, doc_type: str, weekday: Optional[int] = None) -> str:
+    """PDF/HTML 원본 → 오늘 중식 메뉴 텍스트 (없으면 빈 문자열)"""
+    if weekday is None:
+        weekday = datetime.now(KST).weekday()  # 서버 시간대와 무관하게 한국 기준 오늘
+
+    if doc_type == "html":
+        html = data.decode("utf-8", errors="replace")
+        grids = html_tables(html)
+        if not grids:
+            # 표가 없는 HTML → 태그를 걷어낸 줄 단위 텍스트
+            text = re.sub(r"<[^>]+>", "\n", html)
+            grids = [[[line.strip()] for line in text.splitlines() if line.strip()]]
+    elif doc_type == "pdf":
+        grids = [layout_grid(pdf_lines(data))]
+    else:
+        raise DocumentExtractionError(f"지원하지 않는 문서 형식: {doc_type}")
+
+    # 오늘 중식이 나오는 첫 번째 표
+    for grid in grids:
+        text = lunch_menu_from_grid(grid, weekday)
+        if text:
+            return text
+    return ""
@@ -0,0 +1,169 @@
+"""
+Menu Similarity Index
+"김치찌개를 피하라 → 된장찌개/순두부찌개도 피하라" 같은 의미적 제외를 LLM 대신 로컬에서 결정적으로 처리한다.
+
+메뉴 벡터 = [요리 계열 one-hot (찌개, 까스, 파스타 ...)] + [글자 bigram 해시]
+- 계열이 같으면 유사도가 크게 오르고 (김치찌개 ~ 된장찌개)
+- 글자만 겹치는 다른 계열은 낮게 남는다 (김치찌개 ~ 김치볶음밥)
+
+자주 나오는 메뉴 사전은 정규화된 행렬로 미리 만들어 두고,
+후보/LLM 출력 필터링은 (N x D) @ (D x M) 코사인 한 번으로 끝낸다.
+"""
+
+import os
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 계열 키워드 (긴 것부터 매칭하고 지워서 "칼국수"가 "국"으로도 잡히지 않게, "$"는 끝에 올 때만)
+MENU_FAMILIES: Dict[str, Sequence[str]] = {
+    "stew": ("찌개",),
+    "soup": ("국밥", "설렁탕", "곰탕", "갈비탕", "감자탕", "육개장", "해장국", "탕$", "국$"),
+    "hotpot": ("전골", "샤브샤브", "훠궈"),
+    "cutlet": ("돈까스", "돈카츠", "까스", "카츠", "커틀릿"),
+    "stirfry": ("볶음", "제육", "주물럭", "닭갈비"),
+    "grill": ("구이", "불고기", "삼겹살", "스테이크", "갈비찜", "갈비"),
+    "rice_bowl": ("덮밥", "비빔밥", "볶음밥", "오므라이스", "카레", "돈부리", "동$"),
+    "cold_noodle": ("냉면", "막국수", "소바", "메밀"),
+    "noodle_soup": ("칼국수", "우동", "라멘", "라면", "쌀국수", "국수", "수제비"),
+    "chinese_noodle": ("짜장", "짬뽕", "울면"),
+    "pasta": ("파스타", "스파게티", "까르보나라", "봉골레", "알리오", "리조또"),
+    "sushi": ("초밥", "스시", "사시미", "회덮밥", "회$"),
+    "salad": ("샐러드", "포케", "그레인볼"),
+    "bread": ("샌드위치", "버거", "피자", "토스트", "베이글"),
+    "mala": ("마라탕", "마라샹궈", "마라"),
+    "pancake": ("파전", "부침개", "김치전", "전$"),
+    "snack": ("떡볶이", "김밥", "순대", "튀김", "어묵"),
+    "set_meal": ("정식", "한정식", "백반", "도시락"),
+}
+
+# 미리 벡터로 만들어 두는 자주 나오는 메뉴 (후보 menuExamples + 대표 점심 메뉴)
+DEFAULT_VOCABULARY = (
+    "김치찌개", "된장찌개", "순두부찌개", "부대찌개", "청국장", "사골국밥", "순대국밥", "설렁탕",
+    "곰탕", "갈비탕", "감자탕", "육개장", "해장국", "전골", "곱창전골", "샤브샤브",
+    "돈까스", "치즈돈까스", "생선까스", "카츠동", "제육볶음", "오징어볶음", "닭갈비", "낙지볶음",
+    "불고기", "불고기정식", "갈비찜", "삼겹살", "함박스테이크", "스테이크", "생선구이",
+    "비빔밥", "돌솥비빔밥", "김치볶음밥", "볶음밥", "오므라이스", "카레라이스", "연어덮밥", "회덮밥",
+    "평양냉면", "물냉면", "비빔냉면", "막국수", "칼국수", "우동", "라멘", "돈코츠라멘", "미소라멘",
+    "차슈라멘", "라면", "쌀국수", "잔치국수", "수제비", "짜장면", "짬뽕", "탕수육", "꿔바로우",
+    "마라탕", "마라샹궈", "양꼬치", "트러플 파스타", "봉골레 파스타", "까르보나라", "해산물 파스타",
+    "크림 파스타", "토마토 파스타", "오일 파스타", "로제 파스타", "리조또", "피자", "샐러드",
+    "그레인볼", "포케", "샌드위치", "햄버거", "초밥", "모둠초밥", "회", "파전", "해물파전", "김치전",
+    "떡볶이", "김밥", "순대", "튀김", "한정식", "백반",
+)
+
+BIGRAM_DIM = 256
+FAMILY_WEIGHT = 0.7  # 유사도에서 계열이 차지하는 비중 (나머지는 글자 bigram)
+
+
+_KEYWORDS = sorted(
+    ((keyword, i) for i, family in enumerate(MENU_FAMILIES) for keyword in MENU_FAMILIES[family]),
+    key=lambda item: -len(item[0].rstrip("$")),
+)
+
+
+def _family_hits(name: str) -> List[int]:
+    """메뉴명이 속한 계열 인덱스들"""
+    work = name.replace(" ", "")
+    hits = []
+    for keyword, index in _KEYWORDS:
+        if keyword.endswith("$"):
+            stem = keyword[:-1]
+            if work.endswith(stem) and work:
+                hits.append(index)
+                work = work[: -len(stem)] + " "
+        elif keyword in work:
+            hits.append(index)
+            work = work.replace(keyword, " ")
+    return hits
+
+
+def _bigrams(name: str) -> List[str]:
+    compact = name.replace(" ", "")
+    if len(compact) < 2:
+        return [compact] if compact else []
+    return [compact[i:i + 2] for i in range(len(compact) - 1)]
+
+
+class MenuSimilarityIndex:
+    """메뉴명 코사인 유사도 인덱스 (numpy는 첫 사용 때 로드)"""
+
+    def __init__(
+        self,
+        vocabulary: Iterable[str] = DEFAULT_VOCABULARY,
+        threshold: Optional[float] = None,
+    ):
+        self.threshold = threshold or float(os.getenv("MENU_SIMILARITY_THRESHOLD", "0.6"))
+        self._vocabulary = list(dict.fromkeys(vocabulary))
+        self._np = None
+        self._rows: Dict[str, int] = {}
+        self._matrix = None
+
+    def _ensure_loaded(self) -> None:
+        if self._np is not None:
+            return
+        import numpy as np  # 첫 필터링 때만 로드 (import 시간 예산)
+
+        self._np = np
+        self._matrix = self._encode(self._vocabulary)
+        self._rows = {name: i for i, name in enumerate(self._vocabulary)}
+
+    def warm_up(self) -> int:
+        """기동 워밍업용: numpy 로드 + 사전 행렬 계산, 사전 크기 반환"""
+        self._ensure_loaded()
+        return len(self._rows)
+
+    def _encode(self, names: Sequence[str]):
+        """메뉴명들 → 행 단위 L2 정규화 벡터 (N x D)"""
+        np = self._np
+        family_dim = len(MENU_FAMILIES)
+        family_part = np.zeros((len(names), family_dim), dtype=np.float32)
+        bigram_part = np.zeros((len(names), BIGRAM_DIM), dtype=np.float32)
+
+        for row, name in enumerate(names):
+            for index in _family_hits(name):
+                family_part[row, index] = 1.0
+            for gram in _bigrams(name):
+                bigram_part[row, zlib.crc32(gram.encode()) % BIGRAM_DIM] += 1.0
+
+        def normalize(part):
+            norms = np.linalg.norm(part, axis=1, keepdims=True)
+            return np.divide(part, norms, out=np.zeros_like(part), where=norms > 0)
+
+        family_part = normalize(family_part) * np.sqrt(FAMILY_WEIGHT)
+        bigram_part = normalize(bigram_part) * np.sqrt(1.0 - FAMILY_WEIGHT)
+        return normalize(np.hstack([family_part, bigram_part]))
+
+    def vectors(self, names: Sequence[str]):
+        """사전에 있는 메뉴는 미리 계산한 행, 없는 메뉴만 새로 인코딩"""
+        self._ensure_loaded()
+        np = self._np
+        names = [(n or "").strip() for n in names]
+        missing = [n for n in names if n not in self._rows]
+        encoded = dict(zip(missing, self._encode(missing))) if missing else {}
+        if not names:
+            return np.zeros((0, self._matrix.shape[1]), dtype=np.float32)
+        return np.stack([
+            self._matrix[self._rows[n]] if n in self._rows else encoded[n]
+            for n in names
+        ])
+
+    def max_similarity(self, names: Sequence[str], avoid: Sequence[str]):
+        """각 메뉴의 avoid 목록 대비 최대 코사인 유사도 (N,)"""
+        self._ensure_loaded()
+        avoid = [a for a in avoid if a]
+        if not names or not avoid:
+            return self._np.zeros(len(names), dtype=self._np.float32)
+        return (self.vectors(names) @ self.vectors(avoid).T).max(axis=1)
+
+    def similar_mask(self, names: Sequence[str], avoid: Sequence[str]) -> List[bool]:
+        """avoid 중 하나와 threshold 이상으로 비슷하면 True"""
+        if not names or not any(avoid):
+            return [False] * len(names)
+        return (self.max_similarity(names, avoid) >= self.threshold).tolist()
+
+
+# 싱글톤 인스턴스
+menu_index = MenuSimilarityIndex()
@@ -1,54 +1,78 @@
 """
 OCR Service
 식단표 이미지에서 메뉴 텍스트를 추출하는 서비스
+
+PDF(텍스트 레이어) / HTML 표 식단표는 Vision 호출 없이 로컬에서 추출한다 (services/menu_document.py).
 """
 
-import google.generativeai as genai
 import base64
+import hashlib
 import re
+import time
+from datetime import datetime
 from typing import Optional
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from services.cache import get_cache
+from services.genai_client import get_genai, llm_usage
+from services.tracing import current_span, span, traced
+from services.weather_service import KST
+from services.admission import llm_admission, AdmissionRejected, PRIORITY_INTERACTIVE
+from services.menu_document import (
+    DocumentExtractionError,
+    detect_document_type,
+    extract_menu_text,
+)
 
 
 class OCRService:
     """Gemini Vision API를 사용한 식단표 이미지 처리"""
     
     def __init__(self):
-        """OCR 서비스 초기화"""
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
-            raise ValueError("❌ GEMINI_API_KEY가 설정되지 않았습니다. .env 파일을 확인하세요.")
+        """OCR 서비스 초기화 (Vision 모델은 첫 사용 시 생성)"""
+        self._model = None
+        # 같은 식단표 이미지는 하루 동안 Vision 호출 없이 재사용
+        self.cache = get_cache("ocr")
+        print("✅ OCR Service 준비 (Gemini Vision, 지연 로딩)")
 
-        
-        genai.configure(api_key=api_key)
-        
-        # Vision 모델 설정
-        self.model = genai.GenerativeModel(
-            'gemini-2.0-flash',
-            generation_config={
-                "temperature": 0.3,  # 낮은 temperature로 정확도 향상
-                "top_p": 0.8,
-                "top_k": 40,
-                "max_output_tokens": 1024,
-            }
-        )
-        
-        print("✅ OCR Service 초기화 완료 (Gemini Vision)")
+    @property
+    def model(self):
+        """Vision 모델 (API 키가 없으면 첫 사용 시 ValueError)"""
+        if self._model is None:
+            genai = get_genai()
+
+            # Vision 모델 설정
+            self._model = genai.GenerativeModel(
+                'gemini-2.0-flash',
+                generation_config={
+                    "temperature": 0.3,  # 낮은 temperature로 정확도 향상
+                    "top_p": 0.8,
+                    "top_k": 40,
+                    "max_output_tokens": 1024,
+                }
+            )
+            print("✅ OCR Service 초기화 완료 (Gemini Vision)")
+        return self._model
+
+    def warm_up(self) -> None:
+        """기동 직후 Vision 모델을 미리 만든다 (키가 없으면 건너뜀)"""
+        try:
+            _ = self.model
+        except ValueError as e:
+            print(f"⚠️ OCR 워밍업 건너뜀: {e}")
     
+    @traced("ocr.extract")
     async def extract_menu_from_image(
         self, 
         base64_image: str,
-        fallback_text: Optional[str] = None
+        fallback_text: Optional[str] = None,
+        client_id: Optional[str] = None
     ) -> dict:
         """
-        이미지에서 메뉴 텍스트 추출
+        이미지(또는 PDF/HTML 식단표)에서 메뉴 텍스트 추출
         
         Args:
-            base64_image: Base64 인코딩된 이미지 데이터
+            base64_image: Base64 인코딩된 이미지 / PDF / HTML 데이터
             fallback_text: OCR 실패 시 사용할 대체 텍스트 (선택)
+            client_id: 입장 제어(공정 분배)용 클라이언트 식별자 (선택)
         
         Returns:
             dict: {
@@ -56,6 +80,7 @@ class OCRService:
                 "menu_text": str,  # 추출된 메뉴 텍스트
                 "menu_list": list,  # 메뉴 리스트
                 "confidence": str,  # 신뢰도 ("high", "medium", "low")
+                "source": str,  # "vision" | "pdf" | "html"
                 "error": str (optional)
             }
         """
@@ -67,11 +92,41 @@ class OCRService:
                 base64_image = base64_image.split(',')[1]
             
             # 이미지 타입 감지
-            image_bytes = base64.b64decode(base64_image)
-            mime_type = self._detect_mime_type(image_bytes)
-            
-            # Gemini Vision API 호출
-            menu_text = await self._call_gemini_vision(base64_image, mime_type)
+            with span("ocr.decode") as decode_span:
+                image_bytes = base64.b64decode(base64_image)
+                doc_type = detect_document_type(image_bytes)
+                mime_type = "application/pdf" if doc_type == "pdf" else self._detect_mime_type(image_bytes)
+                decode_span.set_attribute("bytes", len(image_bytes))
+                decode_span.set_attribute("mime_type", mime_type)
+
+            # ✅ 캐시 확인 (요일에 따라 추출 결과가 달라지므로 날짜 포함)
+            cache_key = f"{datetime.now(KST).date().isoformat()}:{hashlib.sha256(image_bytes).hexdigest()}"
+            cached = await self.cache.get(cache_key)
+            current_span().set_attribute("cache.hit", bool(cached))
+            if cached:
+                print("♻️ OCR 캐시 사용")
+                return cached
+
+            menu_text = ""
+            source = "vision"
+            if doc_type:
+                # ✅ PDF/HTML → 텍스트 레이어/표에서 바로 추출 (수 ms, Vision 호출 없음)
+                try:
+                    with span("ocr.document", type=doc_type):
+                        menu_text = self._clean_extracted_text(extract_menu_text(image_bytes, doc_type))
+                    source = doc_type
+                    print(f"📄 {doc_type.upper()} 식단표에서 로컬 추출")
+                except DocumentExtractionError as e:
+                    if doc_type == "html":
+                        raise
+                    print(f"⚠️ PDF 텍스트 추출 실패 → Vision 사용: {e}")
+
+                if doc_type == "html" and not menu_text:
+                    raise DocumentExtractionError("HTML 식단표에서 오늘 점심 메뉴를 찾지 못했습니다.")
+
+            if not menu_text:
+                # Gemini Vision API 호출 (이미지, 스캔 PDF, 로컬 추출 실패한 PDF)
+                menu_text = await self._call_gemini_vision(base64_image, mime_type, client_id)
             
             # 메뉴 리스트 파싱
             menu_list = self._parse_menu_text(menu_text)
@@ -83,14 +138,31 @@ class OCRService:
                 "success": True,
                 "menu_text": menu_text,
                 "menu_list": menu_list,
-                "confidence": confidence
+                "confidence": confidence,
+                "source": source
             }
             
             print(f"✅ 메뉴 추출 완료: {len(menu_list)}개 메뉴 발견")
             print(f"📋 추출된 메뉴: {', '.join(menu_list[:5])}{'...' if len(menu_list) > 5 else ''}")
+
+            if menu_list:
+                await self.cache.set(cache_key, result, ttl=24 * 3600)
             
             return result
-            
+
+        except AdmissionRejected:
+            # 대체 텍스트가 없으면 429로 빠르게 돌려보낸다
+            if not (fallback_text and fallback_text.strip()):
+                raise
+            print("⛔ OCR 대기열 초과 - 입력 텍스트로 대체")
+            return {
+                "success": True,
+                "menu_text": fallback_text,
+                "menu_list": self._parse_menu_text(fallback_text),
+                "confidence": "fallback",
+                "error": "OCR 요청이 몰려 입력 텍스트를 사용했습니다."
+            }
+
         except Exception as e:
             error_msg = f"이미지 처리 실패: {str(e)}"
             print(f"❌ {error_msg}")
@@ -113,13 +185,18 @@ class OCRService:
                 "error": error_msg
             }
     
-    async def _call_gemini_vision(self, base64_image: str, mime_type: str) -> str:
+    @traced("ocr.vision")
+    async def _call_gemini_vision(
+        self,
+        base64_image: str,
+        mime_type: str,
+        client_id: Optional[str] = None
+    ) -> str:
         """Gemini Vision API 호출"""
         
-        # 현재 요일 가져오기
-        from datetime import datetime
+        # 현재 요일 가져오기 (한국 기준)
         weekdays_kr = ['월요일', '화요일', '수요일', '목요일', '금요일', '토요일', '일요일']
-        today_weekday = weekdays_kr[datetime.now().weekday()]
+        today_weekday = weekdays_kr[datetime.now(KST).weekday()]
         
         # 이미지 파트 생성
         image_part = {
@@ -187,7 +264,10 @@ class OCRService:
 """
         
         # Gemini 호출
-        response = self.model.generate_content([prompt, image_part])
+        async with llm_admission.slot(client_id, PRIORITY_INTERACTIVE):
+            started = time.perf_counter()
+            response = await self.model.generate_content_async([prompt, image_part])
+            llm_usage.record("ocr", "text", response, (time.perf_counter() - started) * 1000)
         menu_text = response.text.strip()
         
         # 불필요한 텍스트 제거
@@ -0,0 +1,282 @@
+"""
+Place Service
+카카오 로컬(키워드 검색) 프록시 - 추천 메뉴가 근처에 실제로 있는지 서버에서 확인하고 결과를 응답에 붙인다.
+
+- 검색 클라이언트 교체 가능 (KakaoPlaceClient / StubPlaceClient)
+- 캐시 키 = (검색어, 위치 격자, 반경) → 같은 동네 사용자끼리 결과 공유
+- 추천 세트의 모든 검색어(normalized_search_query + alt_queries)를 한 번에 동시 조회
+  (같은 키는 진행 중인 조회를 같이 기다림, 동시 호출 수 제한)
+
+PLACE_CLIENT=kakao|stub|off (기본: KAKAO_REST_API_KEY 가 있으면 kakao, 없으면 off)
+"""
+
+import asyncio
+import hashlib
+import math
+import os
+from typing import Dict, Iterable, List, Optional
+import httpx
+from dotenv import load_dotenv
+from services.cache import get_cache
+from services.tracing import traced
+
+load_dotenv()
+
+# 응답에 남길 필드 (카카오 JS SDK 검색 결과와 같은 이름 → 프론트 코드 그대로 사용)
+PLACE_FIELDS = (
+    "id", "place_name", "category_name", "phone", "address_name",
+    "road_address_name", "x", "y", "place_url", "distance",
+)
+
+
+class KakaoPlaceClient:
+    """카카오 로컬 REST API 키워드 검색"""
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 5.0):
+        self.api_key = api_key
+        self.base_url = base_url or os.getenv("KAKAO_LOCAL_URL", "https://dapi.kakao.com")
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # 배치 조회가 같은 연결을 재사용하도록 클라이언트 하나를 공유
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers={"Authorization": f"KakaoAK {self.api_key}"},
+            )
+        return self._client
+
+    async def search(
+        self,
+        query: str,
+        latitude: float,
+        longitude: float,
+        radius: int,
+        size: int = 10
+    ) -> List[Dict]:
+        response = await self.client.get(
+            "/v2/local/search/keyword.json",
+            params={
+                "query": query,
+                "x": longitude,
+                "y": latitude,
+                "radius": radius,
+                "size": size,
+                "sort": "distance",
+                "category_group_code": "FD6",  # 음식점
+            },
+        )
+        response.raise_for_status()
+        return response.json().get("documents", [])
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StubPlaceClient:
+    """개발/테스트용 가짜 검색 (검색어로 결정되는 근처 식당 몇 곳, 네트워크 없음)"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def search(
+        self,
+        query: str,
+        latitude: float,
+        longitude: float,
+        radius: int,
+        size: int = 10
+    ) -> List[Dict]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        digest = hashlib.sha1(query.encode("utf-8")).digest()
+        places = []
+        for i in range(min(size, 1 + digest[0] % 4)):
+            # 반경 안쪽 결정적 위치
+            distance = int(radius * (digest[i + 1] / 255) * 0.9)
+            angle = digest[i + 5] / 255 * 2 * math.pi
+            dlat = distance * math.cos(angle) / 111_000
+            dlng = distance * math.sin(angle) / (111_000 * math.cos(math.radians(latitude)))
+            places.append({
+                "id": f"stub_{digest.hex()[:8]}_{i}",
+                "place_name": f"{query} {'본점' if i == 0 else f'{i + 1}호점'}",
+                "category_name": "음식점",
+                "phone": "",
+                "address_name": "",
+                "road_address_name": "",
+                "x": f"{longitude + dlng:.6f}",
+                "y": f"{latitude + dlat:.6f}",
+                "place_url": "",
+                "distance": str(distance),
+            })
+        return places
+
+
+def _distance_m(latitude: float, longitude: float, place: Dict) -> int:
+    """사용자 위치 → 장소 거리 (m, 근거리라 등장방형 근사)"""
+    try:
+        dlat = float(place["y"]) - latitude
+        dlng = (float(place["x"]) - longitude) * math.cos(math.radians(latitude))
+    except (KeyError, TypeError, ValueError):
+        return 0
+    return int(math.hypot(dlat, dlng) * 111_000)
+
+
+def create_place_client():
+    """환경 설정에 맞는 검색 클라이언트 (off 면 None)"""
+    api_key = os.getenv("KAKAO_REST_API_KEY", "")
+    mode = os.getenv("PLACE_CLIENT", "kakao" if api_key else "off").lower()
+    if mode == "stub":
+        return StubPlaceClient()
+    if mode == "kakao" and api_key:
+        return KakaoPlaceClient(api_key)
+    return None
+
+
+class PlaceService:
+    """근처 식당 조회 (캐시 + 동시 배치 조회)"""
+
+    def __init__(self, client=None):
+        self.client = client if client is not None else create_place_client()
+        self.cache = get_cache("places")
+        self.cache_ttl = float(os.getenv("PLACE_CACHE_TTL", "3600"))
+        self.cell_deg = float(os.getenv("PLACE_CELL_DEG", "0.005"))  # 약 500m 격자
+        self.default_radius = int(os.getenv("PLACE_SEARCH_RADIUS", "2000"))
+        self.results_per_rec = int(os.getenv("PLACE_RESULTS_PER_REC", "5"))
+        self._semaphore = asyncio.Semaphore(int(os.getenv("PLACE_MAX_CONCURRENCY", "8")))
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.upstream_calls = 0
+
+        if self.client is None:
+            print("⚠️ 장소 검색 비활성화 (KAKAO_REST_API_KEY 없음, 클라이언트가 직접 검색)")
+        else:
+            print(f"✅ 장소 검색 준비 ({type(self.client).__name__})")
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def _cell(self, latitude: float, longitude: float) -> tuple:
+        """검색 중심 격자 (격자 중심에서 검색해야 같은 칸 사용자끼리 결과를 공유할 수 있다)"""
+        step = self.cell_deg
+        return (
+            round(round(latitude / step) * step, 5),
+            round(round(longitude / step) * step, 5),
+        )
+
+    async def search(
+        self,
+        query: str,
+        latitude: float,
+        longitude: float,
+        radius: Optional[int] = None
+    ) -> List[Dict]:
+        """검색어 하나 조회 (캐시 → 진행 중 조회 합류 → 업스트림)"""
+        if not self.enabled or not query:
+            return []
+
+        radius = radius or self.default_radius
+        cell_lat, cell_lng = self._cell(latitude, longitude)
+        key = f"{query.strip()}:{cell_lat},{cell_lng}:{radius}"
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            async with self._semaphore:
+                self.upstream_calls += 1
+                documents = await self.client.search(query.strip(), cell_lat, cell_lng, radius)
+            places = [{field: doc.get(field, "") for field in PLACE_FIELDS} for doc in documents]
+            await self.cache.set(key, places, self.cache_ttl)
+            future.set_result(places)
+            return places
+        except Exception as e:
+            print(f"⚠️ 장소 검색 실패 ({query}): {e}")
+            future.set_result([])  # 같이 기다리던 요청도 빈 결과로
+            return []
+        finally:
+            if not future.done():  # 취소돼도 합류한 요청이 멈추지 않게
+                future.set_result([])
+            self._inflight.pop(key, None)
+
+    async def aclose(self) -> None:
+        if hasattr(self.client, "aclose"):
+            await self.client.aclose()
+
+    async def search_many(
+        self,
+        queries: Iterable[str],
+        latitude: float,
+        longitude: float,
+        radius: Optional[int] = None
+    ) -> Dict[str, List[Dict]]:
+        """여러 검색어 동시 조회 (중복 검색어는 한 번만)"""
+        unique = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        results = await asyncio.gather(
+            *(self.search(q, latitude, longitude, radius) for q in unique)
+        )
+        return dict(zip(unique, results))
+
+    @traced("places.attach")
+    async def attach_places(
+        self,
+        recommendation: Dict,
+        latitude: float,
+        longitude: float,
+        radius: Optional[int] = None
+    ) -> Dict:
+        """
+        추천 세트의 각 항목에 근처 식당(places)을 붙인다.
+        세트 전체 검색어를 한 번에 조회하고, 항목별로 합쳐서 가까운 순으로 자른다.
+        """
+        recs = recommendation.get("recommendations") or []
+        if not self.enabled or not recs:
+            return recommendation
+
+        def queries_of(rec: Dict) -> List[str]:
+            queries = [rec.get("normalized_search_query") or rec.get("menu_name") or ""]
+            queries.extend(rec.get("alt_queries") or [])
+            return [q for q in queries if q]
+
+        found = await self.search_many(
+            (q for rec in recs for q in queries_of(rec)),
+            latitude,
+            longitude,
+            radius,
+        )
+
+        for rec in recs:
+            merged: Dict[str, Dict] = {}
+            for query in queries_of(rec):
+                for place in found.get(query.strip(), []):
+                    if place["id"] not in merged:
+                        # 검색은 격자 중심 기준 → 거리는 사용자 위치 기준으로 다시 계산
+                        merged[place["id"]] = dict(
+                            place,
+                            distance=str(_distance_m(latitude, longitude, place)),
+                        )
+            rec["places"] = sorted(
+                merged.values(),
+                key=lambda p: int(p["distance"])
+            )[: self.results_per_rec]
+
+        return recommendation
+
+
+# 싱글톤 인스턴스
+place_service = PlaceService()
@@ -0,0 +1,210 @@
+"""
+Push Service
+오늘의 추천을 WebSocket 으로 밀어주는 채널 (위치 격자 / 사이트 단위)
+
+- 채널: cell:{약 1km 격자} (좌표는 가까운 등록 위치로 스냅된 뒤), site:{site_id}
+- 구독하면 지금 결과를 바로 한 번 받고, 그 뒤로는 바뀔 때만 push
+- 바뀜 감지
+  · 날씨 구간 변경: run_watch_loop 가 PUSH_CHECK_INTERVAL 마다 구독 중인 채널만 확인
+    (날씨는 캐시 / 예보 보간이라 확인 자체는 외부 호출 없음)
+  · 사이트 메뉴 게시: 게시 API 가 notify("site:{site_id}")
+- 채널당 계산 한 번 → 직렬화 한 번 → 구독자 전체에 동시에 전송 (클라이언트 N번 폴링 → 계산 1번 + 브로드캐스트)
+
+구독자 목록은 워커(프로세스)별이지만 추천 결과는 공유 캐시(CACHE_BACKEND)를 거치므로
+워커가 여러 개여도 같은 (위치, 날씨 구간)의 LLM 호출은 한 번이다.
+"""
+
+import asyncio
+import os
+from typing import Dict, List, Optional, Set
+
+import orjson
+from dotenv import load_dotenv
+from services.tracing import span
+
+load_dotenv()
+
+# 정상 종료 / 서버 쪽 오류(전송 실패, 클라이언트가 다시 연결) / 등록되지 않은 사이트 (WebSocket close code)
+CLOSE_GOING_AWAY = 1001
+CLOSE_INTERNAL_ERROR = 1011
+CLOSE_UNKNOWN_SITE = 4404
+
+
+class PushChannel:
+    """한 채널의 구독자 + 마지막으로 보낸 결과"""
+
+    def __init__(self, key: str, area: str, latitude: float, longitude: float, site_id: Optional[str] = None):
+        self.key = key
+        self.area = area
+        self.latitude = latitude
+        self.longitude = longitude
+        self.site_id = site_id
+        self.subscribers: Dict[object, str] = {}  # WebSocket → client_id (이력 기록용)
+        self.state: Optional[str] = None  # 마지막으로 보낸 결과의 (게시 버전:)날씨 구간
+        self.message: Optional[str] = None  # 마지막 메시지 (새 구독자에게 그대로)
+        self.recommendations: List[Dict] = []
+        self.lock = asyncio.Lock()
+
+
+class PushService:
+    """오늘의 추천 구독 채널 관리 + 변경 시 브로드캐스트"""
+
+    def __init__(self, weather_service, ai_service, site_service):
+        self.weather_service = weather_service
+        self.ai_service = ai_service
+        self.site_service = site_service
+        self.check_interval = float(os.getenv("PUSH_CHECK_INTERVAL", "300"))
+        self.send_timeout = float(os.getenv("PUSH_SEND_TIMEOUT", "5"))
+        self.channels: Dict[str, PushChannel] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.computed_total = 0
+        self.unchanged_total = 0
+        self.pushed_total = 0
+        self.dropped_total = 0
+
+    # =======================================================================
+    # 채널
+    # =======================================================================
+    def channel_for(
+        self,
+        location: str,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        site_id: Optional[str] = None
+    ) -> Optional[PushChannel]:
+        """요청 위치 → 채널 (등록되지 않은 사이트면 None)"""
+        if site_id:
+            site = self.site_service.get(site_id)
+            if site is None:
+                return None
+            key = f"site:{site_id}"
+            if key not in self.channels:
+                self.channels[key] = PushChannel(key, site["name"], site["lat"], site["lng"], site_id)
+            return self.channels[key]
+
+        area, latitude, longitude = self.weather_service.resolve_location(location, lat, lng)
+        key = f"cell:{latitude:.2f},{longitude:.2f}"
+        if key not in self.channels:
+            self.channels[key] = PushChannel(key, area, latitude, longitude)
+        return self.channels[key]
+
+    async def subscribe(self, websocket, channel: PushChannel, client_id: str) -> None:
+        """구독 등록 + 지금 결과를 바로 전송 (바뀌었으면 채널 전체에)"""
+        channel.subscribers[websocket] = client_id
+        try:
+            changed = await self.refresh(channel)
+        except Exception as e:
+            print(f"⚠️ 오늘의 추천 푸시 계산 실패 ({channel.key}): {e}")
+            await self._send(channel, websocket, orjson.dumps({"type": "error", "detail": str(e)}).decode())
+            return
+        if not changed and channel.message is not None:
+            await self._deliver(channel, {websocket: client_id}, channel.message)
+
+    def unsubscribe(self, websocket, channel: PushChannel) -> None:
+        channel.subscribers.pop(websocket, None)
+        if not channel.subscribers and self.channels.get(channel.key) is channel:
+            del self.channels[channel.key]
+
+    # =======================================================================
+    # 변경 감지 + 브로드캐스트
+    # =======================================================================
+    async def refresh(self, channel: PushChannel, force: bool = False) -> bool:
+        """상태(날씨 구간, 게시 버전)가 바뀌었으면 한 번 계산해서 구독자 전체에 전송"""
+        async with channel.lock:
+            weather = await self.weather_service.get_weather(channel.area, channel.latitude, channel.longitude)
+            state = self.ai_service.weather_bucket(weather)
+            cafeteria_menu = None
+            if channel.site_id:
+                publication = await self.site_service.publication(channel.site_id)
+                if publication is not None:
+                    cafeteria_menu = publication["menu_text"]
+                    state = f"{publication['version']}:{state}"
+
+            if state == channel.state and not force:
+                self.unchanged_total += 1
+                return False
+
+            with span("push.compute", **{"push.channel": channel.key}):
+                data = await self.ai_service.shared_daily_recommendations(
+                    weather,
+                    weather.get("area") or channel.area,
+                    cafeteria_menu,
+                    client_id=f"push:{channel.key}"
+                )
+            channel.state = state
+            channel.message = orjson.dumps({"type": "daily", "channel": channel.key, "data": data}).decode()
+            channel.recommendations = data.get("recommendations", [])
+            self.computed_total += 1
+
+            targets = dict(channel.subscribers)
+            print(f"📡 오늘의 추천 푸시: {channel.key} ({state}) → {len(targets)}명")
+            await self._deliver(channel, targets, channel.message)
+            return True
+
+    async def _deliver(self, channel: PushChannel, targets: Dict[object, str], message: str) -> None:
+        """받는 사람 전체에 동시에 전송 + 이력은 한 번에 기록 (구내식당 추천의 제외 목록에 반영)"""
+        if not targets:
+            return
+        await self.ai_service.history.record_many(targets.values(), channel.recommendations, source="daily")
+        await asyncio.gather(*(self._send(channel, websocket, message) for websocket in targets))
+
+    async def _send(self, channel: PushChannel, websocket, message: str) -> None:
+        try:
+            await asyncio.wait_for(websocket.send_text(message), self.send_timeout)
+            self.pushed_total += 1
+        except Exception:
+            # 끊겼거나 너무 느린 구독자는 정리 + 연결도 닫아서 클라이언트가 다시 연결하게 한다
+            # (다시 연결하면 그때 최신 결과를 받는다, 닫기는 브로드캐스트를 막지 않게 태스크로)
+            self.dropped_total += 1
+            self.unsubscribe(websocket, channel)
+            self._spawn(self._close_quietly(websocket, CLOSE_INTERNAL_ERROR))
+
+    async def _close_quietly(self, websocket, code: int) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=code), self.send_timeout)
+        except Exception:
+            pass
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def notify(self, key: str) -> None:
+        """채널 강제 갱신 예약 (사이트 메뉴 게시 등), 구독자가 없으면 아무것도 안 함"""
+        channel = self.channels.get(key)
+        if channel is None:
+            return
+        self._spawn(self._refresh_quietly(channel, force=True))
+
+    async def _refresh_quietly(self, channel: PushChannel, force: bool = False) -> None:
+        try:
+            await self.refresh(channel, force=force)
+        except Exception as e:
+            print(f"⚠️ 오늘의 추천 푸시 갱신 실패 ({channel.key}): {e}")
+
+    async def run_watch_loop(self, interval: Optional[float] = None) -> None:
+        """구독 중인 채널의 날씨 구간 변화를 주기적으로 확인 (앱 기동 시 태스크로 실행)"""
+        interval = interval or self.check_interval
+        while True:
+            await asyncio.sleep(interval)
+            for channel in list(self.channels.values()):
+                await self._refresh_quietly(channel)
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        for channel in list(self.channels.values()):
+            for websocket in list(channel.subscribers):
+                await self._close_quietly(websocket, CLOSE_GOING_AWAY)
+        self.channels.clear()
+
+    def stats(self) -> Dict:
+        return {
+            "channels": len(self.channels),
+            "subscribers": sum(len(channel.subscribers) for channel in self.channels.values()),
+            "computed_total": self.computed_total,
+            "unchanged_total": self.unchanged_total,
+            "pushed_total": self.pushed_total,
+            "dropped_total": self.dropped_total,
+        }
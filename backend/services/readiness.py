@@ -0,0 +1,102 @@
+"""
+Readiness
+기동 워밍업 단계별 상태를 기록하고 /ready 에서 "이 워커가 트래픽을 받아도 되는지" 알려준다.
+
+- 단계마다 pending → ready | degraded | failed | skipped, 걸린 시간(ms)과 사유
+- required 단계가 failed 면 준비 안 됨 (로드밸런서가 트래픽을 보내지 않음)
+- 선택 단계(Gemini ping, 날씨 미리 받기)는 실패해도 degraded → 폴백 경로로 서비스는 가능
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+STATUS_PENDING = "pending"
+STATUS_READY = "ready"
+STATUS_DEGRADED = "degraded"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+class WarmupSkipped(Exception):
+    """설정상 필요 없는 단계 (예: API 키 없음)"""
+
+
+class ReadinessTracker:
+    """워밍업 단계 상태 모음 (프로세스 단위)"""
+
+    def __init__(self):
+        self.components: Dict[str, Dict] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def register(self, name: str, required: bool = True) -> None:
+        self.components[name] = {"status": STATUS_PENDING, "required": required}
+
+    async def run(
+        self,
+        name: str,
+        step: Callable[[], Union[Awaitable, object]],
+        required: bool = True,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """단계 하나 실행 (동기 함수는 스레드에서 → 이벤트 루프를 막지 않음)"""
+        component = self.components.setdefault(name, {"status": STATUS_PENDING, "required": required})
+        component["required"] = required
+        started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(step):
+                result = step()
+            else:
+                result = asyncio.to_thread(step)
+            detail = await asyncio.wait_for(result, timeout) if timeout else await result
+            component["status"] = STATUS_READY
+            if detail not in (None, True):
+                component["detail"] = detail
+        except WarmupSkipped as e:
+            component["status"] = STATUS_SKIPPED
+            component["detail"] = str(e)
+        except asyncio.CancelledError:
+            component["status"] = STATUS_FAILED
+            component["detail"] = "cancelled"
+            raise
+        except Exception as e:
+            component["status"] = STATUS_FAILED if required else STATUS_DEGRADED
+            component["detail"] = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        finally:
+            component["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        icon = {STATUS_READY: "✅", STATUS_SKIPPED: "⏭️ ", STATUS_DEGRADED: "⚠️"}.get(component["status"], "❌")
+        print(f"{icon} 워밍업 {name}: {component['status']} ({component['duration_ms']}ms)")
+
+    def start(self) -> None:
+        self.started_at = time.time()
+        self.finished_at = None
+
+    def finish(self) -> None:
+        self.finished_at = time.time()
+
+    @property
+    def ready(self) -> bool:
+        if self.started_at is None or self.finished_at is None:
+            return False
+        return all(
+            c["status"] != STATUS_FAILED and c["status"] != STATUS_PENDING
+            for c in self.components.values() if c["required"]
+        )
+
+    def report(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "warming_up": self.started_at is not None and self.finished_at is None,
+            "warmup_ms": (
+                round((self.finished_at - self.started_at) * 1000, 1)
+                if self.started_at is not None and self.finished_at is not None else None
+            ),
+            "components": self.components,
+        }
+
+
+# 싱글톤 인스턴스
+readiness = ReadinessTracker()
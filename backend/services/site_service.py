@@ -0,0 +1,178 @@
+"""
+Site Service
+사이트(사무실/구내식당) 단위 메뉴 게시 + 추천 팬아웃
+
+- 관리자가 오늘 메뉴를 한 번 게시 (텍스트 or 이미지 → OCR 은 게시할 때 한 번)
+- 추천은 (사이트, 날짜, 게시 버전, 날씨 구간)마다 한 번만 생성해서 공유 캐시에 보관
+  (같은 키를 동시에 요청하면 하나만 생성하고 나머지는 기다림)
+- 직원 요청은 site_id 만 보내면 미리 만든 결과를 즉시 받고,
+  개인별 다양성(최근 이력 제외 + 예비 후보 보충 + 순서)은 로컬에서 적용 (AIService.personalize_shared_recommendation)
+
+사이트 목록은 SITES 환경 변수 (JSON)
+    SITES='{"hq": {"name": "본사", "lat": 37.5665, "lng": 126.9780}}'
+등록된 사이트는 날씨 일괄 갱신 / 좌표 스냅 대상에도 들어간다.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from services.cache import get_cache
+from services.place_service import place_service
+from services.tracing import span
+from services.weather_service import KST
+
+load_dotenv()
+
+
+def _today() -> str:
+    return datetime.now(KST).date().isoformat()
+
+
+def _seconds_until_tomorrow() -> float:
+    """오늘 게시한 메뉴/추천의 보관 시간 (KST 자정까지)"""
+    now = datetime.now(KST)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(60.0, (midnight - now).total_seconds())
+
+
+class SiteService:
+    """사이트 등록부 + 오늘 메뉴 게시 + 사이트 공용 추천"""
+
+    def __init__(self, weather_service, ai_service):
+        self.weather_service = weather_service
+        self.ai_service = ai_service
+        self.cache = get_cache("sites")
+        # 규칙 기반 폴백(LLM 오류 등)은 자정까지 두지 않고 잠깐만 → 다음 요청이 다시 생성을 시도
+        self.fallback_ttl = float(os.getenv("SITE_FALLBACK_TTL", "300"))
+        self.sites: Dict[str, Dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.computed_total = 0
+        self.served_total = 0
+
+        for site_id, info in json.loads(os.getenv("SITES", "{}") or "{}").items():
+            self.register(site_id, info.get("name") or site_id, info["lat"], info["lng"])
+        if self.sites:
+            print(f"✅ 사이트 {len(self.sites)}곳 등록: {', '.join(self.sites)}")
+
+    # =======================================================================
+    # 등록부
+    # =======================================================================
+    def register(self, site_id: str, name: str, latitude: float, longitude: float) -> Dict:
+        site = {"site_id": site_id, "name": name, "lat": float(latitude), "lng": float(longitude)}
+        self.sites[site_id] = site
+        self.weather_service.register_location(name, latitude, longitude)
+        return site
+
+    def get(self, site_id: Optional[str]) -> Optional[Dict]:
+        return self.sites.get(site_id) if site_id else None
+
+    async def list(self) -> List[Dict]:
+        """사이트 목록 + 오늘 게시 여부"""
+        result = []
+        for site in self.sites.values():
+            publication = await self.publication(site["site_id"])
+            result.append({
+                **site,
+                "published_at": publication["published_at"] if publication else None,
+            })
+        return result
+
+    # =======================================================================
+    # 메뉴 게시
+    # =======================================================================
+    async def publication(self, site_id: str) -> Optional[Dict]:
+        """오늘 게시된 메뉴 (없으면 None)"""
+        return await self.cache.get(f"menu:{site_id}:{_today()}")
+
+    async def publish(self, site: Dict, menu_text: str, ocr_confidence: Optional[str] = None) -> Dict:
+        """오늘 메뉴 게시 → 지금 날씨 구간 추천을 바로 만들어 둔다"""
+        publication = {
+            "site_id": site["site_id"],
+            "date": _today(),
+            "menu_text": menu_text,
+            "ocr_confidence": ocr_confidence,
+            "published_at": time.time(),
+            # 다시 게시하면 버전이 바뀌어 이전 추천 캐시를 쓰지 않는다
+            "version": hashlib.sha1(f"{menu_text}:{time.time()}".encode("utf-8")).hexdigest()[:12],
+        }
+        await self.cache.set(f"menu:{site['site_id']}:{publication['date']}", publication, _seconds_until_tomorrow())
+        print(f"📢 메뉴 게시: {site['name']} ({site['site_id']}) - {menu_text[:50]}")
+
+        weather = await self.weather(site)
+        await self.shared_recommendation(site, publication, weather)
+        return {**publication, "weather_bucket": self.ai_service.weather_bucket(weather)}
+
+    # =======================================================================
+    # 사이트 공용 추천
+    # =======================================================================
+    async def weather(self, site: Dict) -> Dict:
+        return await self.weather_service.get_weather(site["name"], site["lat"], site["lng"])
+
+    async def shared_recommendation(self, site: Dict, publication: Dict, weather: Dict) -> Dict:
+        """(사이트, 날짜, 버전, 날씨 구간)당 한 번만 생성 (캐시 → 없으면 하나만 생성)"""
+        key = (
+            f"reco:{site['site_id']}:{publication['date']}:{publication['version']}:"
+            f"{self.ai_service.weather_bucket(weather)}"
+        )
+        cached = await self.cache.get(key)
+        if cached:
+            return cached
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                cached = await self.cache.get(key)
+                if cached:
+                    return cached
+
+                with span("site.compute", **{"site.id": site["site_id"]}):
+                    recommendation = await self.ai_service.shared_cafeteria_recommendation(
+                        weather,
+                        publication["menu_text"],
+                        {"lat": site["lat"], "lng": site["lng"]},
+                        client_id=f"site:{site['site_id']}"
+                    )
+                    fallback = self.ai_service.is_fallback_recommendation(recommendation)
+                    if publication.get("ocr_confidence"):
+                        recommendation["ocr_confidence"] = publication["ocr_confidence"]
+                        recommendation["extracted_menu"] = publication["menu_text"]
+                    # 예비 후보까지 한 번에 조회 (개인화 때 어느 항목이 나가도 places 가 붙어 있게)
+                    await place_service.attach_places(
+                        {"recommendations": recommendation["recommendations"] + recommendation.get("reserve", [])},
+                        site["lat"],
+                        site["lng"]
+                    )
+
+                ttl = self.fallback_ttl if fallback else _seconds_until_tomorrow()
+                await self.cache.set(key, recommendation, ttl)
+                self.computed_total += 1
+                print(f"🍱 사이트 추천 생성: {key}" + (f" (폴백, {ttl:.0f}초만 보관)" if fallback else ""))
+                return recommendation
+        finally:
+            self._locks.pop(key, None)
+
+    async def recommend(self, site: Dict, client_id: str) -> Optional[Dict]:
+        """직원 요청: 미리 만든 사이트 추천 + 개인별 다양성 (게시 전이면 None)"""
+        publication = await self.publication(site["site_id"])
+        if publication is None:
+            return None
+
+        weather = await self.weather(site)
+        shared = await self.shared_recommendation(site, publication, weather)
+        self.served_total += 1
+        result = await self.ai_service.personalize_shared_recommendation(shared, client_id)
+        result["site_id"] = site["site_id"]
+        result["published_at"] = publication["published_at"]
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            "sites": len(self.sites),
+            "computed_total": self.computed_total,
+            "served_total": self.served_total,
+        }
@@ -0,0 +1,341 @@
+"""
+Tracing
+요청 단위 경량 트레이싱 - 느린 요청이 날씨 / base64 디코딩 / Vision / 프롬프트 / JSON 복구 중
+어디서 시간을 썼는지 span 으로 남긴다.
+
+- 트레이스/현재 span 은 contextvars 로 전달 (asyncio.gather 로 나뉜 섹션도 같은 트레이스)
+- 트레이스가 없으면 span 은 아무 일도 하지 않음 (백그라운드 갱신 루프 등)
+- 내보내기는 OpenTelemetry OTLP/JSON 형식 (ExportTraceServiceRequest)
+    TRACE_EXPORT_FILE=traces.jsonl            한 줄에 트레이스 묶음 하나
+    TRACE_OTLP_ENDPOINT=http://localhost:4318/v1/traces   컬렉터로 POST
+- TRACE_SAMPLE_RATE 로 내보낼 비율 조절 (span 수집 자체는 항상, Server-Timing 용)
+
+사용:
+    with span("ocr.decode", bytes=len(data)):
+        ...
+
+    @traced("weather.get")
+    async def get_weather(...): ...
+
+    root = start_span(f"{method} {path}", kind=SPAN_KIND_SERVER)   # 끝나는 지점이 여러 곳인 경우 (미들웨어)
+    ...
+    root.end()
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import random
+import secrets
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import orjson
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "lunch-menu-api")
+
+# OTLP span kind / status code
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "trace", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns",
+        "attributes", "status", "message", "_token",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: int, attributes: Dict):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.message = ""
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, exc: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(exc).__name__}: {exc}"
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:  # 다른 컨텍스트에서 끝난 경우
+                pass
+            self._token = None
+
+
+class _NoopSpan:
+    """트레이스 밖에서 쓰는 빈 span"""
+    duration_ms = 0.0
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def record_error(self, exc: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """요청 하나의 span 모음"""
+
+    def __init__(self, trace_id: Optional[str] = None, parent_span_id: Optional[str] = None):
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.remote_parent_id = parent_span_id  # traceparent 로 받은 상위 span
+        self.spans: List[Span] = []
+        self.sampled = random.random() < float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+
+    def stage_timings(self, exclude: Optional[str] = None) -> Dict[str, float]:
+        """끝난 span 을 이름별 합계(ms)로 (Server-Timing 용)"""
+        totals: Dict[str, float] = {}
+        for s in self.spans:
+            if s.end_ns is None or s.span_id == exclude:
+                continue
+            totals[s.name] = totals.get(s.name, 0.0) + s.duration_ms
+        return totals
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """span 시작 (현재 span 의 자식), 트레이스 밖이면 NOOP_SPAN"""
+    trace = _current_trace.get()
+    if trace is None:
+        return NOOP_SPAN
+    parent = _current_span.get()
+    parent_id = parent.span_id if parent is not None else trace.remote_parent_id
+    new_span = Span(trace, name, parent_id, kind, attributes)
+    trace.spans.append(new_span)
+    new_span._token = _current_span.set(new_span)
+    return new_span
+
+
+@contextmanager
+def span(name: str, **attributes):
+    current = start_span(name, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        if not isinstance(e, (GeneratorExit, asyncio.CancelledError)):
+            current.record_error(e)
+        raise
+    finally:
+        current.end()
+
+
+def traced(name: str):
+    """함수 전체를 span 으로 감싸는 데코레이터 (동기/비동기 모두)"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def new_trace(trace_id: Optional[str] = None, parent_span_id: Optional[str] = None):
+    """트레이스 컨텍스트 시작 (미들웨어 / 비동기 작업 워커)"""
+    trace = Trace(trace_id, parent_span_id)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+def parse_traceparent(header: str):
+    """W3C traceparent → (trace_id, parent_span_id), 형식이 틀리면 (None, None)"""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None, None
+    if parts[1] == "0" * 32:
+        return None, None
+    return parts[1], parts[2]
+
+
+def server_timing_header(trace: Trace, root: Optional[Span] = None) -> str:
+    """단계별 시간 요약 → Server-Timing 헤더 값"""
+    entries = [
+        f"{name};dur={duration:.1f}"
+        for name, duration in sorted(
+            trace.stage_timings(exclude=root.span_id if root else None).items(),
+            key=lambda item: -item[1],
+        )
+    ]
+    if root is not None:
+        entries.append(f"total;dur={root.duration_ms:.1f}")
+    return ", ".join(entries)
+
+
+# =======================================================================
+# OTLP/JSON 내보내기
+# =======================================================================
+def _attribute_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}  # OTLP/JSON 은 int64 를 문자열로
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(trace: Trace, s: Span) -> Dict:
+    data = {
+        "traceId": trace.trace_id,
+        "spanId": s.span_id,
+        "name": s.name,
+        "kind": s.kind,
+        "startTimeUnixNano": str(s.start_ns),
+        "endTimeUnixNano": str(s.end_ns or time.time_ns()),
+        "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in s.attributes.items()],
+        "status": {"code": s.status, "message": s.message} if s.status else {"code": STATUS_UNSET},
+    }
+    if s.parent_id:
+        data["parentSpanId"] = s.parent_id
+    return data
+
+
+def to_otlp(traces: List[Trace]) -> Dict:
+    """트레이스 묶음 → ExportTraceServiceRequest (JSON)"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "lunch.tracing"},
+                "spans": [_otlp_span(t, s) for t in traces for s in t.spans],
+            }],
+        }]
+    }
+
+
+class TraceExporter:
+    """끝난 트레이스를 모아 주기적으로 파일/컬렉터로 보낸다 (요청 경로에서는 append 만)"""
+
+    def __init__(self):
+        self.file_path = os.getenv("TRACE_EXPORT_FILE", "")
+        self.endpoint = os.getenv("TRACE_OTLP_ENDPOINT", "")
+        self.interval = float(os.getenv("TRACE_EXPORT_INTERVAL", "5"))
+        self.max_batch = int(os.getenv("TRACE_EXPORT_BATCH", "256"))
+        self._pending: List[Trace] = []
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self.exported_total = 0
+        self.dropped_total = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.file_path or self.endpoint)
+
+    def submit(self, trace: Trace) -> None:
+        if not self.enabled or not trace.sampled or not trace.spans:
+            return
+        if len(self._pending) >= self.max_batch * 4:
+            self.dropped_total += 1  # 내보내기가 밀리면 버린다 (요청 처리 우선)
+            return
+        self._pending.append(trace)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=contextvars.Context())
+
+    async def _run(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+            payload = orjson.dumps(to_otlp(batch))
+            try:
+                if self.file_path:
+                    await asyncio.to_thread(self._append_file, payload)
+                if self.endpoint:
+                    await self._post(payload)
+                self.exported_total += len(batch)
+            except Exception as e:
+                self.dropped_total += len(batch)
+                print(f"⚠️ 트레이스 내보내기 실패: {e}")
+
+    def _append_file(self, payload: bytes) -> None:
+        with open(self.file_path, "ab") as f:
+            f.write(payload + b"\n")
+
+    async def _post(self, payload: bytes) -> None:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=5.0)
+        response = await self._client.post(
+            self.endpoint, content=payload, headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        await self.flush()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# 싱글톤 인스턴스
+trace_exporter = TraceExporter()
@@ -1,47 +1,149 @@
+import asyncio
 import httpx
-from typing import Dict, Optional
-from datetime import datetime
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from services.cache import get_cache
+from services.forecast_series import HourlySeries, HOURLY_PARAM
+from services.geo import LocationIndex
+from services.tracing import current_span, span, traced
 
 load_dotenv()
 
+KST = timezone(timedelta(hours=9))
+
+# 한국 주요 도시 좌표 (위도, 경도)
+LOCATION_COORDS = {
+    "서울": (37.5665, 126.9780),
+    "강남": (37.4979, 127.0276),
+    "여의도": (37.5219, 126.9245),
+    "판교": (37.3944, 127.1109),
+    "부산": (35.1796, 129.0756),
+    "대구": (35.8714, 128.6014),
+    "인천": (37.4563, 126.7052),
+    "광주": (35.1595, 126.8526),
+    "대전": (36.3504, 127.3845),
+    "울산": (35.5384, 129.3114),
+    "세종": (36.4800, 127.2890),
+    "수원": (37.2636, 127.0286),
+    "창원": (35.2272, 128.6811),
+    "고양": (37.6584, 126.8320),
+    "용인": (37.2411, 127.1776),
+}
+
+# Open-Meteo 다중 좌표 요청 1회에 넣을 최대 좌표 수 (URL 길이 제한 대비)
+BULK_CHUNK_SIZE = 100
+
 class WeatherService:
     def __init__(self):
-        # Open-Meteo는 API 키가 필요 없습니다!
-        self.base_url = "https://api.open-meteo.com/v1/forecast"
-        print("✅ Open-Meteo 날씨 서비스 초기화 (무료, 빠른 응답)")
+        # Open-Meteo는 API 키가 필요 없습니다! (부하 테스트는 WEATHER_BASE_URL 로 로컬 스탠드인 지정)
+        self.base_url = os.getenv("WEATHER_BASE_URL", "https://api.open-meteo.com/v1/forecast")
+        # 같은 격자(약 1km)의 날씨는 TTL 동안 공유 (워커 간 공유는 CACHE_BACKEND 설정)
+        self.cache = get_cache("weather")
+        self.cache_ttl = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+
+        # forecast: 격자별 hourly 예보를 하루 한 번 받아 로컬 보간 (기본)
+        # current : 매번 current 조회 (이전 방식)
+        self.mode = os.getenv("WEATHER_MODE", "forecast")
+        self.forecast_cell_deg = float(os.getenv("WEATHER_FORECAST_CELL_DEG", "0.05"))
+        # 모델 갱신 시각 확인용 메타데이터 (없으면 갱신 주기로 판단)
+        self.model_meta_url = os.getenv("WEATHER_MODEL_META_URL", "")
+        self.forecast_refresh = float(os.getenv("WEATHER_FORECAST_REFRESH", str(3 * 3600)))
+        # 프로세스 메모리에는 최근 쓴 격자만 (LRU, 밀려난 격자는 공유 캐시에서 다시 읽음)
+        self.series_max_entries = int(os.getenv("WEATHER_SERIES_MAX", "512"))
+        self._series: "OrderedDict[str, HourlySeries]" = OrderedDict()
+        self._series_locks: Dict[str, list] = {}  # 조회 중인 격자만: [잠금, 사용 중인 요청 수]
+        self._model_run: Optional[float] = None
+        self._model_run_checked_at = 0.0
+        self.upstream_calls = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # 도시 + 등록된 사무실 위치 (OFFICE_LOCATIONS='{"본사": [37.56, 126.97]}')
+        # GPS 좌표는 허용 거리 안의 가장 가까운 등록 위치로 스냅 → 같은 지역끼리 캐시 공유
+        self.snap_tolerance_km = float(os.getenv("LOCATION_SNAP_KM", "5"))
+        self._location_index: Optional[LocationIndex] = None
+        self.locations: Dict[str, tuple] = dict(LOCATION_COORDS)
+        for name, coords in json.loads(os.getenv("OFFICE_LOCATIONS", "{}") or "{}").items():
+            self.register_location(name, coords[0], coords[1])
+
+        print(f"✅ Open-Meteo 날씨 서비스 초기화 (무료, 빠른 응답, mode={self.mode})")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Open-Meteo 연결 풀 (요청마다 새 연결/TLS 핸드셰이크를 만들지 않게 공유)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def get_location_coords(self, location: str) -> tuple:
-        """한국 주요 도시 좌표 (위도, 경도)"""
-        location_coords = {
-            "서울": (37.5665, 126.9780),
-            "강남": (37.4979, 127.0276),
-            "여의도": (37.5219, 126.9245),
-            "판교": (37.3944, 127.1109),
-            "부산": (35.1796, 129.0756),
-            "대구": (35.8714, 128.6014),
-            "인천": (37.4563, 126.7052),
-            "광주": (35.1595, 126.8526),
-            "대전": (36.3504, 127.3845),
-            "울산": (35.5384, 129.3114),
-            "세종": (36.4800, 127.2890),
-            "수원": (37.2636, 127.0286),
-            "창원": (35.2272, 128.6811),
-            "고양": (37.6584, 126.8320),
-            "용인": (37.2411, 127.1776),
-        }
-        return location_coords.get(location, (37.5665, 126.9780))  # 기본값: 서울
+        """한국 주요 도시 / 등록된 사무실 좌표 (위도, 경도)"""
+        return self.locations.get(location, (37.5665, 126.9780))  # 기본값: 서울
+
+    def register_location(self, name: str, latitude: float, longitude: float) -> None:
+        """사무실 위치 등록 → 일괄 갱신 / 좌표 스냅 대상에 포함"""
+        self.locations[name] = (float(latitude), float(longitude))
+        self._location_index = None  # 다음 스냅 때 다시 만든다
+
+    @property
+    def location_index(self) -> LocationIndex:
+        if self._location_index is None:
+            self._location_index = LocationIndex(self.locations)
+        return self._location_index
+
+    def resolve_location(self, location: str, lat: float = None, lng: float = None) -> tuple:
+        """
+        요청 위치를 (지역 이름, 위도, 경도)로 정규화
+        - 좌표가 있으면 가장 가까운 등록 위치로 스냅 (허용 거리 밖이면 좌표 그대로)
+        - 좌표가 없으면 location 이름의 등록 좌표
+        """
+        if lat is None or lng is None:
+            latitude, longitude = self.get_location_coords(location)
+            return location, latitude, longitude
+
+        snapped = self.location_index.nearest(lat, lng, self.snap_tolerance_km)
+        if snapped:
+            name, _ = snapped
+            latitude, longitude = self.locations[name]
+            return name, latitude, longitude
+        return location, lat, lng
     
+    @traced("weather.get")
     async def get_weather(self, location: str = "서울", lat: float = None, lng: float = None) -> Dict:
         """Open-Meteo API로 날씨 정보 조회 (무료, 빠름)"""
         try:
-            # 좌표가 제공되면 우선 사용, 없으면 location으로 좌표 찾기
+            # 좌표가 제공되면 우선 사용(가까운 등록 위치로 스냅), 없으면 location으로 좌표 찾기
+            area, latitude, longitude = self.resolve_location(location, lat, lng)
             if lat is not None and lng is not None:
-                print(f"📍 사용자 제공 좌표 사용: {lat}, {lng} ({location})")
-                latitude, longitude = lat, lng
+                print(f"📍 사용자 제공 좌표 사용: {lat}, {lng} ({location} → {area})")
             else:
                 print(f"📍 location 기반 좌표 사용: {location}")
-                latitude, longitude = self.get_location_coords(location)
+
+            # ✅ 캐시 확인 (location 라벨만 요청값으로 바꿔서 돌려줌)
+            cache_key = self._cell_key(latitude, longitude)
+            cached = await self.cache.get(cache_key)
+            current_span().set_attribute("cache.hit", bool(cached))
+            if cached:
+                return {**cached, "location": location, "area": area}
+
+            # ✅ 예보 모드: 격자 시계열에서 지금 시각 값을 보간
+            if self.mode == "forecast":
+                weather_data = await self._weather_from_forecast(location, latitude, longitude, time.time())
+                if weather_data:
+                    weather_data["area"] = area
+                    await self.cache.set(cache_key, weather_data, self.cache_ttl)
+                    return weather_data
             
             params = {
                 "latitude": latitude,
@@ -50,39 +152,290 @@ class WeatherService:
                 "timezone": "Asia/Seoul"
             }
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(self.base_url, params=params)
+            with span("weather.upstream"):
+                self.upstream_calls += 1
+                response = await self.client.get(self.base_url, params=params)
+            
+            if response.status_code == 200:
+                data = response.json()
+                current = data.get("current", {})
+
+                weather_data = self._build_weather_data(
+                    location,
+                    current.get("temperature_2m", 20),
+                    current.get("relative_humidity_2m", 50),
+                    current.get("weather_code", 0),
+                    current.get("precipitation", 0)
+                )
+                weather_data["area"] = area
+                
+                print(f"✅ Open-Meteo 날씨 조회 성공: {weather_data}")
+                await self.cache.set(cache_key, weather_data, self.cache_ttl)
+                return weather_data
+            else:
+                print(f"⚠️ Open-Meteo API 오류: {response.status_code}")
+                return self._get_dummy_weather(location)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    current = data.get("current", {})
-                    
-                    # 날씨 코드를 한국어로 변환
-                    weather_code = current.get("weather_code", 0)
-                    sky_condition = self._weather_code_to_condition(weather_code)
-                    
-                    # 강수 여부 확인
-                    precipitation = current.get("precipitation", 0)
-                    precipitation_str = "비" if precipitation > 0 else "없음"
-                    
-                    weather_data = {
-                        "location": location,
-                        "temperature": round(current.get("temperature_2m", 20), 1),
-                        "sky_condition": sky_condition,
-                        "precipitation": precipitation_str,
-                        "humidity": int(current.get("relative_humidity_2m", 50)),
-                    }
-                    
-                    print(f"✅ Open-Meteo 날씨 조회 성공: {weather_data}")
-                    return weather_data
-                else:
-                    print(f"⚠️ Open-Meteo API 오류: {response.status_code}")
-                    return self._get_dummy_weather(location)
-                    
         except Exception as e:
             print(f"⚠️ 날씨 API 오류: {e}")
             return self._get_dummy_weather(location)
+
+    def _build_weather_data(
+        self,
+        location: str,
+        temperature: float,
+        humidity: float,
+        weather_code: int,
+        precipitation: float
+    ) -> Dict:
+        """Open-Meteo 값 → 응답 포맷"""
+        # 날씨 코드를 한국어로 변환
+        sky_condition = self._weather_code_to_condition(int(weather_code or 0))
+
+        # 강수 여부 확인
+        precipitation_str = "비" if (precipitation or 0) > 0 else "없음"
+
+        return {
+            "location": location,
+            "temperature": round(temperature if temperature is not None else 20, 1),
+            "sky_condition": sky_condition,
+            "precipitation": precipitation_str,
+            "humidity": int(humidity if humidity is not None else 50),
+        }
+
+    # =======================================================================
+    # 예보 시계열 (hourly, 격자당 하루 1회)
+    # =======================================================================
+    def _forecast_cell(self, latitude: float, longitude: float) -> tuple:
+        """예보 격자 중심 좌표 (기본 0.05° ≈ 5km, 예보 모델 해상도 수준)"""
+        step = self.forecast_cell_deg
+        return (
+            round(round(latitude / step) * step, 4),
+            round(round(longitude / step) * step, 4),
+        )
+
+    async def _weather_from_forecast(
+        self,
+        location: str,
+        latitude: float,
+        longitude: float,
+        ts: float
+    ) -> Optional[Dict]:
+        series = await self._get_series(latitude, longitude)
+        point = series.at(ts) if series else None
+        if point is None:
+            return None
+        return self._build_weather_data(
+            location,
+            point["temperature_2m"],
+            point["relative_humidity_2m"],
+            point["weather_code"],
+            point["precipitation"]
+        )
+
+    def _series_key(self, cell: tuple) -> str:
+        return f"series:{cell[0]:.4f},{cell[1]:.4f}"
+
+    async def _load_series(self, key: str) -> Optional[HourlySeries]:
+        """프로세스 메모리 → 공유 캐시 순서로 시계열 조회"""
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+        else:
+            cached = await self.cache.get(key)
+            if cached:
+                series = HourlySeries.from_dict(cached)
+                self._remember_series(key, series)
+        return series
+
+    def _remember_series(self, key: str, series: HourlySeries) -> None:
+        self._series[key] = series
+        self._series.move_to_end(key)
+        while len(self._series) > self.series_max_entries:
+            self._series.popitem(last=False)
+
+    async def _store_series(self, key: str, series: HourlySeries) -> None:
+        self._remember_series(key, series)
+        await self.cache.set(key, series.to_dict(), 26 * 3600)
+
+    async def _get_series(self, latitude: float, longitude: float) -> Optional[HourlySeries]:
+        cell = self._forecast_cell(latitude, longitude)
+        key = self._series_key(cell)
+
+        entry = self._series_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                series = await self._load_series(key)
+
+                if series is None or await self._series_stale(series):
+                    fresh = await self._fetch_series(*cell)
+                    if fresh is not None:
+                        series = fresh
+                        await self._store_series(key, series)
+
+                return series
+        finally:
+            # 마지막 요청이 끝나면 잠금도 정리 (격자 수만큼 쌓이지 않게)
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._series_locks[key]
+
+    async def _series_stale(self, series: HourlySeries) -> bool:
+        """날짜가 바뀌었거나 예보 모델이 새로 돌았으면 다시 받는다"""
+        fetched_day = datetime.fromtimestamp(series.fetched_at, KST).date()
+        if fetched_day != datetime.now(KST).date():
+            return True
+
+        latest_run = await self._latest_model_run()
+        if latest_run is not None and series.model_run is not None:
+            return latest_run > series.model_run
+
+        return time.time() - series.fetched_at > self.forecast_refresh
+
+    async def _latest_model_run(self) -> Optional[float]:
+        """예보 모델의 마지막 실행 공개 시각 (메타데이터, 10분마다 1회 확인)"""
+        if not self.model_meta_url:
+            return None
+        if time.time() - self._model_run_checked_at < 600:
+            return self._model_run
+
+        self._model_run_checked_at = time.time()
+        try:
+            response = await self.client.get(self.model_meta_url, timeout=5.0)
+            if response.status_code == 200:
+                self._model_run = response.json().get("last_run_availability_time")
+        except Exception as e:
+            print(f"⚠️ 예보 모델 메타데이터 조회 실패: {e}")
+        return self._model_run
+
+    async def _fetch_series(self, latitude: float, longitude: float) -> Optional[HourlySeries]:
+        return (await self._fetch_series_batch([(latitude, longitude)]))[0]
+
+    @traced("weather.upstream")
+    async def _fetch_series_batch(self, cells: List[tuple]) -> List[Optional[HourlySeries]]:
+        """여러 격자의 hourly 예보를 한 번의 요청으로 (Open-Meteo 다중 좌표)"""
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in cells),
+            "longitude": ",".join(str(lng) for _, lng in cells),
+            "hourly": HOURLY_PARAM,
+            "timezone": "Asia/Seoul",
+            "timeformat": "unixtime",
+            "forecast_days": 2,
+        }
+        try:
+            self.upstream_calls += 1
+            response = await self.client.get(self.base_url, params=params)
+            if response.status_code != 200:
+                print(f"⚠️ Open-Meteo 예보 오류: {response.status_code}")
+                return [None] * len(cells)
+
+            # 좌표가 하나면 객체, 여러 개면 같은 순서의 리스트로 온다
+            data = response.json()
+            items = data if isinstance(data, list) else [data]
+            model_run = await self._latest_model_run()
+
+            result = []
+            for item in items:
+                try:
+                    result.append(HourlySeries.from_open_meteo(item.get("hourly", {}), model_run=model_run))
+                except ValueError:
+                    result.append(None)
+            print(f"✅ Open-Meteo hourly 예보 수신: {len(cells)}개 격자")
+            return result + [None] * (len(cells) - len(result))
+        except Exception as e:
+            print(f"⚠️ Open-Meteo 예보 조회 실패: {e}")
+            return [None] * len(cells)
+
+    @traced("weather.upstream")
+    async def _fetch_current_batch(self, points: List[tuple]) -> List[Optional[Dict]]:
+        """여러 좌표의 current 날씨를 한 번의 요청으로"""
+        params = {
+            "latitude": ",".join(str(lat) for lat, _ in points),
+            "longitude": ",".join(str(lng) for _, lng in points),
+            "current": "temperature_2m,relative_humidity_2m,weather_code,precipitation,cloud_cover",
+            "timezone": "Asia/Seoul"
+        }
+        try:
+            self.upstream_calls += 1
+            response = await self.client.get(self.base_url, params=params)
+            if response.status_code != 200:
+                print(f"⚠️ Open-Meteo API 오류: {response.status_code}")
+                return [None] * len(points)
+            data = response.json()
+            items = data if isinstance(data, list) else [data]
+            currents = [item.get("current") for item in items]
+            return currents + [None] * (len(points) - len(currents))
+        except Exception as e:
+            print(f"⚠️ Open-Meteo 일괄 조회 실패: {e}")
+            return [None] * len(points)
+
+    # =======================================================================
+    # 일괄 갱신 (도시 + 사무실 전부를 한 번의 요청으로)
+    # =======================================================================
+    async def refresh_all(self, force: bool = False) -> int:
+        """등록된 모든 위치의 날씨를 일괄로 받아 캐시에 바로 기록, 갱신한 위치 수 반환"""
+        if self.mode == "forecast":
+            cells = {}
+            for name, (lat, lng) in self.locations.items():
+                cells.setdefault(self._forecast_cell(lat, lng), name)
+
+            stale = []
+            for cell in cells:
+                series = await self._load_series(self._series_key(cell))
+                if force or series is None or await self._series_stale(series):
+                    stale.append(cell)
+
+            refreshed = 0
+            for i in range(0, len(stale), BULK_CHUNK_SIZE):
+                chunk = stale[i:i + BULK_CHUNK_SIZE]
+                for cell, series in zip(chunk, await self._fetch_series_batch(chunk)):
+                    if series is not None:
+                        await self._store_series(self._series_key(cell), series)
+                        refreshed += 1
+            return refreshed
+
+        points = {}
+        for name, (lat, lng) in self.locations.items():
+            points.setdefault(self._cell_key(lat, lng), (name, lat, lng))
+
+        refreshed = 0
+        entries = list(points.items())
+        for i in range(0, len(entries), BULK_CHUNK_SIZE):
+            chunk = entries[i:i + BULK_CHUNK_SIZE]
+            currents = await self._fetch_current_batch([(lat, lng) for _, (_, lat, lng) in chunk])
+            for (cache_key, (name, _, _)), current in zip(chunk, currents):
+                if not current:
+                    continue
+                weather_data = self._build_weather_data(
+                    name,
+                    current.get("temperature_2m", 20),
+                    current.get("relative_humidity_2m", 50),
+                    current.get("weather_code", 0),
+                    current.get("precipitation", 0)
+                )
+                await self.cache.set(cache_key, weather_data, self.cache_ttl)
+                refreshed += 1
+        return refreshed
+
+    async def run_refresh_loop(self, interval: Optional[float] = None, initial_delay: float = 0) -> None:
+        """백그라운드 일괄 갱신 루프 (앱 기동 시 태스크로 실행, 워밍업에서 방금 받았으면 initial_delay 후 시작)"""
+        interval = interval or self.cache_ttl * 0.9
+        if initial_delay:
+            await asyncio.sleep(initial_delay)
+        while True:
+            try:
+                refreshed = await self.refresh_all()
+                if refreshed:
+                    print(f"🔄 날씨 일괄 갱신: {refreshed}개 위치 (요청 {self.upstream_calls}회 누적)")
+            except Exception as e:
+                print(f"⚠️ 날씨 일괄 갱신 오류: {e}")
+            await asyncio.sleep(interval)
     
+    def _cell_key(self, latitude: float, longitude: float) -> str:
+        """좌표를 소수점 2자리(약 1km) 격자로 묶은 캐시 키"""
+        return f"{latitude:.2f},{longitude:.2f}"
+
     def _weather_code_to_condition(self, code: int) -> str:
         """WMO Weather Code를 한국어 날씨 상태로 변환"""
         # WMO Weather interpretation codes
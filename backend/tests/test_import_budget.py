@@ -0,0 +1,26 @@
+"""
+import 시점 회귀 테스트 (tools/import_budget.py 의 금지 모듈 검사)
+
+시간 예산은 머신마다 달라서 스크립트에만 두고, 여기서는
+main 을 import 만 해도 무거운 모듈이 딸려 오거나 파일이 생기지 않는지 확인한다.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "tools"))
+
+from import_budget import FORBIDDEN_MODULES, measure_once  # noqa: E402
+
+
+def test_import_main_stays_lazy(tmp_path, monkeypatch):
+    history_db = tmp_path / "history.sqlite3"
+    monkeypatch.setenv("HISTORY_DB_PATH", str(history_db))
+    monkeypatch.setenv("CACHE_BACKEND", "memory")
+
+    result = measure_once("main")
+
+    loaded = [name for name in FORBIDDEN_MODULES if name in result["modules"]]
+    assert not loaded, f"import 시점에 로드됨 (지연 로딩 깨짐): {loaded}"
+    assert not history_db.exists(), "import 만으로 추천 이력 DB 가 생성됨"
@@ -0,0 +1,75 @@
+"""
+식단표 파서 테스트 (services/menu_document.py)
+
+요일 헤더 판별은 메뉴명과 겹치기 쉬워서 (월남쌈, Fried rice, Sundae ...) 경계 사례를 고정해 둔다.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.menu_document import extract_menu_text, weekday_of  # noqa: E402
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("월", 0),
+    ("수요일", 2),
+    ("10/20(월)", 0),
+    ("20일 (금)", 4),
+    ("Mon", 0),
+    ("Tues.", 1),
+    ("Wednesday", 2),
+    ("Thurs", 3),
+    ("FRI", 4),
+    ("Saturday", 5),
+    ("Sun", 6),
+])
+def test_weekday_headers(text, expected):
+    assert weekday_of(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "월남쌈",
+    "Fried rice",
+    "Wedge salad",
+    "Sundae soup",
+    "Satay",
+    "Monkfish stew",
+    "Thursday special pasta with a long name",
+])
+def test_food_names_are_not_weekdays(text):
+    assert weekday_of(text) is None
+
+
+def test_english_food_row_is_not_a_day_header():
+    html = b"<table><tr><td>Fried rice</td><td>Wedge salad</td><td>Sundae soup</td></tr></table>"
+    for weekday in range(5):
+        assert extract_menu_text(html, "html", weekday) == "Fried rice, Wedge salad, Sundae soup"
+
+
+def test_english_weekly_table_picks_today_lunch():
+    html = (
+        b"<table>"
+        b"<tr><th></th><th>Mon</th><th>Tue</th><th>Wed</th></tr>"
+        b"<tr><td>Breakfast</td><td>Toast</td><td>Porridge</td><td>Bagel</td></tr>"
+        b"<tr><td>Lunch</td><td>Fried rice</td><td>Satay</td><td>Sundae soup</td></tr>"
+        b"</table>"
+    )
+    assert extract_menu_text(html, "html", 0) == "Fried rice"
+    assert extract_menu_text(html, "html", 1) == "Satay"
+    assert extract_menu_text(html, "html", 2) == "Sundae soup"
+
+
+def test_korean_weekly_table_picks_today_lunch():
+    html = (
+        "<table>"
+        "<tr><th>구분</th><th>10/20(월)</th><th>10/21(화)</th></tr>"
+        "<tr><td>중식</td><td>김치찌개<br>계란말이</td><td>돈까스</td></tr>"
+        "<tr><td>석식</td><td>비빔밥</td><td>우동</td></tr>"
+        "</table>"
+    ).encode("utf-8")
+    assert extract_menu_text(html, "html", 1) == "돈까스"
+    assert "김치찌개" in extract_menu_text(html, "html", 0)
@@ -0,0 +1,253 @@
+"""
+실행 방식 비교 벤치마크 (python main.py vs python serve.py)
+
+각 방식으로 서버를 실제 프로세스로 띄우고 같은 부하를 걸어 처리량과 지연 분포를 비교한다.
+- dev   : python main.py  (reload=True, 단일 워커)
+- serve : python serve.py (워커 = 코어 수, uvloop + httptools, keep-alive / backlog 조정)
+- 날씨는 tools/weather_standin.py, 모델은 GEMINI_API_KEY 를 비워 규칙 기반 경로 (외부 호출 없음)
+- 부하는 닫힌 루프: --concurrency 개의 연결이 응답을 받는 즉시 다음 요청 (--clients 개 프로세스로 나눠서)
+- 측정 전 --warmup 초 동안 같은 부하로 캐시 / 커넥션을 데움
+
+사용:
+    cd backend
+    python tools/bench_server.py --duration 20 --concurrency 64
+    python tools/bench_server.py --modes serve --workers 4 --save runs/serve.json
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import orjson
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replay import percentile  # noqa: E402
+
+DEFAULT_PATHS = (
+    "/api/weather?location=서울",
+    "/api/weather?location=강남",
+    "/api/daily-recommendations?location=서울",
+    "/api/daily-recommendations?location=판교",
+    "/health",
+)
+
+MODES = {
+    "dev": ["main.py"],
+    "serve": ["serve.py"],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# =======================================================================
+# 서버 프로세스
+# =======================================================================
+def start_server(mode: str, port: int, env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    with open(log_path, "wb") as log:
+        return subprocess.Popen(
+            [sys.executable, *MODES[mode]],
+            cwd=BACKEND_DIR,
+            env={**env, "PORT": str(port), "HOST": "127.0.0.1"},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,  # reload / 워커 자식 프로세스까지 한 그룹으로 정리
+        )
+
+
+def wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 90) -> float:
+    """/ready 가 200 이 될 때까지 → 기동 시간(초)"""
+    import httpx
+
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"서버가 종료됨 (exit {process.returncode})")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("서버 준비 시간 초과")
+
+
+def stop_server(process: subprocess.Popen, timeout: float = 40) -> float:
+    """SIGTERM → 정상 종료까지 걸린 시간(초), 시간 안에 안 끝나면 강제 종료"""
+    started = time.perf_counter()
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+    return time.perf_counter() - started
+
+
+# =======================================================================
+# 부하 (클라이언트 프로세스마다 asyncio 닫힌 루프)
+# =======================================================================
+async def _load(base_url: str, paths: List[str], concurrency: int, duration: float) -> Dict:
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        async def connection(index: int) -> None:
+            nonlocal errors
+            i = index
+            while time.perf_counter() < deadline:
+                path = paths[i % len(paths)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(connection(i) for i in range(concurrency)))
+    return {"latencies": latencies, "errors": errors}
+
+
+def _load_process(args) -> Dict:
+    return asyncio.run(_load(*args))
+
+
+def run_load(base_url: str, paths: List[str], concurrency: int, duration: float, clients: int) -> Dict:
+    clients = max(1, min(clients, concurrency))
+    per_client = [concurrency // clients + (1 if i < concurrency % clients else 0) for i in range(clients)]
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        results = pool.map(_load_process, [(base_url, paths, n, duration) for n in per_client])
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(value for result in results for value in result["latencies"])
+    return {
+        "requests": len(latencies),
+        "errors": sum(result["errors"] for result in results),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "elapsed_s": round(elapsed, 2),
+        "p50": round(percentile(latencies, 50), 2),
+        "p90": round(percentile(latencies, 90), 2),
+        "p99": round(percentile(latencies, 99), 2),
+        "max": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+# =======================================================================
+# 실행
+# =======================================================================
+def bench_mode(mode: str, options, env: Dict[str, str], state_dir: str) -> Dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(state_dir, f"{mode}.log")
+    process = start_server(mode, port, {**env, "HISTORY_DB_PATH": os.path.join(state_dir, f"{mode}.sqlite3")}, log_path)
+    try:
+        startup_s = wait_ready(base_url, process)
+        print(f"▶️  {mode}: 준비 완료 ({startup_s:.1f}s), 워밍업 {options.warmup}s → 측정 {options.duration}s")
+        if options.warmup:
+            run_load(base_url, options.paths, options.concurrency, options.warmup, options.clients)
+        result = run_load(base_url, options.paths, options.concurrency, options.duration, options.clients)
+    except Exception:
+        print(f"❌ {mode} 실패, 서버 로그: {log_path}")
+        raise
+    finally:
+        shutdown_s = stop_server(process)
+    return {"mode": mode, "startup_s": round(startup_s, 2), "shutdown_s": round(shutdown_s, 2), **result}
+
+
+def print_report(results: List[Dict]) -> None:
+    print(
+        f"\n{'mode':<8}{'req/s':>10}{'n':>9}{'err':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+        f"{'startup':>9}{'stop':>7}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<8}{r['throughput_rps']:>10.1f}{r['requests']:>9}{r['errors']:>6}"
+            f"{r['p50']:>9.1f}{r['p90']:>9.1f}{r['p99']:>9.1f}{r['max']:>9.1f}"
+            f"{r['startup_s']:>8.1f}s{r['shutdown_s']:>6.1f}s"
+        )
+    if len(results) > 1 and results[0]["throughput_rps"]:
+        base = results[0]
+        for r in results[1:]:
+            print(
+                f"→ {r['mode']} / {base['mode']}: 처리량 x{r['throughput_rps'] / base['throughput_rps']:.2f}, "
+                f"p99 {base['p99']:.1f}ms → {r['p99']:.1f}ms"
+            )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="실행 방식(main.py / serve.py) 처리량 비교")
+    parser.add_argument("--modes", default="dev,serve", help="비교할 방식 (dev, serve)")
+    parser.add_argument("--duration", type=float, default=15, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=3, help="워밍업 시간 (초)")
+    parser.add_argument("--concurrency", type=int, default=64, help="동시 연결 수")
+    parser.add_argument("--clients", type=int, default=2, help="부하 생성 프로세스 수")
+    parser.add_argument("--workers", type=int, default=0, help="serve 워커 수 (0: 코어 수)")
+    parser.add_argument("--weather-latency", type=float, default=0.05, help="날씨 스탠드인 응답 지연 (초)")
+    parser.add_argument("--paths", nargs="*", default=list(DEFAULT_PATHS), help="요청 경로 (순서대로 돌아가며)")
+    parser.add_argument("--save", default="", help="결과 JSON 저장 경로")
+    options = parser.parse_args(argv)
+
+    modes = [m.strip() for m in options.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"알 수 없는 방식: {', '.join(unknown)}")
+
+    state_dir = tempfile.mkdtemp(prefix="bench-server-")
+    weather_port = _free_port()
+    standin = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "tools", "weather_standin.py"),
+         "--port", str(weather_port), "--latency", str(options.weather_latency)],
+        stdout=subprocess.DEVNULL,
+    )
+    env = {
+        **os.environ,
+        "WEATHER_BASE_URL": f"http://127.0.0.1:{weather_port}/v1/forecast",
+        "WEATHER_MODEL_META_URL": "",
+        "GEMINI_API_KEY": "",
+        "PLACE_CLIENT": "stub",
+        "CACHE_BACKEND": "memory",
+        "CAPTURE_FILE": "",
+        "TRACE_EXPORT_FILE": "",
+        "TRACE_OTLP_ENDPOINT": "",
+        "PROFILE_SAMPLE_RATE": "0",
+        "WEB_CONCURRENCY": str(options.workers or ""),
+    }
+
+    try:
+        results = [bench_mode(mode, options, env, state_dir) for mode in modes]
+    finally:
+        standin.terminate()
+        standin.wait()
+
+    print_report(results)
+    if options.save:
+        os.makedirs(os.path.dirname(os.path.abspath(options.save)), exist_ok=True)
+        with open(options.save, "wb") as f:
+            f.write(orjson.dumps({"options": vars(options), "results": results}, option=orjson.OPT_INDENT_2))
+        print(f"💾 결과 저장: {options.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+날씨 배경 이미지 변환 (반응형 WebP / AVIF + 콘텐츠 해시 매니페스트)
+
+frontend/public/images/weather 의 원본(PNG/JPG, 장당 수백 KB~수 MB)을
+폭별(기본 640/1280/1920) WebP / AVIF 로 미리 만들어 두고,
+파일명에 내용 해시를 넣어 서버가 immutable 캐시 헤더로 내려줄 수 있게 한다.
+
+    sunny3.1280.3f2a9c1d.webp  ← 내용이 바뀌면 이름도 바뀜 (캐시 무효화 불필요)
+
+결과 디렉터리의 manifest.json 을 services/asset_service.py 가 읽어서
+날씨 응답에 배경 URL 을 붙인다. 원본이 같으면 다시 인코딩하지 않는다.
+
+사용 (Pillow 필요, AVIF 는 Pillow 11.3+ 또는 pillow-avif-plugin):
+    cd backend
+    python tools/build_weather_assets.py
+    python tools/build_weather_assets.py --widths 480,960,1600 --formats webp
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.asset_service import (  # noqa: E402
+    CATEGORIES,
+    DEFAULT_ASSET_DIR,
+    MANIFEST_NAME,
+)
+
+SOURCE_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "frontend", "public", "images", "weather")
+SOURCE_PATTERN = re.compile(r"^(%s)(\d*)\.(png|jpe?g)$" % "|".join(CATEGORIES), re.IGNORECASE)
+
+QUALITY = {"webp": 78, "avif": 55}
+
+
+def _load_pillow():
+    try:
+        from PIL import Image, features
+    except ImportError:
+        sys.exit("❌ Pillow 가 필요합니다: pip install pillow")
+    try:
+        import pillow_avif  # noqa: F401  (구버전 Pillow 의 AVIF 플러그인)
+    except ImportError:
+        pass
+    return Image, features
+
+
+def _encode(image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == "webp":
+        image.save(buffer, "WEBP", quality=QUALITY["webp"], method=6)
+    else:
+        image.save(buffer, "AVIF", quality=QUALITY["avif"], speed=6)
+    return buffer.getvalue()
+
+
+def build(source_dir: str, out_dir: str, widths, formats) -> dict:
+    Image, features = _load_pillow()
+    if "avif" in formats and not features.check("avif"):
+        print("⚠️ 이 Pillow 는 AVIF 인코딩을 지원하지 않아 WebP 만 만듭니다")
+        formats = [f for f in formats if f != "avif"]
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f).get("images", {})
+
+    images = {}
+    for name in sorted(os.listdir(source_dir)):
+        match = SOURCE_PATTERN.match(name)
+        if not match:
+            continue
+        key = os.path.splitext(name)[0]
+        with open(os.path.join(source_dir, name), "rb") as f:
+            raw = f.read()
+        source_hash = hashlib.sha256(raw).hexdigest()[:16]
+
+        # 원본이 그대로고 결과 파일도 다 있으면 재사용
+        old = previous.get(key)
+        if (
+            old
+            and old.get("source_hash") == source_hash
+            and old.get("widths") == sorted(set(widths))
+            and old.get("formats") == formats
+            and all(os.path.exists(os.path.join(out_dir, v["file"])) for v in old["variants"])
+        ):
+            images[key] = old
+            print(f"⏭️  {name} (변경 없음)")
+            continue
+
+        started = time.perf_counter()
+        with Image.open(io.BytesIO(raw)) as source:
+            source = source.convert("RGB")
+            variants = []
+            # 원본보다 크게 늘리지 않음 (작은 원본은 폭이 겹치면 하나로)
+            for width in sorted({min(w, source.width) for w in widths}):
+                height = round(source.height * width / source.width)
+                resized = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+                for fmt in formats:
+                    data = _encode(resized, fmt)
+                    digest = hashlib.sha256(data).hexdigest()[:8]
+                    filename = f"{key}.{width}.{digest}.{fmt}"
+                    with open(os.path.join(out_dir, filename), "wb") as out:
+                        out.write(data)
+                    variants.append({"file": filename, "width": width, "format": fmt, "bytes": len(data)})
+
+        images[key] = {
+            "category": match.group(1).lower(),
+            "source": name,
+            "source_hash": source_hash,
+            "source_bytes": len(raw),
+            "widths": sorted(set(widths)),
+            "formats": formats,
+            "variants": variants,
+        }
+        smallest = min(v["bytes"] for v in variants)
+        print(
+            f"✅ {name}: {len(raw) // 1024}KB → {len(variants)}개 "
+            f"(최소 {smallest // 1024}KB, {time.perf_counter() - started:.1f}s)"
+        )
+
+    # 매니페스트에서 빠진 이전 결과 파일 정리
+    keep = {v["file"] for image in images.values() for v in image["variants"]}
+    for filename in os.listdir(out_dir):
+        if filename != MANIFEST_NAME and filename not in keep:
+            os.remove(os.path.join(out_dir, filename))
+
+    manifest = {"version": 1, "widths": sorted(set(widths)), "formats": formats, "images": images}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def _first_paint_bytes(image: dict, width: int) -> int:
+    """기본 폭에서 내려갈 파일 크기 (그 폭 이하 중 가장 큰 폭, 포맷 중 가장 작은 것)"""
+    widths = [v["width"] for v in image["variants"]]
+    target = max((w for w in widths if w <= width), default=min(widths))
+    return min(v["bytes"] for v in image["variants"] if v["width"] == target)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="날씨 배경 이미지 반응형 변환")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("--out", default=os.getenv("WEATHER_ASSET_DIR", DEFAULT_ASSET_DIR))
+    parser.add_argument("--widths", default="640,1280,1920")
+    parser.add_argument("--formats", default="avif,webp")
+    args = parser.parse_args()
+
+    widths = [int(w) for w in args.widths.split(",") if w.strip()]
+    formats = [f.strip().lower() for f in args.formats.split(",") if f.strip() in ("avif", "webp")]
+    manifest = build(args.source, args.out, widths, formats)
+
+    original = sum(image["source_bytes"] for image in manifest["images"].values())
+    default_width = min(widths, key=lambda w: abs(w - 1280))
+    first_paint = sum(_first_paint_bytes(image, default_width) for image in manifest["images"].values())
+    print(f"\n📦 이미지 {len(manifest['images'])}장 → {args.out}")
+    if original:
+        print(
+            f"   원본 합계 {original / 1024 / 1024:.1f}MB → {default_width}px 최소 포맷 합계 "
+            f"{first_paint / 1024 / 1024:.1f}MB ({first_paint / original:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
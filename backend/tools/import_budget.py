@@ -0,0 +1,96 @@
+"""
+Import time / cold start 측정 (회귀 예산 체크)
+
+`python -X importtime -c "import main"`을 새 프로세스로 여러 번 돌려
+- main 모듈의 누적 import 시간
+- 프로세스 기동부터 종료까지 걸린 시간 (cold start)
+을 재고, 예산을 넘거나 무거운 모듈(google.generativeai 등)이 import 시점에
+딸려 오면 exit code 1로 실패한다.
+
+사용:
+    cd backend
+    python tools/import_budget.py                # 기본 예산
+    IMPORT_BUDGET_MS=800 python tools/import_budget.py
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main import 시점에 절대 불려오면 안 되는 모듈 (첫 사용 시 지연 로딩 대상)
+FORBIDDEN_MODULES = [
+    "google.generativeai",
+    "google.ai.generativelanguage",
+    "grpc",
+]
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def measure_once(module: str = "main") -> dict:
+    """새 인터프리터에서 한 번 import하고 결과를 파싱"""
+    env = dict(os.environ)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} 실패:\n{proc.stderr[-2000:]}")
+
+    cumulative_us = {}
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            cumulative_us[m.group(4)] = int(m.group(2))
+
+    return {
+        "import_ms": cumulative_us.get(module, 0) / 1000,
+        "wall_ms": wall_ms,
+        "modules": set(cumulative_us),
+    }
+
+
+def main() -> int:
+    runs = int(os.getenv("IMPORT_BUDGET_RUNS", "5"))
+    import_budget_ms = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+    cold_start_budget_ms = float(os.getenv("COLD_START_BUDGET_MS", "3000"))
+
+    results = [measure_once() for _ in range(runs)]
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    wall_ms = statistics.median(r["wall_ms"] for r in results)
+
+    print(f"📦 import main (median of {runs}): {import_ms:.0f} ms (예산 {import_budget_ms:.0f} ms)")
+    print(f"🚀 cold start   (median of {runs}): {wall_ms:.0f} ms (예산 {cold_start_budget_ms:.0f} ms)")
+
+    failed = False
+    loaded = set().union(*(r["modules"] for r in results))
+    for name in FORBIDDEN_MODULES:
+        if name in loaded:
+            print(f"❌ {name} 가 import 시점에 로드됨 (지연 로딩 깨짐)")
+            failed = True
+
+    if import_ms > import_budget_ms:
+        print("❌ import 시간 예산 초과")
+        failed = True
+    if wall_ms > cold_start_budget_ms:
+        print("❌ cold start 예산 초과")
+        failed = True
+
+    if not failed:
+        print("✅ import / cold start 예산 통과")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
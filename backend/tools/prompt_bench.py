@@ -0,0 +1,512 @@
+"""
+프롬프트 변형 벤치마크 (오프라인 골든셋)
+
+services/prompts.py 의 변형마다 골든셋(tools/golden/prompt_cases.json: 구내식당 메뉴 × 날씨)을
+실제 추천 경로 (AIService._generate_* → parse_llm_json → 중복 제거 / 로컬 후처리) 그대로 돌리고 변형별로 보고한다.
+- 프롬프트 토큰 / 출력 토큰
+- 지연: 모델 응답 + 로컬 처리(프롬프트 생성, 파싱, 후처리) = 전체 (p50 / p95)
+- 파싱 결과: clean / repaired / salvaged / failed (failed 와 need_more_info 는 규칙 기반 폴백)
+- 규칙 위반 (후처리 전 모델 응답 기준)
+    soup        국물 메뉴의 상위호환 위반 (_fix_wrong_hierarchy_for_soups 가 유형을 고친 항목)
+    off_cand    nearbyCandidates 의 menuExamples 밖 메뉴
+    dup         같은 메뉴 중복            over        개수 초과 (구내식당 3개 초과 / 오늘의 추천 3개 아님)
+    no_price    가격대 누락               cat_dup     오늘의 추천 카테고리 중복
+    similar     구내식당 메뉴와 비슷한 오늘의 추천 (menu_similarity)
+
+모델 응답
+- 녹음 (--record, GEMINI_API_KEY 필요): 실제 응답 텍스트 / 토큰 / 지연을 tools/golden/recordings/ 에 저장
+- 재생 (기본): 같은 (변형, 출력 방식, 사례)의 녹음이 있고 프롬프트 해시가 같으면 그대로 사용
+  없으면 스텁 → 사례의 stub(정상/오류 응답 예시) 또는 규칙 기반 폴백을 출력 방식에 맞게 직렬화,
+  토큰은 UTF-8 바이트 / 4 로, 모델 지연은 토큰 수로 추정 (--stub-* 옵션)
+  프롬프트를 고치면 해시가 달라져 녹음은 stale 로 표시되고 스텁으로 대신한다 (--record 로 다시 녹음)
+- 스텁만으로는 변형 간 출력 품질 차이가 드러나지 않는다 → 품질 비교는 녹음으로, 스텁은 토큰 / 파싱 / 후처리 회귀용
+
+사용:
+    cd backend
+    python tools/prompt_bench.py
+    python tools/prompt_bench.py --variants baseline,compact --modes schema,legacy --save runs/prompts.json
+    GEMINI_API_KEY=... python tools/prompt_bench.py --record --repeat 3
+"""
+
+import argparse
+import asyncio
+import copy
+import hashlib
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import orjson
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CASES = os.path.join(TOOLS_DIR, "golden", "prompt_cases.json")
+DEFAULT_RECORDINGS = os.path.join(TOOLS_DIR, "golden", "recordings")
+VIOLATIONS = ("soup", "off_cand", "dup", "over", "no_price", "cat_dup", "similar")
+MODEL_KIND = {"cafeteria": "cafeteria", "daily": "daily", "daily_exclusion": "daily"}
+
+sys.path.insert(0, TOOLS_DIR)
+
+from replay import percentile  # noqa: E402
+
+
+def estimate_tokens(text: str) -> int:
+    """오프라인 토큰 추정 (한글 위주 텍스트에서 Gemini 토크나이저와 대략 비슷한 UTF-8 바이트 / 4)"""
+    return math.ceil(len(text.encode("utf-8")) / 4)
+
+
+def _short_keys(model) -> Dict[str, str]:
+    """응답 모델의 긴 키 → 짧은 키 (schemas.py 의 validation_alias 에서)"""
+    from pydantic import AliasChoices
+
+    return {
+        name: field.validation_alias.choices[-1]
+        for name, field in model.model_fields.items()
+        if isinstance(field.validation_alias, AliasChoices)
+    }
+
+
+# =======================================================================
+# 녹음 / 스텁 모델
+# =======================================================================
+class BenchModel:
+    """
+    generate_content_async 만 흉내 내는 모델
+    녹음이 있으면 재생, 없으면 스텁 / 녹음 모드면 실제 모델을 호출하고 기록
+    """
+
+    def __init__(self, bench: "PromptBench", system_instruction: str = "", real_model=None):
+        self.bench = bench
+        self.system_instruction = system_instruction
+        self.real_model = real_model
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict] = None):
+        run = self.bench.current
+        run["prompt_hash"] = hashlib.sha1(
+            orjson.dumps([self.system_instruction, prompt, generation_config], option=orjson.OPT_SORT_KEYS)
+        ).hexdigest()[:16]
+
+        if self.real_model is not None:
+            started = time.perf_counter()
+            response = await self.real_model.generate_content_async(prompt, generation_config=generation_config)
+            usage = getattr(response, "usage_metadata", None)
+            candidates = getattr(response, "candidates", None) or []
+            reason = getattr(candidates[0], "finish_reason", "") if candidates else ""
+            sample = {
+                "text": response.text,
+                "prompt_tokens": int(getattr(usage, "prompt_token_count", 0) or 0),
+                "output_tokens": int(getattr(usage, "candidates_token_count", 0) or 0),
+                "finish_reason": getattr(reason, "name", str(reason)),
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            run["source"] = "recorded"
+        else:
+            sample = self.bench.recorded_sample(run)
+            if sample is None:
+                sample = self._stub(run, prompt, generation_config)
+
+        run["sample"] = sample
+        return SimpleNamespace(
+            text=sample["text"],
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=sample["prompt_tokens"],
+                candidates_token_count=sample["output_tokens"],
+            ),
+            candidates=[SimpleNamespace(finish_reason=SimpleNamespace(name=sample["finish_reason"]))],
+        )
+
+    def _stub(self, run: Dict, prompt: str, generation_config: Optional[Dict]) -> Dict:
+        case = run["case"]
+        if "stub_text" in case:
+            text = case["stub_text"]
+            finish_reason = "MAX_TOKENS"
+        else:
+            text = orjson.dumps(self.bench.stub_payload(case, run["structured"])).decode()
+            finish_reason = "STOP"
+        prompt_tokens = estimate_tokens(self.system_instruction + prompt)
+        output_tokens = estimate_tokens(text)
+        options = self.bench.options
+        return {
+            "text": text,
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "finish_reason": finish_reason,
+            "latency_ms": round(
+                options.stub_base_ms
+                + prompt_tokens * options.stub_ms_per_prompt_token
+                + output_tokens * options.stub_ms_per_output_token,
+                1,
+            ),
+        }
+
+
+# =======================================================================
+# 벤치마크
+# =======================================================================
+class PromptBench:
+    def __init__(self, options, cases: List[Dict]):
+        self.options = options
+        self.cases = cases
+        self.current: Dict = {}
+        self._recordings: Dict[str, Dict] = {}
+
+        from schemas import CafeteriaRecommendationItem, DailyRecommendationItem
+        from services.ai_service import AIService
+
+        self.short_keys = {
+            "cafeteria": _short_keys(CafeteriaRecommendationItem),
+            "daily": _short_keys(DailyRecommendationItem),
+        }
+        self.service = AIService()
+
+    # -------------------------------------------------------------------
+    # 녹음 파일
+    # -------------------------------------------------------------------
+    def _recording_path(self, variant: str, mode: str, case_id: str) -> str:
+        return os.path.join(self.options.recordings, variant, mode, f"{case_id}.json")
+
+    def _load_recording(self, path: str) -> Optional[Dict]:
+        if path not in self._recordings:
+            if not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                self._recordings[path] = orjson.loads(f.read())
+        return self._recordings[path]
+
+    def recorded_sample(self, run: Dict) -> Optional[Dict]:
+        """재생: 프롬프트 해시가 같은 녹음이 있으면 반복 순서대로 (없으면 None → 스텁)"""
+        recording = self._load_recording(self._recording_path(run["variant"], run["mode"], run["case"]["id"]))
+        if recording is None:
+            run["source"] = "stub"
+            return None
+        if recording["prompt_hash"] != run["prompt_hash"]:
+            run["source"] = "stale"
+            return None
+        run["source"] = "recorded"
+        samples = recording["samples"]
+        return samples[run["repeat"] % len(samples)]
+
+    def save_recordings(self, runs: List[Dict]) -> None:
+        grouped: Dict[str, Dict] = {}
+        for run in runs:
+            if "sample" not in run:
+                continue
+            path = self._recording_path(run["variant"], run["mode"], run["case"]["id"])
+            entry = grouped.setdefault(path, {"prompt_hash": run["prompt_hash"], "samples": []})
+            entry["samples"].append(run["sample"])
+        for path, entry in grouped.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            entry["recorded_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+            with open(path, "wb") as f:
+                f.write(orjson.dumps(entry, option=orjson.OPT_INDENT_2))
+        print(f"💾 녹음 저장: {len(grouped)}개 사례 → {self.options.recordings}")
+
+    # -------------------------------------------------------------------
+    # 스텁 응답
+    # -------------------------------------------------------------------
+    def stub_payload(self, case: Dict, structured: bool) -> Dict:
+        """사례의 stub 또는 규칙 기반 폴백 → 출력 방식(짧은 키 / 긴 키)에 맞게"""
+        kind = MODEL_KIND[case["kind"]]
+        payload = copy.deepcopy(case.get("stub"))
+        if payload is None:
+            if kind == "cafeteria":
+                fallback = self.service._get_fallback_cafeteria_recommendation(case["weather"], case["menu"])
+                payload = {k: fallback[k] for k in ("recommendations", "brief_rationale")}
+            else:
+                fallback = self.service._get_fallback_daily_recommendations(case["weather"], self._location(case))
+                payload = {k: fallback[k] for k in ("recommendations", "summary") if k in fallback}
+        if structured:
+            keys = self.short_keys[kind]
+            payload["recommendations"] = [
+                {keys.get(k, k): v for k, v in item.items() if k != "category_group_code"}
+                for item in payload.get("recommendations", [])
+            ]
+        return payload
+
+    @staticmethod
+    def _location(case: Dict) -> str:
+        return case.get("location") or case["weather"].get("location") or "서울"
+
+    # -------------------------------------------------------------------
+    # 실행
+    # -------------------------------------------------------------------
+    def _prepare(self, variant, structured: bool) -> None:
+        from services.prompts import PROMPT_VARIANTS
+
+        service = self.service
+        service.prompts = PROMPT_VARIANTS[variant]
+        service.structured_output = structured
+        service.use_ai = True
+        real_model = real_daily = None
+        if self.options.record:
+            from services.genai_client import get_genai
+
+            genai = get_genai()
+            real_model = genai.GenerativeModel("gemini-2.0-flash", system_instruction=service.prompts.system_instruction())
+            real_daily = genai.GenerativeModel("gemini-2.0-flash")
+        service._model = BenchModel(self, service.prompts.system_instruction(), real_model)
+        service._daily_model = BenchModel(self, "", real_daily)
+
+    async def _run_case(self, run: Dict) -> Dict:
+        from services.cache import MemoryLRUCache, NamespacedCache
+        from services.json_repair import llm_json_metrics
+
+        service = self.service
+        case = run["case"]
+        kind = MODEL_KIND[case["kind"]]
+        location = self._location(case)
+        service.cache = NamespacedCache("recommendations", MemoryLRUCache())  # 사례마다 빈 캐시 (이전 변형 결과 재사용 방지)
+        random.seed(case["id"])  # 후보 순서 고정 → 같은 프롬프트 (녹음 해시 유지)
+
+        before = dict(llm_json_metrics.stats().get(kind, {}))
+        started = time.perf_counter()
+        if case["kind"] == "cafeteria":
+            result = await service._generate_cafeteria_recommendation(
+                case["weather"], case["menu"], None, True, None, [], None
+            )
+        elif case["kind"] == "daily":
+            result = await service._generate_daily_recommendations(case["weather"], location, None)
+        else:
+            result = await service._generate_daily_recommendations_with_exclusion(
+                case["weather"], location, case["menu"], None
+            )
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        after = llm_json_metrics.stats().get(kind, {})
+        outcome = next(
+            (o for o in ("clean", "repaired", "salvaged", "failed") if after.get(o, 0) > before.get(o, 0)),
+            "error",  # 파싱 전에 실패 (모델 호출 오류 등)
+        )
+        sample = run.get("sample") or {}
+        model_ms = sample.get("latency_ms", 0.0)
+        # 녹음 모드는 실제 모델 시간이 wall 에 포함돼 있다
+        local_ms = max(0.0, wall_ms - model_ms) if self.options.record else wall_ms
+
+        run.update({
+            "outcome": outcome,
+            "prompt_tokens": sample.get("prompt_tokens", 0),
+            "output_tokens": sample.get("output_tokens", 0),
+            "truncated": sample.get("finish_reason") == "MAX_TOKENS",
+            "model_ms": model_ms,
+            "local_ms": round(local_ms, 2),
+            "e2e_ms": round(model_ms + local_ms, 2),
+            "returned": len(result.get("recommendations", [])),
+        })
+        run["violations"] = self._violations(case, sample.get("text", ""), outcome)
+        run["need_more_info"] = run["violations"].pop("need_more_info", False)
+        return run
+
+    def _violations(self, case: Dict, text: str, outcome: str) -> Dict:
+        """후처리 전 모델 응답 기준 규칙 위반 수 (파싱 실패면 셀 것이 없음)"""
+        from schemas import cafeteria_output_adapter, cafeteria_item_adapter, daily_output_adapter, daily_item_adapter
+        from services.json_repair import LLMJSONError, parse_llm_json
+
+        counts = dict.fromkeys(VIOLATIONS, 0)
+        if outcome in ("failed", "error"):
+            return counts
+        kind = MODEL_KIND[case["kind"]]
+        try:
+            if kind == "cafeteria":
+                raw = parse_llm_json(text, cafeteria_output_adapter, cafeteria_item_adapter, kind="bench")
+            else:
+                raw = parse_llm_json(text, daily_output_adapter, daily_item_adapter, kind="bench")
+        except LLMJSONError:
+            return counts
+
+        recs = raw.get("recommendations", [])
+        names = [(r.get("menu_name") or "").replace(" ", "") for r in recs]
+        counts["dup"] = len(names) - len(set(names))
+        counts["no_price"] = sum(1 for r in recs if not r.get("price_range"))
+
+        if kind == "cafeteria":
+            if raw.get("need_more_info"):
+                counts["need_more_info"] = True
+            counts["over"] = max(0, len(recs) - 3)
+            # 후처리 함수가 유형을 바꾼 항목 수 = 국물 상위호환 규칙 위반
+            checked = copy.deepcopy(recs)
+            types = [r.get("type") for r in checked]
+            self.service._fix_wrong_hierarchy_for_soups(case["menu"], checked)
+            counts["soup"] = sum(1 for r, t in zip(checked, types) if r.get("type") != t)
+            random.seed(case["id"])
+            allowed = {
+                m.replace(" ", "")
+                for c in self.service._generate_nearby_candidates(case["menu"], case["weather"], None)
+                for m in c.get("menuExamples", [])
+            }
+            counts["off_cand"] = sum(1 for n in names if n and n not in allowed)
+        else:
+            counts["over"] = int(len(recs) != 3)
+            categories = [r.get("category") for r in recs if r.get("category")]
+            counts["cat_dup"] = len(categories) - len(set(categories))
+            if case["kind"] == "daily_exclusion":
+                cafeteria_items = [m.strip() for m in case["menu"].split(",") if m.strip()]
+                counts["similar"] = sum(
+                    self.service.menu_index.similar_mask([r.get("menu_name") or "" for r in recs], cafeteria_items)
+                )
+        return counts
+
+    async def run(self, variants: List[str], modes: List[str]) -> List[Dict]:
+        runs = []
+        for variant in variants:
+            for mode in modes:
+                self._prepare(variant, mode == "schema")
+                for case in self.cases:
+                    for repeat in range(self.options.repeat):
+                        self.current = {
+                            "variant": variant,
+                            "mode": mode,
+                            "structured": mode == "schema",
+                            "case": case,
+                            "repeat": repeat,
+                            "source": "recorded" if self.options.record else "stub",
+                        }
+                        runs.append(await self._run_case(self.current))
+        return runs
+
+
+# =======================================================================
+# 집계 / 보고
+# =======================================================================
+def summarize(runs: List[Dict]) -> List[Dict]:
+    groups: Dict[tuple, List[Dict]] = {}
+    for run in runs:
+        groups.setdefault((run["variant"], run["mode"]), []).append(run)
+
+    summary = []
+    for (variant, mode), items in groups.items():
+        n = len(items)
+        outcomes = {o: sum(1 for r in items if r["outcome"] == o) for o in ("clean", "repaired", "salvaged", "failed", "error")}
+        violations = {v: sum(r["violations"][v] for r in items) for v in VIOLATIONS}
+        summary.append({
+            "variant": variant,
+            "mode": mode,
+            "runs": n,
+            "sources": {s: sum(1 for r in items if r["source"] == s) for s in ("recorded", "stale", "stub")},
+            "avg_prompt_tokens": round(sum(r["prompt_tokens"] for r in items) / n, 1),
+            "avg_output_tokens": round(sum(r["output_tokens"] for r in items) / n, 1),
+            "truncated": sum(1 for r in items if r["truncated"]),
+            "model_ms_p50": round(percentile([r["model_ms"] for r in items], 50), 1),
+            "local_ms_p50": round(percentile([r["local_ms"] for r in items], 50), 2),
+            "e2e_ms_p50": round(percentile([r["e2e_ms"] for r in items], 50), 1),
+            "e2e_ms_p95": round(percentile([r["e2e_ms"] for r in items], 95), 1),
+            "outcomes": outcomes,
+            "parse_failure_rate": round((outcomes["failed"] + outcomes["error"]) / n, 3),
+            "fallback_rate": round(
+                sum(1 for r in items if r["outcome"] in ("failed", "error") or r["need_more_info"]) / n, 3
+            ),
+            "violations": violations,
+            "violations_total": sum(violations.values()),
+            "by_case": {
+                r["case"]["id"]: {"outcome": r["outcome"], "violations": {k: v for k, v in r["violations"].items() if v}}
+                for r in items if r["repeat"] == 0
+            },
+        })
+    return summary
+
+
+def print_report(summary: List[Dict]) -> None:
+    print(
+        f"\n{'variant/mode':<22}{'n':>4}{'prompt':>8}{'output':>8}{'model':>8}{'e2e p50':>9}{'e2e p95':>9}"
+        f"{'parse✗':>8}{'repair':>7}{'fallbk':>7}{'viol':>6}  sources"
+    )
+    for s in summary:
+        repaired = s["outcomes"]["repaired"] + s["outcomes"]["salvaged"]
+        sources = ", ".join(f"{k} {v}" for k, v in s["sources"].items() if v)
+        print(
+            f"{s['variant'] + '/' + s['mode']:<22}{s['runs']:>4}{s['avg_prompt_tokens']:>8.0f}{s['avg_output_tokens']:>8.0f}"
+            f"{s['model_ms_p50']:>8.0f}{s['e2e_ms_p50']:>9.0f}{s['e2e_ms_p95']:>9.0f}"
+            f"{s['parse_failure_rate'] * 100:>7.0f}%{repaired:>7}{s['fallback_rate'] * 100:>6.0f}%"
+            f"{s['violations_total']:>6}  {sources}"
+        )
+    print(f"\n{'variant/mode':<22}" + "".join(f"{v:>10}" for v in VIOLATIONS))
+    for s in summary:
+        print(f"{s['variant'] + '/' + s['mode']:<22}" + "".join(f"{s['violations'][v]:>10}" for v in VIOLATIONS))
+
+    stale = sum(s["sources"]["stale"] for s in summary)
+    if stale:
+        print(f"\n⚠️ 프롬프트가 바뀌어 녹음을 못 쓴 실행 {stale}개 (스텁으로 대신함) → --record 로 다시 녹음")
+    if any(s["sources"]["stub"] + s["sources"]["stale"] for s in summary):
+        print("ℹ️  스텁 실행의 토큰 / 모델 지연은 추정치 (출력 내용은 변형과 무관)")
+
+
+async def main_async(options) -> int:
+    from services.prompts import PROMPT_VARIANTS
+
+    variants = [v.strip() for v in options.variants.split(",") if v.strip()] or list(PROMPT_VARIANTS)
+    unknown = [v for v in variants if v not in PROMPT_VARIANTS]
+    if unknown:
+        print(f"❌ 알 수 없는 변형: {', '.join(unknown)} (등록: {', '.join(PROMPT_VARIANTS)})")
+        return 1
+    modes = [m.strip() for m in options.modes.split(",") if m.strip()]
+
+    with open(options.cases, "rb") as f:
+        cases = orjson.loads(f.read())
+    if options.only:
+        cases = [c for c in cases if c["id"] in options.only.split(",")]
+    print(f"▶️  변형 {', '.join(variants)} × 출력 {', '.join(modes)} × 사례 {len(cases)}개 × {options.repeat}회"
+          f"{' (녹음)' if options.record else ''}")
+
+    bench = PromptBench(options, cases)
+    runs = await bench.run(variants, modes)
+    if options.record:
+        bench.save_recordings(runs)
+
+    summary = summarize(runs)
+    print_report(summary)
+    if options.save:
+        os.makedirs(os.path.dirname(options.save), exist_ok=True)
+        with open(options.save, "wb") as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+        print(f"💾 결과 저장: {options.save}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="프롬프트 변형 벤치마크 (오프라인 골든셋)")
+    parser.add_argument("--variants", default="", help="비교할 변형 (기본: 등록된 전부)")
+    parser.add_argument("--modes", default="schema", help="출력 방식 (schema, legacy)")
+    parser.add_argument("--cases", default=DEFAULT_CASES, help="골든셋 JSON")
+    parser.add_argument("--only", default="", help="이 사례 ID 만 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=1, help="사례당 반복 횟수")
+    parser.add_argument("--record", action="store_true", help="실제 모델로 호출해서 녹음 (GEMINI_API_KEY 필요)")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS, help="녹음 디렉토리")
+    parser.add_argument("--stub-base-ms", type=float, default=300, help="스텁 모델 지연: 고정분")
+    parser.add_argument("--stub-ms-per-prompt-token", type=float, default=0.1, help="스텁 모델 지연: 프롬프트 토큰당")
+    parser.add_argument("--stub-ms-per-output-token", type=float, default=6, help="스텁 모델 지연: 출력 토큰당")
+    parser.add_argument("--save", default="", help="결과 JSON 저장 경로")
+    options = parser.parse_args(argv)
+
+    options.cases = os.path.abspath(options.cases)
+    options.recordings = os.path.abspath(options.recordings)
+    options.save = os.path.abspath(options.save) if options.save else ""
+
+    if options.record and not os.getenv("GEMINI_API_KEY"):
+        print("❌ --record 는 GEMINI_API_KEY 가 필요합니다")
+        return 1
+
+    # 실행마다 같은 조건: 임시 이력 DB, 메모리 캐시, 트레이스 / 캡처 끔 (import 전에)
+    # 호출 속도 제한은 녹음할 때만 (재생 / 스텁에서는 로컬 지연에 대기 시간이 섞이지 않게)
+    api_key = os.getenv("GEMINI_API_KEY", "") if options.record else ""
+    os.environ.update({
+        "GEMINI_API_KEY": api_key,
+        "CACHE_BACKEND": "memory",
+        "HISTORY_DB_PATH": os.path.join(tempfile.mkdtemp(prefix="prompt-bench-"), "history.sqlite3"),
+        "TRACE_EXPORT_FILE": "",
+        "TRACE_OTLP_ENDPOINT": "",
+        "LLM_MAX_QUEUE_WAIT": "600",
+        "LLM_BACKGROUND_QUEUE_WAIT": "600",
+    })
+    if not options.record:
+        os.environ["LLM_RATE_PER_SEC"] = "0"
+    os.chdir(BACKEND_DIR)
+    sys.path.insert(0, BACKEND_DIR)
+    return asyncio.run(main_async(options))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
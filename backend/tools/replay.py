@@ -0,0 +1,360 @@
+"""
+캡처한 트래픽 재생 (부하 테스트 / 회귀 비교)
+
+middleware/capture.py 가 남긴 로그를 원래 도착 간격의 N배 속도로 다시 보내고
+엔드포인트별 지연 분포(p50/p90/p99/max)와 오류 수를 보고한다.
+
+- 기본: 앱을 프로세스 안에서 띄워 재생 (httpx ASGITransport)
+    · 날씨: tools/weather_standin.py 를 빈 포트로 띄워 WEATHER_BASE_URL 로 연결
+    · 모델: GEMINI_API_KEY 를 비워 로컬 규칙 기반 추천 경로 사용
+    · 장소: PLACE_CLIENT=stub, 추천 이력은 임시 DB (실행마다 같은 조건)
+- --target http://host:port 를 주면 이미 떠 있는 서버로 보낸다 (스탠드인은 직접 연결)
+- 비동기 작업(202)은 결과가 나올 때까지 따라가서 전체 시간을 잰다
+- --save 로 결과 저장, --baseline 으로 이전 결과와 비교 → 느려진 엔드포인트가 있으면 exit code 1
+
+사용:
+    cd backend
+    python tools/replay.py capture.jsonl --speed 4 --save runs/today.json
+    python tools/replay.py capture.jsonl --speed 4 --baseline runs/today.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import orjson
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from middleware.capture import blob_dir_for  # noqa: E402
+
+JOB_POLL_WAIT = 25
+
+
+# =======================================================================
+# 캡처 로그 읽기
+# =======================================================================
+def load_capture(path: str, limit: Optional[int] = None) -> List[Dict]:
+    """캡처 로그 → 시각 순 레코드 (본문 생략된 요청은 재생 불가라 제외)"""
+    records = []
+    with open(path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = orjson.loads(line)
+            if "bt" in record:
+                continue
+            records.append(record)
+    records.sort(key=lambda r: r["t"])
+    return records[:limit] if limit else records
+
+
+def _resolve_blobs(value, blob_dir: str, loaded: Dict[str, str]):
+    """
+    {"$blob": 해시} → 저장해 둔 업로드 (메타데이터를 지운 base64 문자열)
+    메타데이터를 지울 수 없어 저장하지 않은 업로드면 FileNotFoundError
+    """
+    if isinstance(value, dict):
+        if set(value) == {"$blob"}:
+            digest = value["$blob"]
+            if digest not in loaded:
+                with open(os.path.join(blob_dir, digest), "rb") as f:
+                    loaded[digest] = f.read().decode("utf-8")
+            return loaded[digest]
+        return {k: _resolve_blobs(v, blob_dir, loaded) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve_blobs(v, blob_dir, loaded) for v in value]
+    return value
+
+
+def build_requests(records: List[Dict], capture_path: str) -> List[Dict]:
+    blob_dir = blob_dir_for(capture_path)
+    loaded: Dict[str, str] = {}
+    requests = []
+    missing_blobs = 0
+    for record in records:
+        headers = dict(record.get("h", {}))
+        headers["X-Client-Id"] = f"replay-{record['c']}"  # 가명 그대로 → 클라이언트별 이력/공정 분배 재현
+        try:
+            body = _resolve_blobs(record["b"], blob_dir, loaded) if "b" in record else None
+        except FileNotFoundError:
+            missing_blobs += 1
+            continue
+        requests.append({
+            "offset": record["t"] - records[0]["t"],
+            "method": record["m"],
+            "path": record["p"],
+            "params": record.get("q"),
+            "headers": headers,
+            "json": body,
+            "recorded_ms": record.get("d"),
+            "recorded_status": record.get("s"),
+        })
+    if missing_blobs:
+        print(f"ℹ️  저장되지 않은 업로드(PDF 등)가 있는 요청 {missing_blobs}개는 건너뜀")
+    return requests
+
+
+# =======================================================================
+# 재생
+# =======================================================================
+async def _send(client, request: Dict) -> Dict:
+    started = time.perf_counter()
+    status = 0
+    try:
+        response = await client.request(
+            request["method"],
+            request["path"],
+            params=request["params"],
+            headers=request["headers"],
+            json=request["json"],
+        )
+        status = response.status_code
+        # 비동기 작업은 결과까지 따라가서 전체 시간으로
+        location = response.headers.get("location")
+        while status == 202 and location:
+            job = await client.get(location, params={"wait": JOB_POLL_WAIT})
+            if job.status_code != 200:
+                status = job.status_code
+                break
+            data = job.json().get("data", {})
+            if data.get("status") == "succeeded":
+                status = 200
+            elif data.get("status") == "failed":
+                status = data.get("error", {}).get("status", 500)
+    except Exception as e:
+        print(f"⚠️ 재생 요청 실패: {request['method']} {request['path']}: {type(e).__name__}: {e}")
+    return {
+        "endpoint": f"{request['method']} {request['path']}",
+        "status": status,
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "recorded_ms": request["recorded_ms"],
+    }
+
+
+async def replay(client, requests: List[Dict], speed: float, max_inflight: int) -> Dict:
+    """원래 도착 간격 / speed 로 열린 루프 재생 (응답을 기다리지 않고 다음 요청을 보낸다)"""
+    inflight = asyncio.Semaphore(max_inflight)
+    lags: List[float] = []
+    tasks = []
+
+    async def run_one(request: Dict) -> Dict:
+        async with inflight:
+            return await _send(client, request)
+
+    started = time.perf_counter()
+    for request in requests:
+        scheduled = started + request["offset"] / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        lags.append(max(0.0, time.perf_counter() - scheduled) * 1000)
+        tasks.append(asyncio.create_task(run_one(request)))
+    results = await asyncio.gather(*tasks)
+    return {
+        "results": results,
+        "duration_s": time.perf_counter() - started,
+        "max_lag_ms": max(lags, default=0.0),
+    }
+
+
+async def _in_process_client(weather_latency: float):
+    """스탠드인 환경으로 앱을 import 해서 ASGI 로 직접 호출 (환경 변수는 import 전에)"""
+    import weather_standin
+
+    server = await weather_standin.start(latency=weather_latency)
+    host, port = server.sockets[0].getsockname()[:2]
+    state_dir = tempfile.mkdtemp(prefix="replay-")
+    os.environ.update({
+        "WEATHER_BASE_URL": f"http://{host}:{port}/v1/forecast",
+        "WEATHER_MODEL_META_URL": "",
+        "GEMINI_API_KEY": "",
+        "PLACE_CLIENT": "stub",
+        "CACHE_BACKEND": "memory",
+        "HISTORY_DB_PATH": os.path.join(state_dir, "history.sqlite3"),
+        "SERVICE_WARMUP": "0",
+        "WEATHER_BULK_REFRESH": "0",
+        "CAPTURE_FILE": "",
+        "TRACE_EXPORT_FILE": "",
+        "TRACE_OTLP_ENDPOINT": "",
+        "PROFILE_ADMIN_TOKEN": "",
+        "PROFILE_SAMPLE_RATE": "0",
+    })
+    os.chdir(BACKEND_DIR)
+
+    import httpx
+    import main
+
+    await main.on_startup()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=main.app),
+        base_url="http://replay",
+        timeout=None,
+    )
+
+    async def close():
+        await client.aclose()
+        await main.on_shutdown()
+        server.close()
+
+    return client, close
+
+
+# =======================================================================
+# 집계 / 비교
+# =======================================================================
+def percentile(values: List[float], q: float) -> float:
+    """nearest-rank 백분위수"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _distribution(values: List[float]) -> Dict:
+    return {
+        "p50": round(percentile(values, 50), 1),
+        "p90": round(percentile(values, 90), 1),
+        "p99": round(percentile(values, 99), 1),
+        "max": round(max(values, default=0.0), 1),
+        "mean": round(sum(values) / len(values), 1) if values else 0.0,
+    }
+
+
+def summarize(run: Dict, speed: float) -> Dict:
+    by_endpoint: Dict[str, List[Dict]] = {}
+    for result in run["results"]:
+        by_endpoint.setdefault(result["endpoint"], []).append(result)
+
+    endpoints = {}
+    for endpoint, results in sorted(by_endpoint.items()):
+        recorded = [r["recorded_ms"] for r in results if r["recorded_ms"] is not None]
+        endpoints[endpoint] = {
+            "count": len(results),
+            "errors": sum(1 for r in results if r["status"] == 0 or r["status"] >= 500),
+            "rejected": sum(1 for r in results if r["status"] == 429),
+            **_distribution([r["latency_ms"] for r in results]),
+            "recorded": _distribution(recorded) if recorded else None,
+        }
+
+    return {
+        "speed": speed,
+        "requests": len(run["results"]),
+        "duration_s": round(run["duration_s"], 2),
+        "throughput_rps": round(len(run["results"]) / run["duration_s"], 1) if run["duration_s"] else 0.0,
+        "max_lag_ms": round(run["max_lag_ms"], 1),
+        "overall": _distribution([r["latency_ms"] for r in run["results"]]),
+        "endpoints": endpoints,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """기준 실행 대비 p50/p99 가 threshold 비율 + min_delta_ms 이상 느려졌거나 오류가 늘면 회귀"""
+    regressions = []
+    for endpoint, stats in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(endpoint)
+        if not before:
+            continue
+        for key in ("p50", "p99"):
+            delta = stats[key] - before[key]
+            if delta > min_delta_ms and delta > before[key] * threshold:
+                regressions.append(
+                    f"{endpoint} {key}: {before[key]:.1f}ms → {stats[key]:.1f}ms "
+                    f"(+{delta / before[key] * 100 if before[key] else float('inf'):.0f}%)"
+                )
+        if stats["errors"] > before["errors"]:
+            regressions.append(f"{endpoint} errors: {before['errors']} → {stats['errors']}")
+    return regressions
+
+
+def print_report(summary: Dict, baseline: Optional[Dict]) -> None:
+    print(
+        f"\n📊 재생 결과: {summary['requests']}개 요청, {summary['duration_s']}s "
+        f"({summary['throughput_rps']} req/s, x{summary['speed']}, 최대 발송 지연 {summary['max_lag_ms']}ms)"
+    )
+    header = f"{'endpoint':<40}{'n':>6}{'err':>5}{'429':>5}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"
+    if baseline:
+        header += f"{'base p50':>10}{'base p99':>10}"
+    header += f"{'rec p50':>9}"
+    print(header)
+    for endpoint, stats in summary["endpoints"].items():
+        line = (
+            f"{endpoint:<40}{stats['count']:>6}{stats['errors']:>5}{stats['rejected']:>5}"
+            f"{stats['p50']:>9.1f}{stats['p90']:>9.1f}{stats['p99']:>9.1f}{stats['max']:>9.1f}"
+        )
+        if baseline:
+            before = baseline.get("endpoints", {}).get(endpoint)
+            line += f"{before['p50']:>10.1f}{before['p99']:>10.1f}" if before else f"{'-':>10}{'-':>10}"
+        line += f"{stats['recorded']['p50']:>9.1f}" if stats["recorded"] else f"{'-':>9}"
+        print(line)
+
+
+async def main_async(options) -> int:
+    # 프로세스 안 재생은 backend 로 chdir 하므로 경로를 먼저 절대 경로로
+    options.save = os.path.abspath(options.save) if options.save else ""
+    options.baseline = os.path.abspath(options.baseline) if options.baseline else ""
+    requests = build_requests(load_capture(options.capture, options.limit), options.capture)
+    if not requests:
+        print("❌ 재생할 요청이 없습니다")
+        return 1
+    print(f"▶️  {len(requests)}개 요청 재생 (x{options.speed}, 원래 {requests[-1]['offset']:.1f}s 분량)")
+
+    if options.target:
+        import httpx
+
+        client = httpx.AsyncClient(base_url=options.target, timeout=None)
+        close = client.aclose
+    else:
+        client, close = await _in_process_client(options.weather_latency)
+
+    try:
+        run = await replay(client, requests, options.speed, options.max_inflight)
+    finally:
+        await close()
+
+    summary = summarize(run, options.speed)
+    baseline = None
+    if options.baseline:
+        with open(options.baseline, "rb") as f:
+            baseline = orjson.loads(f.read())
+    print_report(summary, baseline)
+
+    if options.save:
+        os.makedirs(os.path.dirname(options.save), exist_ok=True)
+        with open(options.save, "wb") as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+        print(f"💾 결과 저장: {options.save}")
+
+    if baseline:
+        regressions = compare(summary, baseline, options.threshold, options.min_delta_ms)
+        if regressions:
+            print("\n❌ 회귀:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\n✅ 기준 대비 회귀 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="캡처한 트래픽 재생 + 지연 분포 / 회귀 비교")
+    parser.add_argument("capture", help="CAPTURE_FILE 로 남긴 로그 (jsonl)")
+    parser.add_argument("--speed", type=float, default=1.0, help="원래 도착 간격 대비 배속")
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 N개만")
+    parser.add_argument("--target", default="", help="떠 있는 서버 주소 (없으면 프로세스 안에서 스탠드인으로)")
+    parser.add_argument("--weather-latency", type=float, default=0.08, help="날씨 스탠드인 지연 (초)")
+    parser.add_argument("--max-inflight", type=int, default=256, help="동시에 보내 둘 최대 요청 수")
+    parser.add_argument("--save", default="", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", default="", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="회귀로 볼 상대 증가율")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="회귀로 볼 최소 절대 증가 (ms)")
+    options = parser.parse_args()
+    sys.exit(asyncio.run(main_async(options)))
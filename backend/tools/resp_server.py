@@ -0,0 +1,97 @@
+"""
+로컬 RESP(Redis 프로토콜) 스탠드인 서버
+
+Redis가 없는 개발 환경에서 CACHE_BACKEND=redis 경로를 돌려보기 위한 최소 서버.
+RedisCache가 쓰는 명령(PING / GET / SET [PX ms] / DEL / AUTH / SELECT)만 지원한다.
+
+사용:
+    cd backend
+    python tools/resp_server.py --port 6379
+    CACHE_BACKEND=redis CACHE_REDIS_URL=redis://127.0.0.1:6379/0 python main.py
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+_store: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+
+
+async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        # inline 명령 (redis-cli 등)
+        return line.strip().split()
+    args = []
+    for _ in range(int(line[1:-2])):
+        header = await reader.readline()
+        length = int(header[1:-2])
+        data = await reader.readexactly(length + 2)
+        args.append(data[:-2])
+    return args
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _execute(args: List[bytes]) -> bytes:
+    name = args[0].upper()
+    now = time.time()
+
+    if name == b"PING":
+        return b"+PONG\r\n"
+    if name in (b"AUTH", b"SELECT"):
+        return b"+OK\r\n"
+    if name == b"GET":
+        item = _store.get(args[1])
+        if item is None or (item[1] is not None and item[1] < now):
+            _store.pop(args[1], None)
+            return _bulk(None)
+        return _bulk(item[0])
+    if name == b"SET":
+        expires_at = None
+        if len(args) >= 5 and args[3].upper() == b"PX":
+            expires_at = now + int(args[4]) / 1000
+        elif len(args) >= 5 and args[3].upper() == b"EX":
+            expires_at = now + int(args[4])
+        _store[args[1]] = (args[2], expires_at)
+        return b"+OK\r\n"
+    if name == b"DEL":
+        removed = sum(1 for key in args[1:] if _store.pop(key, None) is not None)
+        return b":%d\r\n" % removed
+    return b"-ERR unknown command '%s'\r\n" % name
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            args = await _read_command(reader)
+            if not args:
+                break
+            writer.write(_execute(args))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int) -> None:
+    server = await asyncio.start_server(_handle, host, port)
+    print(f"✅ RESP 스탠드인 서버 실행: {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 RESP 스탠드인 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    options = parser.parse_args()
+    asyncio.run(serve(options.host, options.port))
@@ -0,0 +1,132 @@
+"""
+로컬 Open-Meteo 스탠드인 서버
+
+부하 테스트 / 트래픽 재생에서 외부 날씨 API 대신 쓰는 최소 HTTP 서버.
+WeatherService가 쓰는 GET /v1/forecast 의 hourly(unixtime) / current 응답만 흉내 낸다.
+- 좌표별로 결정적인 값 (같은 좌표 → 같은 날씨), 여러 좌표면 리스트로 응답 (다중 좌표 요청)
+- --latency 로 업스트림 지연을 흉내 냄
+
+사용:
+    cd backend
+    python tools/weather_standin.py --port 8099 --latency 0.08
+    WEATHER_BASE_URL=http://127.0.0.1:8099/v1/forecast python main.py
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+import orjson
+
+WEATHER_CODES = (0, 1, 2, 3, 45, 61, 63, 71, 80, 95)
+
+
+def _seed(latitude: str, longitude: str) -> bytes:
+    return hashlib.sha1(f"{float(latitude):.2f},{float(longitude):.2f}".encode()).digest()
+
+
+def _hourly(latitude: str, longitude: str, days: int) -> Dict:
+    """오늘 0시(KST)부터 days 일치 시간별 예보"""
+    seed = _seed(latitude, longitude)
+    kst_midnight = int((time.time() + 9 * 3600) // 86400 * 86400 - 9 * 3600)
+    hours = 24 * days
+    base = 5 + seed[0] % 25
+    code = WEATHER_CODES[seed[1] % len(WEATHER_CODES)]
+    return {
+        "time": [kst_midnight + i * 3600 for i in range(hours)],
+        "temperature_2m": [round(base + 4 * math.sin((i % 24 - 9) / 24 * 2 * math.pi), 1) for i in range(hours)],
+        "relative_humidity_2m": [40 + (seed[2] + i) % 50 for i in range(hours)],
+        "precipitation": [0.6 if code >= 61 else 0.0 for _ in range(hours)],
+        "cloud_cover": [seed[3] % 100 for _ in range(hours)],
+        "weather_code": [code for _ in range(hours)],
+    }
+
+
+def _current(latitude: str, longitude: str) -> Dict:
+    series = _hourly(latitude, longitude, 1)
+    index = min(int((time.time() - series["time"][0]) // 3600), 23)
+    return {
+        "time": series["time"][index],
+        "temperature_2m": series["temperature_2m"][index],
+        "relative_humidity_2m": series["relative_humidity_2m"][index],
+        "weather_code": series["weather_code"][index],
+        "precipitation": series["precipitation"][index],
+        "cloud_cover": series["cloud_cover"][index],
+    }
+
+
+def forecast(query: Dict[str, List[str]]) -> bytes:
+    latitudes = query.get("latitude", ["37.5665"])[0].split(",")
+    longitudes = query.get("longitude", ["126.9780"])[0].split(",")
+    days = int(query.get("forecast_days", ["2"])[0])
+    items = []
+    for latitude, longitude in zip(latitudes, longitudes):
+        item = {"latitude": float(latitude), "longitude": float(longitude), "timezone": "Asia/Seoul"}
+        if "hourly" in query:
+            item["hourly"] = _hourly(latitude, longitude, days)
+        if "current" in query:
+            item["current"] = _current(latitude, longitude)
+        items.append(item)
+    return orjson.dumps(items if len(items) > 1 else items[0])
+
+
+def _response(status: int, body: bytes) -> bytes:
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found"}.get(status, "OK")
+    return (
+        f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode() + body
+
+
+def make_handler(latency: float = 0.0):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass  # GET 만 받으므로 헤더/본문은 무시
+                target = request_line.split()[1].decode("latin-1")
+                url = urlsplit(target)
+                if url.path.rstrip("/").endswith("/forecast"):
+                    if latency:
+                        await asyncio.sleep(latency)
+                    try:
+                        writer.write(_response(200, forecast(parse_qs(url.query))))
+                    except (ValueError, IndexError) as e:
+                        writer.write(_response(400, orjson.dumps({"error": True, "reason": str(e)})))
+                else:
+                    writer.write(_response(404, b'{"error": true}'))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def start(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0) -> asyncio.AbstractServer:
+    """스탠드인 시작 (port=0 이면 빈 포트) → server.sockets[0].getsockname() 로 주소 확인"""
+    return await asyncio.start_server(make_handler(latency), host, port)
+
+
+async def serve(host: str, port: int, latency: float) -> None:
+    server = await start(host, port, latency)
+    print(f"✅ Open-Meteo 스탠드인 서버 실행: http://{host}:{port}/v1/forecast (지연 {latency * 1000:.0f}ms)")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 Open-Meteo 스탠드인 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연 (초)")
+    options = parser.parse_args()
+    asyncio.run(serve(options.host, options.port, options.latency))
@@ -6,7 +6,7 @@ import RouletteGame from './components/RouletteGame';
 import RestaurantPage from './components/RestaurantPage';
 import DailyRecommendations from './components/DailyRecommendations';
 import AlertBanner from './components/AlertBanner';
-import { weatherAPI, cafeteriaAPI, dailyRecommendationsAPI } from './services/api';
+import { weatherAPI, lunchBundleAPI } from './services/api';
 
 function App() {
   const [currentPage, setCurrentPage] = useState('landing'); // landing, location, input, result, roulette, restaurant
@@ -40,7 +40,7 @@ function App() {
       setTheme(theme);
       
       // 배경 사진 가져오기
-      fetchBackgroundPhoto(weather.sky_condition, weather.temperature);
+      fetchBackgroundPhoto(weather.sky_condition, weather.temperature, weather.background);
     }
   }, [weather]);
 
@@ -66,10 +66,55 @@ function App() {
     console.log('✅ 테마 적용 완료:', theme);
   };
 
-  const fetchBackgroundPhoto = async (weatherCondition, temperature) => {
+  // 서버가 고른 배경(콘텐츠 해시 URL)에서 화면 폭에 맞는 변형 선택
+  const pickBackgroundSources = (background) => {
+    const sources = background?.sources || [];
+    if (sources.length === 0) return null;
+    const target = window.innerWidth * (window.devicePixelRatio || 1);
+    const widths = [...new Set(sources.map(s => s.width))].sort((a, b) => a - b);
+    const width = widths.find(w => w >= target) || widths[widths.length - 1];
+    const ofFormat = (format) => sources.find(s => s.width === width && s.format === format);
+    return { avif: ofFormat('avif'), webp: ofFormat('webp') || { url: background.url } };
+  };
+
+  const applyBackground = (imageUrl) => {
+    setBackgroundPhoto(imageUrl);
+    document.body.style.backgroundImage = `url(${imageUrl})`;
+    document.body.style.backgroundSize = 'cover';
+    document.body.style.backgroundPosition = 'center';
+    document.body.style.backgroundRepeat = 'no-repeat';
+    document.body.style.backgroundAttachment = 'fixed';
+  };
+
+  const fetchBackgroundPhoto = async (weatherCondition, temperature, background = null) => {
     try {
       console.log('📸 배경 이미지 설정:', weatherCondition, temperature);
-      
+
+      // 변환된 배경이 있으면 <picture> 로 AVIF/WebP 중 브라우저가 지원하는 것만 받는다
+      const picked = pickBackgroundSources(background);
+      if (picked) {
+        const picture = document.createElement('picture');
+        if (picked.avif) {
+          const source = document.createElement('source');
+          source.type = 'image/avif';
+          source.srcset = picked.avif.url;
+          picture.appendChild(source);
+        }
+        const img = document.createElement('img');
+        picture.appendChild(img);
+        img.onload = () => {
+          const imageUrl = img.currentSrc || picked.webp.url;
+          console.log('✅ 배경 이미지 로드 성공:', imageUrl);
+          applyBackground(imageUrl);
+        };
+        img.onerror = () => {
+          console.warn('⚠️ 변환 배경 로드 실패 - 원본 이미지 사용');
+          fetchBackgroundPhoto(weatherCondition, temperature);
+        };
+        img.src = picked.webp.url;
+        return;
+      }
+
       // 날씨 조건에 따른 로컬 이미지 선택
       let imageName = 'sunny.png'; // 기본값
       
@@ -94,12 +139,7 @@ function App() {
       const img = new Image();
       img.onload = () => {
         console.log('✅ 배경 이미지 로드 성공:', imageUrl);
-        setBackgroundPhoto(imageUrl);
-        document.body.style.backgroundImage = `url(${imageUrl})`;
-        document.body.style.backgroundSize = 'cover';
-        document.body.style.backgroundPosition = 'center';
-        document.body.style.backgroundRepeat = 'no-repeat';
-        document.body.style.backgroundAttachment = 'fixed';
+        applyBackground(imageUrl);
       };
       img.onerror = () => {
         console.warn('⚠️ 배경 이미지 로드 실패:', imageUrl, '- 기본값 사용');
@@ -234,7 +274,7 @@ function App() {
         const theme = chooseThemeFromWeather(response.data.sky_condition, response.data.temperature);
         console.log('테마 즉시 적용:', theme, response.data);
         setTheme(theme);
-        await fetchBackgroundPhoto(response.data.sky_condition, response.data.temperature);
+        await fetchBackgroundPhoto(response.data.sky_condition, response.data.temperature, response.data.background);
       }
     } catch (err) {
       console.error('날씨 정보 가져오기 실패:', err);
@@ -246,17 +286,32 @@ function App() {
     setError(null);
 
     try {
-      // 오늘의 메뉴를 전달 (중복 체크용)
-      const dailyMenusForCheck = dailyRecommendations?.recommendations || null;
-      
-      const response = await cafeteriaAPI.getRecommendation(
+      // 날씨 + 구내식당 추천 + (구내식당 메뉴와 연관 낮은) 오늘의 메뉴를 한 번에
+      // 오늘의 메뉴 중복 체크는 서버 추천 이력으로 처리 (daily_menus 전송 불필요)
+      const bundle = await lunchBundleAPI.getLunchBundle(
         location,
         input.method === 'text' ? input.content : input.textFallback || '',
         userCoords,
         true,  // preferExternal
-        dailyMenusForCheck,  // 오늘의 메뉴 전달
-        input.method === 'image' ? input.imageData : null  // 이미지 데이터
+        input.method === 'image' ? input.imageData : null,  // 이미지 데이터
+        (section, data) => {
+          if (section === 'weather' && data) {
+            setWeather(data);
+          } else if (section === 'daily' && data) {
+            // 재생성 실패해도 기존 메뉴 유지
+            setDailyRecommendations(data);
+            console.log('✅ 오늘의 메뉴 재생성 완료:', data);
+          }
+        }
       );
+
+      const cafeteriaError = bundle.data.errors.cafeteria;
+      if (cafeteriaError) {
+        const error = new Error(cafeteriaError.detail);
+        error.response = { status: cafeteriaError.status, data: cafeteriaError };
+        throw error;
+      }
+      const response = { data: bundle.data.cafeteria };
       
       // 검증 실패 응답 처리
       if (response.data.need_more_info && response.data.missing) {
@@ -285,23 +340,6 @@ function App() {
       
       setRecommendation(response.data);
       
-      // 구내식당 메뉴 입력 후 오늘의 메뉴를 구내식당 메뉴와 연관 낮은 메뉴로 재생성
-      try {
-        const menuForRefresh = input.method === 'text' ? input.content : (response.data.extracted_menu || input.textFallback || '');
-        const refreshedDailyMenus = await dailyRecommendationsAPI.refreshDailyRecommendations(
-          location,
-          menuForRefresh,
-          userCoords
-        );
-        if (refreshedDailyMenus.success) {
-          setDailyRecommendations(refreshedDailyMenus.data);
-          console.log('✅ 오늘의 메뉴 재생성 완료:', refreshedDailyMenus.data);
-        }
-      } catch (refreshErr) {
-        console.error('오늘의 메뉴 재생성 실패 (기존 메뉴 유지):', refreshErr);
-        // 재생성 실패해도 기존 메뉴 유지하고 계속 진행
-      }
-      
       setCurrentPage('result');
     } catch (err) {
       // 에러 메시지 처리
@@ -171,7 +171,7 @@ const CafeteriaInput = ({ onSubmit, onValidationError, onBack, weather, location
                   </div>
                   <p className="text-xs sm:text-sm text-slate-600">
                     클릭하거나 이미지를 드래그하세요<br/>
-                    <span className="text-slate-400">JPG, PNG 파일 (최대 5MB)</span>
+                    <span className="text-slate-400">JPG, PNG 이미지 또는 PDF, HTML 식단표 (최대 5MB)</span>
                   </p>
                   {imageFile && (
                     <div className="mt-3 bg-green-50 border border-green-200 rounded-lg p-3 relative">
@@ -195,7 +195,7 @@ const CafeteriaInput = ({ onSubmit, onValidationError, onBack, weather, location
                   <input
                     id="file-input"
                     type="file"
-                    accept="image/*"
+                    accept="image/*,application/pdf,.pdf,text/html,.html,.htm"
                     className="hidden"
                     onChange={handleFileInput}
                   />
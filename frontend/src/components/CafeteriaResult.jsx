@@ -16,7 +16,10 @@ const CafeteriaResult = ({ recommendation, weather, location, onSelectMenu, onSh
 
   const handleConfirm = () => {
     if (selectedMenu) {
-      onSelectMenu(selectedMenu.menu_name || selectedMenu.menu);
+      // 서버에서 찾아 둔 근처 식당(places)이 있으면 항목 그대로 넘겨서 재검색을 건너뛴다
+      onSelectMenu(
+        selectedMenu.places?.length ? selectedMenu : (selectedMenu.menu_name || selectedMenu.menu)
+      );
     }
   };
 
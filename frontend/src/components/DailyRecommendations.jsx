@@ -8,10 +8,35 @@ const DailyRecommendations = ({ location, userCoords, weather, onRecommendations
   const [selectedMenu, setSelectedMenu] = useState(null);
 
   useEffect(() => {
-    // 한 번만 로드 (location, userCoords 의존성 제거)
-    if (!recommendations) {
+    // 한 번만 구독 (location, userCoords 의존성 제거)
+    // 서버가 날씨 구간이 바뀔 때만 push → 새로고침 없이 최신 추천 유지
+    if (typeof WebSocket === 'undefined') {
       fetchDailyRecommendations();
+      return undefined;
     }
+    let received = false;
+    const unsubscribe = dailyRecommendationsAPI.subscribeDailyRecommendations(
+      location || '서울시',
+      userCoords,
+      (data) => {
+        received = true;
+        setRecommendations(data);
+        setError(null);
+        setLoading(false);
+        if (onRecommendationsUpdate) {
+          onRecommendationsUpdate(data);
+        }
+      },
+      (err) => {
+        // 첫 결과를 받기 전에 실패하면 한 번 직접 조회 (이후 끊김은 재연결에 맡김)
+        if (!received) {
+          received = true;
+          console.error('오늘의 추천 구독 실패:', err);
+          fetchDailyRecommendations();
+        }
+      }
+    );
+    return unsubscribe;
   }, []); // eslint-disable-line react-hooks/exhaustive-deps
 
   const fetchDailyRecommendations = async () => {
@@ -223,9 +223,8 @@ const RestaurantPage = ({ menuName, weather, location, userCoords, onBack }) =>
       return R * c; // km
     };
 
-    // 키워드로 장소 검색
-    console.log('🔍 장소 검색 시작:', searchKeyword, `(반경 2km)`);
-    ps.keywordSearch(searchKeyword, (data, status) => {
+    // 검색 결과(카카오 JS 검색 또는 서버 결과)를 목록/지도에 표시
+    const showPlaces = (data, status) => {
       console.log('🔍 검색 결과 상태:', status);
       console.log('🔍 검색 결과 데이터:', data);
       
@@ -312,7 +311,19 @@ const RestaurantPage = ({ menuName, weather, location, userCoords, onBack }) =>
       } else if (status === window.kakao.maps.services.Status.ERROR) {
         console.error('❌ 검색 중 오류 발생');
       }
-    }, searchOption);
+    };
+
+    // 서버가 이미 찾아둔 근처 식당이 있으면 검색 없이 그대로 사용
+    const serverPlaces = menuName && typeof menuName === 'object' ? menuName.places : null;
+    if (serverPlaces && serverPlaces.length > 0) {
+      console.log(`✅ 서버 검색 결과 사용: ${serverPlaces.length}개`);
+      showPlaces(serverPlaces, window.kakao.maps.services.Status.OK);
+      return;
+    }
+
+    // 키워드로 장소 검색
+    console.log('🔍 장소 검색 시작:', searchKeyword, `(반경 2km)`);
+    ps.keywordSearch(searchKeyword, (data, status) => showPlaces(data, status), searchOption);
   };
 
   return (
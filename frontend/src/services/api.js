@@ -2,10 +2,27 @@ import axios from 'axios';
 
 const API_BASE_URL = 'http://localhost:8000';
 
+// 브라우저별 고정 식별자 → 서버가 추천 이력(최근 며칠 중복 방지)을 이 값으로 관리
+const getClientId = () => {
+  try {
+    let clientId = localStorage.getItem('babmuttna_client_id');
+    if (!clientId) {
+      clientId = (crypto.randomUUID && crypto.randomUUID()) || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+      localStorage.setItem('babmuttna_client_id', clientId);
+    }
+    return clientId;
+  } catch (e) {
+    return null;
+  }
+};
+
+const clientId = getClientId();
+
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
     'Content-Type': 'application/json',
+    ...(clientId ? { 'X-Client-Id': clientId } : {}),
   },
 });
 
@@ -21,12 +38,12 @@ export const weatherAPI = {
 };
 
 export const cafeteriaAPI = {
-  getRecommendation: async (location, cafeteriaMenu, userLocation = null, preferExternal = true, dailyMenus = null, imageData = null) => {
+  getRecommendation: async (location, cafeteriaMenu, userLocation = null, preferExternal = true, imageData = null) => {
+    // 오늘의 메뉴 중복 체크는 서버의 추천 이력(X-Client-Id)으로 처리
     const payload = {
       location,
       user_location: userLocation,
       prefer_external: preferExternal,  // CAM 모드 활성화
-      daily_menus: dailyMenus  // 오늘의 메뉴 전달
     };
     
     // 이미지 또는 텍스트
@@ -51,6 +68,53 @@ export const dailyRecommendationsAPI = {
     const response = await api.get(url);
     return response.data;
   },
+  // 같은 위치(격자) / 사이트 구독자에게 서버가 바뀔 때만 push → 폴링 대신 구독
+  // 연결 즉시 현재 결과를 한 번 받고, 끊기면 점점 늘어나는 간격으로 다시 연결. 반환값은 구독 해제 함수
+  subscribeDailyRecommendations: (location, coords = null, onData = null, onError = null, siteId = null) => {
+    const params = new URLSearchParams({ location });
+    if (coords && coords.latitude && coords.longitude) {
+      params.set('lat', coords.latitude);
+      params.set('lng', coords.longitude);
+    }
+    if (siteId) params.set('site_id', siteId);
+    if (clientId) params.set('client_id', clientId);
+    const url = `${API_BASE_URL.replace(/^http/, 'ws')}/ws/daily-recommendations?${params}`;
+
+    let socket = null;
+    let closed = false;
+    let retryDelay = 1000;
+    let retryTimer = null;
+    let pingTimer = null;
+
+    const connect = () => {
+      socket = new WebSocket(url);
+      socket.onopen = () => {
+        retryDelay = 1000;
+        pingTimer = setInterval(() => socket.readyState === WebSocket.OPEN && socket.send('ping'), 30000);
+      };
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'daily' && onData) onData(message.data);
+        if (message.type === 'error' && onError) onError(new Error(message.detail));
+      };
+      socket.onclose = (event) => {
+        clearInterval(pingTimer);
+        if (closed) return;
+        if (onError) onError(new Error(`WebSocket closed (${event.code})`));
+        if (event.code === 4404) return;  // 등록되지 않은 사이트
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 60000);
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      clearInterval(pingTimer);
+      if (socket) socket.close();
+    };
+  },
   refreshDailyRecommendations: async (location, cafeteriaMenu, userLocation = null) => {
     const response = await api.post('/api/daily-recommendations-refresh', {
       location,
@@ -61,5 +125,65 @@ export const dailyRecommendationsAPI = {
   },
 };
 
+export const lunchBundleAPI = {
+  // 날씨 + 오늘의 추천 + 구내식당 추천을 한 번에 (섹션이 끝나는 대로 onSection 호출)
+  getLunchBundle: async (location, cafeteriaMenu, userLocation = null, preferExternal = true, imageData = null, onSection = null) => {
+    const payload = {
+      location,
+      user_location: userLocation,
+      prefer_external: preferExternal,
+      cafeteria_menu: cafeteriaMenu,
+    };
+    if (imageData) {
+      payload.image_data = imageData;
+    }
+
+    const response = await fetch(`${API_BASE_URL}/api/lunch-bundle`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: 'application/x-ndjson',
+        ...(clientId ? { 'X-Client-Id': clientId } : {}),
+      },
+      body: JSON.stringify(payload),
+    });
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}));
+      const error = new Error(body.detail || `HTTP ${response.status}`);
+      error.response = { status: response.status, data: body };
+      throw error;
+    }
+
+    // NDJSON: 한 줄 = 한 섹션 ({section, data} 또는 {section, error})
+    const bundle = { weather: null, daily: null, cafeteria: null, errors: {} };
+    const handleLine = (line) => {
+      if (!line.trim()) return;
+      const message = JSON.parse(line);
+      if (message.section === 'done') return;
+      if (message.error) {
+        bundle.errors[message.section] = message.error;
+      } else {
+        bundle[message.section] = message.data;
+      }
+      if (onSection) onSection(message.section, message.data, message.error);
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      lines.forEach(handleLine);
+    }
+    handleLine(buffered);
+
+    return { success: true, data: bundle };
+  },
+};
+
 export default api;
 